@@ -1,19 +1,44 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session
 import requests
 import json
 from openai import OpenAI
 import feedparser
 import hashlib
+import base64
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 import sqlite3
 import psycopg2
+from psycopg2.extras import execute_values
 from urllib.parse import urlparse
 import time
 import threading
 import traceback
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from db_pool import ConnectionPool
+from feed_config import FeedConfigCache
+from feed_http import AsyncFeedClient
+from feed_registry import FeedConfig, FeedRegistry
+from feed_watermark import Watermark, new_entries
+from feed_scheduler import FeedScheduler
+from llm_cache import LLMCache
+import sqlite_db
+import archive
+import auto_proposals
+import job_keys
+import job_lists
+import leader
+import metrics
+import migrations
+import near_dup
+import normalizer
+import pipeline
+import play_store
+import queries
+import rollups
+from pipeline import Stage
+from timestamps import parse_posted_date, to_posted_at, POSTED_AT_FORMAT
 
 app = Flask(__name__)
 app.secret_key = 'mindcrew_secret_key_2024'
@@ -23,15 +48,71 @@ def format_text_for_copy(text):
     """Format text for proper copying to Gmail, LinkedIn, WhatsApp"""
     return re.sub(r'<br\s*\/?>', '\n', text, flags=re.IGNORECASE).replace('</p>', '\n\n').replace(re.sub(r'<p[^>]*>', '', text), text).replace(re.sub(r'<[^>]*>', '', text), text).replace(re.sub(r'\n{3,}', '\n\n', text), text).replace('&nbsp;', ' ').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>').strip()
 
-def copy_formatted_text(text):
-    """Return properly formatted text for clipboard"""
+def _copy_text_breaks(text):
     formatted = re.sub(r'<br\s*\/?>', '\n', text, flags=re.IGNORECASE)
     formatted = re.sub(r'</p>', '\n\n', formatted, flags=re.IGNORECASE)
-    formatted = re.sub(r'<p[^>]*>', '', formatted, flags=re.IGNORECASE)
-    formatted = re.sub(r'<[^>]*>', '', formatted)
+    return re.sub(r'<p[^>]*>', '', formatted, flags=re.IGNORECASE)
+
+def _format_copy_text(text):
+    formatted = re.sub(r'<[^>]*>', '', _copy_text_breaks(text))
     formatted = re.sub(r'\n{3,}', '\n\n', formatted)
-    formatted = formatted.replace('&nbsp;', ' ').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>').strip()
-    return formatted
+    return formatted.replace('&nbsp;', ' ').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+
+def copy_formatted_text(text):
+    """Return properly formatted text for clipboard"""
+    return _format_copy_text(text).strip()
+
+class StreamedCopyText:
+    """copy_formatted_text for text that arrives in pieces (a streamed completion).
+    
+    feed() returns the formatted text that later pieces can no longer change, and close() the rest;
+    together they add up to copy_formatted_text of the whole text. Text is held back from the last
+    whitespace that might still join a tag, an entity or a run of newlines. With format=None the text
+    is only stripped.
+    """
+    def __init__(self, format=_format_copy_text):
+        self.format = format or (lambda text: text)
+        self.pieces = []
+        self._pending = ''
+        self._started = False  # leading whitespace has been stripped
+    
+    @property
+    def text(self):
+        """The raw text so far"""
+        return ''.join(self.pieces)
+    
+    def feed(self, piece):
+        self.pieces.append(piece)
+        self._pending += piece
+        cut = self._final_up_to(self._pending)
+        if not cut:
+            return ''
+        head, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._emit(self.format(head))
+    
+    def close(self):
+        tail, self._pending = self.format(self._pending).rstrip(), ''
+        return self._emit(tail)
+    
+    def _emit(self, formatted):
+        if not self._started:
+            formatted = formatted.lstrip()
+            self._started = bool(formatted)
+        return formatted
+    
+    @staticmethod
+    def _final_up_to(text):
+        """Length of the prefix that formats the same whatever follows: it ends on a character that no tag,
+        entity or strip() touches, right before whitespace, and leaves no tag open. 0 if there is none."""
+        lt, gt = text.rfind('<'), text.rfind('>')
+        end = lt if lt > gt else len(text) - 1  # nothing from an unclosed '<' on is final
+        for i in range(end, 0, -1):
+            if text[i].isspace() and not text[i - 1].isspace() and text[i - 1] not in '>;':
+                # Removing <br>/<p> first can leave a '<' that the tag pattern then joins to a later '>'
+                head = _copy_text_breaks(text[:i])
+                if head.rfind('<') <= head.rfind('>'):
+                    return i
+        return 0
 
 # API endpoint to format text for copying
 @app.route('/api/format-text', methods=['POST'])
@@ -61,36 +142,172 @@ OLOSTEP_KEY = os.getenv('OLOSTEP_KEY', 'your-olostep-key-here')
 COUNTRIES = ["singapore", "hongkong", "india", "malaysia", "thailand", "philippines", "vietnam", "indonesia"]
 GENERIC_KEYWORDS = ["real estate", "habit tracking", "expenses", "calory counter", "fitness", "education", "shopping", "travel", "food delivery", "dating"]
 
+# Database connection pool (shared by request handlers and RSS fetcher threads)
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_HEALTHCHECK_AFTER = float(os.getenv('DB_POOL_HEALTHCHECK_AFTER', 30))
+
+# SQLite fallback tuning (WAL, one writer connection + per-thread readers); set to 0 for stock settings
+SQLITE_PERFORMANCE_MODE = os.getenv('SQLITE_PERFORMANCE_MODE', '1') != '0'
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64000))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# Job list pagination
+JOBS_PAGE_SIZE = int(os.getenv('JOBS_PAGE_SIZE', 50))
+JOBS_PAGE_SIZE_MAX = int(os.getenv('JOBS_PAGE_SIZE_MAX', 200))
+
+# Untouched jobs older than this move to the jobs_archive table (0 disables archiving)
+JOBS_ARCHIVE_AFTER_DAYS = int(os.getenv('JOBS_ARCHIVE_AFTER_DAYS', 90))
+JOBS_ARCHIVE_INTERVAL = int(os.getenv('JOBS_ARCHIVE_INTERVAL', 6 * 3600))
+
+# RSS polling: one scheduler thread plus a fixed worker pool polls every feed (intervals in seconds)
+RSS_FETCH_TIMEOUT = float(os.getenv('RSS_FETCH_TIMEOUT', 30))
+FEED_SCHEDULER_WORKERS = int(os.getenv('FEED_SCHEDULER_WORKERS', 4))
+FEED_POLL_MIN_INTERVAL = int(os.getenv('FEED_POLL_MIN_INTERVAL', 120))
+FEED_POLL_MAX_INTERVAL = int(os.getenv('FEED_POLL_MAX_INTERVAL', 1800))
+FEED_POLL_DEFAULT_INTERVAL = int(os.getenv('FEED_POLL_DEFAULT_INTERVAL', 600))
+FEED_POLL_TARGET_NEW_JOBS = int(os.getenv('FEED_POLL_TARGET_NEW_JOBS', 5))
+FEED_POLL_MAX_BACKOFF = int(os.getenv('FEED_POLL_MAX_BACKOFF', 3600))
+FEED_FETCH_MAX_CONNECTIONS = int(os.getenv('FEED_FETCH_MAX_CONNECTIONS', 20))
+FEED_FETCH_PER_HOST = int(os.getenv('FEED_FETCH_PER_HOST', 8))
+FEED_FETCH_HTTP2 = os.getenv('FEED_FETCH_HTTP2', '1') != '0'
+# Job ids per feed remembered by the high-water mark; keep it above the number of entries a feed lists
+FEED_RECENT_GUIDS = int(os.getenv('FEED_RECENT_GUIDS', 200))
+
+# Near-duplicate jobs: SimHash distance in bits (-1 disables; up to 3 is fully indexed) and what to do
+# with a match - 'merge' into the stored job, or 'flag' (store it with duplicate_of set)
+NEAR_DUP_MAX_DISTANCE = int(os.getenv('NEAR_DUP_MAX_DISTANCE', 3))
+NEAR_DUP_ACTION = os.getenv('NEAR_DUP_ACTION', 'merge')
+
+# LLM completions cache: entry lifetime in seconds (0 turns it off), in-memory entries per process,
+# and the row cap of the shared llm_cache table
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 30 * 86400))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 512))
+LLM_CACHE_MAX_ROWS = int(os.getenv('LLM_CACHE_MAX_ROWS', 20000))
+
+# Proposal pipeline (see pipeline.py): worker threads shared by all /generate_proposal requests, and
+# per-stage timeouts in seconds. A slow keyword call or Play Store search falls back; a slow proposal fails.
+PROPOSAL_PIPELINE_WORKERS = int(os.getenv('PROPOSAL_PIPELINE_WORKERS', 16))
+PROPOSAL_KEYWORDS_TIMEOUT = float(os.getenv('PROPOSAL_KEYWORDS_TIMEOUT', 20))
+PLAY_SEARCH_TIMEOUT = float(os.getenv('PLAY_SEARCH_TIMEOUT', 10))
+PROPOSAL_LLM_TIMEOUT = float(os.getenv('PROPOSAL_LLM_TIMEOUT', 90))
+
+# Background proposals for feeds that opt in (see auto_proposals.py): worker threads, daily budget in
+# USD and the estimated cost charged per proposal, queue size, how many hours back the sweep looks for
+# jobs without a proposal and how often it runs (seconds), and the priority a job loses per hour of age
+AUTO_PROPOSAL_WORKERS = int(os.getenv('AUTO_PROPOSAL_WORKERS', 2))
+AUTO_PROPOSAL_DAILY_BUDGET = float(os.getenv('AUTO_PROPOSAL_DAILY_BUDGET', 1.0))
+AUTO_PROPOSAL_COST = float(os.getenv('AUTO_PROPOSAL_COST', 0.002))
+AUTO_PROPOSAL_MAX_QUEUED = int(os.getenv('AUTO_PROPOSAL_MAX_QUEUED', 500))
+AUTO_PROPOSAL_MAX_AGE_HOURS = int(os.getenv('AUTO_PROPOSAL_MAX_AGE_HOURS', 24))
+AUTO_PROPOSAL_SWEEP_INTERVAL = int(os.getenv('AUTO_PROPOSAL_SWEEP_INTERVAL', 60))
+AUTO_PROPOSAL_AGE_PENALTY = float(os.getenv('AUTO_PROPOSAL_AGE_PENALTY', 10))
+
+# Feed configurations are cached per process; seconds between checks for changes made by other processes
+FEED_CONFIG_CHECK_INTERVAL = float(os.getenv('FEED_CONFIG_CHECK_INTERVAL', 5))
+
+# Only one process (the leader) polls feeds and archives; standbys retry the lock this often
+LEADER_CHECK_INTERVAL = int(os.getenv('LEADER_CHECK_INTERVAL', 15))
+LEADER_LOCK_FILE = os.getenv('LEADER_LOCK_FILE', 'proposals.db.leader')
+
 client = OpenAI(api_key=OPENAI_KEY)
 
 class MultiRSSProposalSystem:
     def __init__(self):
+        if os.getenv('DATABASE_URL') or not SQLITE_PERFORMANCE_MODE:
+            self.pool = ConnectionPool(self._connect,
+                                       min_size=DB_POOL_MIN_SIZE,
+                                       max_size=DB_POOL_MAX_SIZE,
+                                       timeout=DB_POOL_TIMEOUT,
+                                       healthcheck_after=DB_POOL_HEALTHCHECK_AFTER)
+            self.read_pool = self.pool
+        else:
+            self.pool = sqlite_db.WriterConnection(self._connect, timeout=DB_POOL_TIMEOUT)
+            self.read_pool = sqlite_db.ThreadReaders(lambda: self._connect(readonly=True))
+        # rss_feeds rows for pages and prompts; writers call feed_configs.invalidate(c) (see feed_config.py)
+        self.feed_configs = FeedConfigCache(self.get_db_connection, os.getenv('DATABASE_URL') is not None,
+                                            check_interval=FEED_CONFIG_CHECK_INTERVAL)
         self.init_db()
-        self.rss_threads = {}
-        
-    def get_db_connection(self):
+        self.http = AsyncFeedClient(timeout=RSS_FETCH_TIMEOUT,
+                                    max_connections=FEED_FETCH_MAX_CONNECTIONS,
+                                    per_host=FEED_FETCH_PER_HOST,
+                                    http2=FEED_FETCH_HTTP2,
+                                    headers={'User-Agent': feedparser.USER_AGENT})
+        self.scheduler = FeedScheduler(self.poll_feed,
+                                       workers=FEED_SCHEDULER_WORKERS,
+                                       min_interval=FEED_POLL_MIN_INTERVAL,
+                                       max_interval=FEED_POLL_MAX_INTERVAL,
+                                       default_interval=FEED_POLL_DEFAULT_INTERVAL,
+                                       target_new=FEED_POLL_TARGET_NEW_JOBS,
+                                       max_backoff=FEED_POLL_MAX_BACKOFF,
+                                       fetch=self.fetch_feed)
+        self.feeds = FeedRegistry(self.scheduler)
+        # Conditional GET validators per feed: {rss_id: {'url', 'etag', 'modified', 'content_hash'}}
+        self.feed_http_state = {}
+        # High-water marks per feed: {rss_id: (url, Watermark)}
+        self.feed_watermarks = {}
+        self.fetch_stats = {}
+        self.fetch_stats_lock = threading.Lock()
+        self.llm_cache = LLMCache(self.get_db_connection, os.getenv('DATABASE_URL') is not None,
+                                  ttl=LLM_CACHE_TTL, memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                                  max_rows=LLM_CACHE_MAX_ROWS)
+        # Prometheus series for /metrics (see metrics.py)
+        self.metrics = metrics.FeedMetrics(is_leader=lambda: self.leader.is_leader)
+        self.proposal_metrics = metrics.ProposalMetrics(self.metrics.registry)
+        self.proposal_executor = ThreadPoolExecutor(max_workers=PROPOSAL_PIPELINE_WORKERS,
+                                                    thread_name_prefix='proposal')
+        self.proposal_pipeline = pipeline.Pipeline(self.proposal_stages())
+        # Everything before the proposal stage, for stream_proposal
+        self.proposal_context_pipeline = pipeline.Pipeline(self.proposal_pipeline.stages[:-1])
+        self.auto_proposals = auto_proposals.AutoProposalQueue(
+            self.generate_auto_proposal, self.get_db_connection, os.getenv('DATABASE_URL') is not None,
+            workers=AUTO_PROPOSAL_WORKERS, daily_budget=AUTO_PROPOSAL_DAILY_BUDGET,
+            cost_per_proposal=AUTO_PROPOSAL_COST, max_queued=AUTO_PROPOSAL_MAX_QUEUED,
+            sweep=self.sweep_auto_proposals, sweep_interval=AUTO_PROPOSAL_SWEEP_INTERVAL)
+        self.archiver_stop = None
+        if os.getenv('DATABASE_URL'):
+            leader_lock = leader.AdvisoryLock(self._connect)
+        else:
+            leader_lock = leader.FileLock(LEADER_LOCK_FILE)
+        self.leader = leader.LeaderElection(leader_lock,
+                                            on_elected=self.start_background_work,
+                                            on_demoted=self.stop_background_work,
+                                            on_check=self.sync_feeds,
+                                            interval=LEADER_CHECK_INTERVAL)
+        
+    def _connect(self, readonly=False):
         database_url = os.getenv('DATABASE_URL')
         if database_url:
             # PostgreSQL connection
             return psycopg2.connect(database_url)
+        elif SQLITE_PERFORMANCE_MODE:
+            return sqlite_db.connect('proposals.db', readonly=readonly,
+                                     mmap_size=SQLITE_MMAP_SIZE,
+                                     cache_size_kb=SQLITE_CACHE_SIZE_KB,
+                                     busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS)
         else:
-            # SQLite fallback for local development
-            return sqlite3.connect('proposals.db')
+            # SQLite fallback for local development (shared across threads via the pool)
+            return sqlite3.connect('proposals.db', check_same_thread=False)
+    
+    def get_db_connection(self, readonly=False):
+        """Check out a pooled connection; conn.close() returns it to the pool.
+        
+        readonly=True is for SELECT-only call sites: on SQLite they get a per-thread
+        reader instead of queueing for the single writer connection.
+        """
+        if readonly:
+            return self.read_pool.acquire()
+        return self.pool.acquire()
     
     def init_db(self):
         conn = self.get_db_connection()
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
         
-        # Users table
-        if is_postgres:
-            # PostgreSQL syntax
-            c.execute('''CREATE TABLE IF NOT EXISTS users
-                         (id SERIAL PRIMARY KEY, email TEXT UNIQUE, password TEXT, active INTEGER DEFAULT 1)''')
-        else:
-            # SQLite syntax
-            c.execute('''CREATE TABLE IF NOT EXISTS users
-                         (id INTEGER PRIMARY KEY, email TEXT UNIQUE, password TEXT, active INTEGER DEFAULT 1)''')
+        # Schema is owned by migrations.py; this is a no-op once the DB is current
+        migrations.migrate(conn, is_postgres)
         
         # Insert hardcoded user if not exists
         if is_postgres:
@@ -104,91 +321,8 @@ class MultiRSSProposalSystem:
                 c.execute("INSERT INTO users (email, password) VALUES (?, ?)", 
                          ('madhuri.thakur@mindcrewtech.com', 'mindcrew01'))
         
-        # RSS Feeds table
-        if is_postgres:
-            c.execute('''CREATE TABLE IF NOT EXISTS rss_feeds
-                         (id SERIAL PRIMARY KEY, name TEXT, url TEXT, active INTEGER DEFAULT 1,
-                          keyword_prompt TEXT, proposal_prompt TEXT, olostep_prompt TEXT)''')
-        else:
-            c.execute('''CREATE TABLE IF NOT EXISTS rss_feeds
-                         (id INTEGER PRIMARY KEY, name TEXT, url TEXT, active INTEGER DEFAULT 1,
-                          keyword_prompt TEXT, proposal_prompt TEXT, olostep_prompt TEXT)''')
-        
-        # Jobs table with RSS source
-        if is_postgres:
-            c.execute('''CREATE TABLE IF NOT EXISTS jobs
-                         (id TEXT PRIMARY KEY, title TEXT, description TEXT, url TEXT, 
-                          client TEXT, budget TEXT, posted_date TEXT, processed INTEGER DEFAULT 0,
-                          client_type TEXT, client_name TEXT, client_company TEXT, client_city TEXT, 
-                          client_country TEXT, linkedin_url TEXT, email TEXT, phone TEXT, 
-                          whatsapp TEXT, enriched INTEGER DEFAULT 0, decision_maker TEXT,
-                          skills TEXT, categories TEXT, hourly_rate TEXT, site TEXT, rss_source_id INTEGER)''')
-        else:
-            c.execute('''CREATE TABLE IF NOT EXISTS jobs
-                         (id TEXT PRIMARY KEY, title TEXT, description TEXT, url TEXT, 
-                          client TEXT, budget TEXT, posted_date TEXT, processed INTEGER DEFAULT 0,
-                          client_type TEXT, client_name TEXT, client_company TEXT, client_city TEXT, 
-                          client_country TEXT, linkedin_url TEXT, email TEXT, phone TEXT, 
-                          whatsapp TEXT, enriched INTEGER DEFAULT 0, decision_maker TEXT,
-                          skills TEXT, categories TEXT, hourly_rate TEXT, site TEXT, rss_source_id INTEGER)''')
-        
-        if is_postgres:
-            c.execute('''CREATE TABLE IF NOT EXISTS proposals
-                         (id SERIAL PRIMARY KEY, job_id TEXT UNIQUE, proposal TEXT, 
-                          examples TEXT, created_at TEXT, debug_log TEXT, enrichment_author TEXT)''')
-        else:
-            c.execute('''CREATE TABLE IF NOT EXISTS proposals
-                         (id INTEGER PRIMARY KEY, job_id TEXT UNIQUE, proposal TEXT, 
-                          examples TEXT, created_at TEXT, debug_log TEXT, enrichment_author TEXT)''')
-        
-        # Team profiles table
-        if is_postgres:
-            c.execute('''CREATE TABLE IF NOT EXISTS team_profiles
-                         (id SERIAL PRIMARY KEY, name TEXT, title TEXT, skills TEXT, 
-                          description TEXT, profile_url TEXT, hourly_rate TEXT, 
-                          experience_years INTEGER, specialization TEXT, active INTEGER DEFAULT 1)''')
-        else:
-            c.execute('''CREATE TABLE IF NOT EXISTS team_profiles
-                         (id INTEGER PRIMARY KEY, name TEXT, title TEXT, skills TEXT, 
-                          description TEXT, profile_url TEXT, hourly_rate TEXT, 
-                          experience_years INTEGER, specialization TEXT, active INTEGER DEFAULT 1)''')        
-        
-        # Add missing columns to existing jobs table if they don't exist
-        columns_to_add = [
-            'rss_source_id INTEGER',
-            'client_type TEXT',
-            'client_name TEXT', 
-            'client_company TEXT',
-            'client_city TEXT',
-            'client_country TEXT',
-            'linkedin_url TEXT',
-            'email TEXT',
-            'phone TEXT',
-            'whatsapp TEXT',
-            'enriched INTEGER DEFAULT 0',
-            'decision_maker TEXT',
-            'skills TEXT',
-            'categories TEXT',
-            'hourly_rate TEXT',
-            'site TEXT',
-            'outreach_status TEXT DEFAULT \'Pending\'',
-            'proposal_status TEXT DEFAULT \'Not Submitted\'',
-            'submitted_by TEXT',
-            'enriched_at TEXT',
-            'enriched_by TEXT'
-        ]
-        
-        # Commit table creation before checking counts
         conn.commit()
         
-        for column in columns_to_add:
-            try:
-                c.execute(f'ALTER TABLE jobs ADD COLUMN {column}')
-                conn.commit()
-            except Exception as e:
-                conn.rollback()  # Rollback failed transaction
-                pass  # Column already exists
-        
         # Insert team profiles from CSV data if none exists
         c.execute("SELECT COUNT(*) FROM team_profiles")
         if c.fetchone()[0] == 0:
@@ -267,194 +401,383 @@ class MultiRSSProposalSystem:
                             VALUES (?, ?, ?, ?, ?)""",
                          ("Manual Jobs", "manual://jobs",
                           default_keyword_prompt, default_proposal_prompt, default_olostep_prompt))
+            self.feed_configs.invalidate(c)
             conn.commit()
         
         conn.close()
         
     def get_rss_feeds(self):
-        conn = self.get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT * FROM rss_feeds ORDER BY name")
-        feeds = c.fetchall()
-        conn.close()
-        return feeds
-    
-    def get_jobs_by_rss(self, rss_id):
-        conn = self.get_db_connection()
+        return self.feed_configs.all()
+    
+    @staticmethod
+    def encode_cursor(job):
+        posted_at = job[29]
+        if isinstance(posted_at, datetime):
+            posted_at = posted_at.strftime(POSTED_AT_FORMAT)
+        raw = json.dumps([posted_at, job[0]]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            posted_at, job_id = json.loads(raw)
+            return str(posted_at), str(job_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+    
+    def get_jobs_page(self, view, rss_id=None, cursor=None, limit=None, include_archived=False):
+        """Return (jobs, next_cursor) for one page of a job list tab"""
+        limit = max(1, min(int(limit or JOBS_PAGE_SIZE), JOBS_PAGE_SIZE_MAX))
+        params = [rss_id] if view == 'feed' else []
+        if cursor:
+            params.extend(self.decode_cursor(cursor))
+        if include_archived:
+            params = params * 2
+        
+        conn = self.get_db_connection(readonly=True)
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
-        
-        # Add missing columns if they don't exist (PostgreSQL should have them)
-        if not is_postgres:
-            for column in ['proposal_status TEXT DEFAULT "Not Submitted"', 'submitted_by TEXT']:
-                try:
-                    c.execute(f'ALTER TABLE jobs ADD COLUMN {column}')
-                    conn.commit()
-                except:
-                    conn.rollback()
-                    pass
-        
-        if is_postgres:
-            c.execute("""SELECT id, title, description, url, client, budget, posted_date, processed,
-                         client_type, client_name, client_company, client_city, client_country, 
-                         linkedin_url, email, phone, whatsapp, enriched, decision_maker, skills, 
-                         categories, hourly_rate, site, rss_source_id, outreach_status, 
-                         proposal_status, submitted_by, enriched_at, enriched_by
-                         FROM jobs WHERE rss_source_id = %s AND enriched != 1 
-                         ORDER BY CAST(posted_date AS TIMESTAMP) DESC""", (rss_id,))
-        else:
-            c.execute("SELECT * FROM jobs WHERE rss_source_id = ? AND enriched != 1 ORDER BY datetime(posted_date) DESC", (rss_id,))
+        # Fetch one extra row to find out whether another page exists
+        c.execute(job_lists.sql(view, is_postgres, after_cursor=bool(cursor), limit=limit + 1,
+                                include_archived=include_archived), tuple(params))
         jobs = c.fetchall()
         conn.close()
+        
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = self.encode_cursor(jobs[-1])
+        return jobs, next_cursor
+    
+    def get_jobs_by_rss(self, rss_id):
+        """First page of a feed's unenriched jobs"""
+        jobs, _ = self.get_jobs_page('feed', rss_id)
         return jobs
     
-    def fetch_rss_jobs(self, rss_id, rss_url):
+    JOB_INGEST_COLUMNS = normalizer.INGEST_COLUMNS
+    
+    def existing_job_ids(self, c, job_ids, is_postgres):
+        """Return the subset of job_ids already in the jobs table, using one set-based query"""
+        # Archived jobs count as existing, so a feed still listing one doesn't re-import it
+        if is_postgres:
+            job_ids = list(job_ids)
+            c.execute(f"""SELECT id FROM jobs WHERE id = ANY(%s)
+                          UNION ALL SELECT id FROM {archive.ARCHIVE_TABLE} WHERE id = ANY(%s)""", (job_ids, job_ids))
+        else:
+            # Temp tables are per connection, so pooled connections reuse it across polls
+            c.execute("CREATE TEMP TABLE IF NOT EXISTS ingest_ids (id TEXT PRIMARY KEY)")
+            c.execute("DELETE FROM ingest_ids")
+            c.executemany("INSERT OR IGNORE INTO ingest_ids (id) VALUES (?)", [(job_id,) for job_id in job_ids])
+            c.execute(f"""SELECT jobs.id FROM jobs JOIN ingest_ids ON ingest_ids.id = jobs.id
+                          UNION ALL SELECT a.id FROM {archive.ARCHIVE_TABLE} a JOIN ingest_ids ON ingest_ids.id = a.id""")
+        return {row[0] for row in c.fetchall()}
+    
+    def existing_upwork_keys(self, c, keys, is_postgres):
+        """Return the subset of Upwork job keys already stored, live or archived"""
+        keys = [key for key in keys if key]
+        if not keys:
+            return set()
+        if is_postgres:
+            c.execute(f"""SELECT upwork_key FROM jobs WHERE upwork_key = ANY(%s)
+                          UNION ALL SELECT upwork_key FROM {archive.ARCHIVE_TABLE} WHERE upwork_key = ANY(%s)""", (keys, keys))
+        else:
+            c.execute("CREATE TEMP TABLE IF NOT EXISTS ingest_keys (upwork_key TEXT PRIMARY KEY)")
+            c.execute("DELETE FROM ingest_keys")
+            c.executemany("INSERT OR IGNORE INTO ingest_keys (upwork_key) VALUES (?)", [(key,) for key in keys])
+            c.execute(f"""SELECT jobs.upwork_key FROM jobs JOIN ingest_keys USING (upwork_key)
+                          UNION ALL SELECT a.upwork_key FROM {archive.ARCHIVE_TABLE} a JOIN ingest_keys USING (upwork_key)""")
+        return {row[0] for row in c.fetchall()}
+    
+    def find_job(self, c, url, job_id, restore=False):
+        """(id, enriched) of the stored job for a URL - by its Upwork key, else by job_id - or None.
+        
+        Archived jobs are found too. With restore=True (callers about to write to the job) an
+        archived job is first moved back into jobs, so it doesn't end up in both tiers.
+        """
+        key = job_keys.upwork_key(url)
+        for tier, (by_key, by_id) in enumerate([('job_by_upwork_key', 'job_enriched_flag'),
+                                                 ('archived_job_by_upwork_key', 'archived_job_enriched_flag')]):
+            row = None
+            if key:
+                queries.execute(c, by_key, (key,))
+                row = c.fetchone()
+            if row is None:
+                queries.execute(c, by_id, (job_id,))
+                row = c.fetchone()
+            if row:
+                if tier == 1 and restore:
+                    archive.restore_job(c, row[0], os.getenv('DATABASE_URL') is not None)
+                return row
+        return None
+    
+    def insert_jobs(self, c, rows, is_postgres):
+        """Multi-row insert of ingested jobs; rows that already exist are left alone. Returns the ids inserted."""
+        if not rows:
+            return []
+        columns = ', '.join(self.JOB_INGEST_COLUMNS)
+        # Conflicts on either the id or the upwork_key
+        if is_postgres:
+            inserted = execute_values(c, f"INSERT INTO jobs ({columns}) VALUES %s ON CONFLICT DO NOTHING RETURNING id",
+                                      rows, page_size=len(rows), fetch=True)
+            return [row[0] for row in inserted]
+        # executemany only reports the total, so one statement per row (same transaction, same writer)
+        placeholders = ', '.join('?' * len(self.JOB_INGEST_COLUMNS))
+        sql = f"INSERT INTO jobs ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
+        inserted = []
+        for row in rows:
+            c.execute(sql, row)
+            if c.rowcount:
+                inserted.append(row[0])
+        return inserted
+    
+    def record_fetch(self, rss_id, outcome, inserted=0, near_duplicates=0):
+        """Count one poll of a feed; outcome is not_modified, unchanged, parsed or errors"""
+        with self.fetch_stats_lock:
+            stats = self.fetch_stats.setdefault(rss_id, {'polls': 0, 'not_modified': 0, 'unchanged': 0,
+                                                         'parsed': 0, 'errors': 0, 'jobs_inserted': 0,
+                                                         'near_duplicates': 0})
+            stats['polls'] += 1
+            stats[outcome] += 1
+            stats['jobs_inserted'] += inserted
+            stats['near_duplicates'] += near_duplicates
+        self.metrics.poll(rss_id, outcome)
+    
+    def get_feed_http_state(self, rss_id, rss_url):
+        state = self.feed_http_state.get(rss_id)
+        if state is None:
+            with self.read_pool.connection() as conn:
+                c = conn.cursor()
+                queries.execute(c, 'feed_fetch_state', (rss_id,))
+                etag, modified, content_hash = c.fetchone() or (None, None, None)
+            state = {'url': rss_url, 'etag': etag, 'modified': modified, 'content_hash': content_hash}
+            self.feed_http_state[rss_id] = state
+        elif state['url'] != rss_url:
+            # Validators belong to the old URL
+            state = {'url': rss_url, 'etag': None, 'modified': None, 'content_hash': None}
+        return state
+    
+    def feed_request_headers(self, state):
+        headers = {}
+        if state['etag']:
+            headers['If-None-Match'] = state['etag']
+        if state['modified']:
+            headers['If-Modified-Since'] = state['modified']
+        return headers
+    
+    def fetch_feed(self, rss_id, rss_url):
+        """Scheduler network stage: start the conditional GET on the shared async client"""
+        if not rss_url.startswith(('http://', 'https://')):
+            # Read by feedparser itself in the worker
+            done = Future()
+            done.set_result(None)
+            return done
+        state = self.get_feed_http_state(rss_id, rss_url)
+        return self.http.fetch(rss_url, self.feed_request_headers(state))
+    
+    def download_feed(self, rss_id, rss_url, prefetched=None):
+        """Conditional GET of a feed.
+        
+        Returns (body, new_state), or (None, None) when the feed hasn't changed since the
+        last successful poll - either a 304 or a byte-identical body. new_state should be
+        saved with save_feed_http_state once the body has been ingested. prefetched is the
+        future from fetch_feed when the scheduler already started the request.
+        """
+        if not rss_url.startswith(('http://', 'https://')):
+            # Local files and other sources feedparser reads itself; nothing to validate against
+            return rss_url, None
+        
+        state = self.get_feed_http_state(rss_id, rss_url)
+        if prefetched is None:
+            prefetched = self.http.fetch(rss_url, self.feed_request_headers(state))
+        response = prefetched.result()
+        self.metrics.download(rss_id, response.elapsed.total_seconds(), len(response.content))
+        if response.status_code == 304:
+            self.record_fetch(rss_id, 'not_modified')
+            return None, None
+        response.raise_for_status()
+        
+        new_state = {'url': rss_url,
+                     'etag': response.headers.get('ETag'),
+                     'modified': response.headers.get('Last-Modified'),
+                     'content_hash': hashlib.sha256(response.content).hexdigest()}
+        if new_state['content_hash'] == state['content_hash']:
+            # Server ignored the validators (or sent none) but nothing changed
+            self.feed_http_state[rss_id] = new_state
+            self.record_fetch(rss_id, 'unchanged')
+            return None, None
+        return response.content, new_state
+    
+    def save_feed_http_state(self, c, rss_id, state):
+        queries.execute(c, 'save_feed_fetch_state', (state['etag'], state['modified'], state['content_hash'], rss_id))
+    
+    def get_feed_watermark(self, rss_id, rss_url):
+        cached = self.feed_watermarks.get(rss_id)
+        if cached is None:
+            with self.read_pool.connection() as conn:
+                c = conn.cursor()
+                queries.execute(c, 'feed_watermark', (rss_id,))
+                published_at, recent_guids = c.fetchone() or (None, None)
+            watermark = Watermark.load(published_at, recent_guids, keep=FEED_RECENT_GUIDS)
+            self.feed_watermarks[rss_id] = (rss_url, watermark)
+            return watermark
+        url, watermark = cached
+        if url != rss_url:
+            # Marks what the old URL listed
+            return Watermark(keep=FEED_RECENT_GUIDS)
+        return watermark
+    
+    def fetch_rss_jobs(self, rss_id, rss_url, raise_errors=False, prefetched=None):
         try:
-            feed = feedparser.parse(rss_url)
-            new_jobs = 0
+            body, http_state = self.download_feed(rss_id, rss_url, prefetched)
+            if body is None:
+                return 0
+            feed_entries = normalizer.parse(body)
             
-            conn = self.get_db_connection()
-            c = conn.cursor()
-            is_postgres = os.getenv('DATABASE_URL') is not None
+            # Only the entries above the feed's high-water mark; the rest were handled on earlier polls
+            watermark = self.get_feed_watermark(rss_id, rss_url)
+            entries = list(new_entries(feed_entries, watermark))
             
-            for entry in feed.entries:
-                job_id = hashlib.md5(entry.link.encode()).hexdigest()
+            # Released (and rolled back) even when a lookup or the insert raises
+            with self.pool.connection() as conn:
+                c = conn.cursor()
+                is_postgres = os.getenv('DATABASE_URL') is not None
                 
-                if os.getenv('DATABASE_URL'):
-                    c.execute("SELECT id FROM jobs WHERE id = %s", (job_id,))
-                else:
-                    c.execute("SELECT id FROM jobs WHERE id = ?", (job_id,))
-                if not c.fetchone():
-                    # Extract budget/price from title
-                    budget = 'Not specified'
-                    hourly_rate = 'Not specified'
-                    
-                    if 'Hourly Rate:' in entry.title:
-                        rate_part = entry.title.split('Hourly Rate:')[1].strip().rstrip(')')
-                        hourly_rate = rate_part
-                        budget = f"Hourly: {rate_part}"
-                    elif 'Fixed Price:' in entry.title:
-                        price_part = entry.title.split('Fixed Price:')[1].strip().rstrip(')')
-                        budget = f"Fixed: {price_part}"
-                    
-                    # Use actual published date from RSS
-                    posted_date = entry.get('published', datetime.now().isoformat())
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        from time import mktime
-                        posted_date = datetime.fromtimestamp(mktime(entry.published_parsed)).isoformat()
-                    
-                    # Extract skills from description
-                    skills = 'Not specified'
-                    if 'Skills:' in entry.description:
-                        skills_part = entry.description.split('Skills:')[1]
-                        if 'Categories:' in skills_part:
-                            skills_part = skills_part.split('Categories:')[0]
-                        skills = skills_part.strip().replace(']]>', '').replace('<![CDATA[', '')
-                    
-                    # Extract categories
-                    categories = 'Not specified'
-                    if 'Categories:' in entry.description:
-                        cat_part = entry.description.split('Categories:')[1]
-                        categories = cat_part.strip().replace(']]>', '').replace('<![CDATA[', '')
-                    
-                    # Clean up description - get the main job description before Skills/Categories
-                    description = entry.description
-                    if 'Skills:' in description:
-                        description = description.split('Skills:')[0].strip()
-                    description = description.replace('<![CDATA[', '').replace(']]>', '').strip()
-                    
-                    print(f"RSS Job extracted - Skills: {skills}, Categories: {categories}, Description length: {len(description)}")
-                    
-                    if is_postgres:
-                        c.execute("""INSERT INTO jobs 
-                                    (id, title, description, url, client, budget, posted_date, 
-                                     hourly_rate, skills, categories, rss_source_id)
-                                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                                 (job_id, entry.title, description, entry.link,
-                                  entry.get('author', 'Unknown'), 
-                                  budget,
-                                  posted_date,
-                                  hourly_rate, skills, categories, rss_id))
-                    else:
-                        c.execute("""INSERT INTO jobs 
-                                    (id, title, description, url, client, budget, posted_date, 
-                                     hourly_rate, skills, categories, rss_source_id)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                                 (job_id, entry.title, description, entry.link,
-                                  entry.get('author', 'Unknown'), 
-                                  budget,
-                                  posted_date,
-                                  hourly_rate, skills, categories, rss_id))
-                    new_jobs += 1
+                # Other feeds (and the Chrome extension) can already have stored the same job, possibly
+                # under another id; its Upwork key is the same whatever link it came from
+                existing = self.existing_job_ids(c, [job_id for job_id, _, _ in entries], is_postgres) if entries else set()
+                existing_keys = self.existing_upwork_keys(c, [job_keys.upwork_key(dict.get(entry, 'link'))
+                                                              for _, _, entry in entries], is_postgres)
+                records = normalizer.dedupe(normalizer.normalize(entries, rss_id), existing, existing_keys)
+                # Reposts and the same job saved by the Chrome extension have other ids but near-identical text
+                checker = near_dup.BatchChecker(c, is_postgres, NEAR_DUP_MAX_DISTANCE)
+                records = list(normalizer.near_duplicates(records, checker, merge=NEAR_DUP_ACTION == 'merge'))
+                rows = [record.row() for record in records]
+                
+                # ON CONFLICT covers jobs another worker inserted since the existence check
+                write_started = time.perf_counter()
+                inserted_ids = set(self.insert_jobs(c, rows, is_postgres))
+                new_jobs = len(inserted_ids)
+                # Both saved with the jobs, so a failed insert is retried on the next poll
+                if http_state:
+                    self.save_feed_http_state(c, rss_id, http_state)
+                if entries:
+                    watermark = watermark.advance(entries)
+                    queries.execute(c, 'save_feed_watermark', watermark.dump() + (rss_id,))
+                conn.commit()
+                write_seconds = time.perf_counter() - write_started
+            if http_state:
+                self.feed_http_state[rss_id] = http_state
+            self.feed_watermarks[rss_id] = (rss_url, watermark)
+            if new_jobs and self.feed_configs.field(rss_id, 'auto_proposals'):
+                # Only jobs this poll stored; a row skipped by ON CONFLICT belongs to whoever inserted it
+                self.queue_auto_proposals([(record.job_id, record.description, record.skills_text(), record.posted_at)
+                                           for record in records
+                                           if record.job_id in inserted_ids and record.duplicate_of is None])
             
-            conn.commit()
-            conn.close()
+            skipped = len(feed_entries) - new_jobs
+            self.metrics.ingest(rss_id, len(feed_entries), new_jobs, checker.duplicates, write_seconds)
+            self.record_fetch(rss_id, 'parsed', new_jobs, checker.duplicates)
+            print(f"RSS {rss_id}: {new_jobs} inserted, {skipped} skipped "
+                  f"({len(feed_entries)} entries, {len(entries)} above the high-water mark, "
+                  f"{checker.duplicates} near-duplicates)")
             return new_jobs
         except Exception as e:
+            self.record_fetch(rss_id, 'errors')
             print(f"RSS fetch error for feed {rss_id}: {e}")
+            if raise_errors:
+                raise
             return 0
     
-    def start_rss_fetcher(self, rss_id, rss_url):
-        def fetch_loop():
-            while True:
+    def poll_feed(self, rss_id, rss_url, prefetched=None):
+        """Scheduler worker stage: parse and ingest the downloaded feed, returns the number of new jobs"""
+        return self.fetch_rss_jobs(rss_id, rss_url, raise_errors=True, prefetched=prefetched)
+    
+    def sync_feeds(self):
+        """Pick up feeds added or edited through other worker processes"""
+        self.feeds.sync(FeedConfig(feed[0], feed[1], feed[2], active=feed[3] == 1, poll_interval=feed[10])
+                        for feed in self.get_rss_feeds())
+    
+    def start_background_work(self):
+        """Called once this process becomes the leader"""
+        self.scheduler.start()
+        self.start_archiver()
+        self.auto_proposals.start()
+    
+    def stop_background_work(self):
+        self.scheduler.stop()
+        self.auto_proposals.stop()
+        if self.archiver_stop:
+            self.archiver_stop.set()
+    
+    def archive_old_jobs(self, older_than_days=None):
+        """Move untouched jobs past the archive age out of the hot jobs table"""
+        days = JOBS_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        with self.pool.connection() as conn:
+            return archive.archive_old_jobs(conn, os.getenv('DATABASE_URL') is not None, days)
+    
+    def start_archiver(self):
+        if JOBS_ARCHIVE_AFTER_DAYS <= 0:
+            return
+        
+        stop = self.archiver_stop = threading.Event()
+        
+        def archive_loop():
+            while not stop.is_set():
                 try:
-                    # Check if feed is still active
-                    conn = self.get_db_connection()
-                    c = conn.cursor()
-                    if os.getenv('DATABASE_URL'):
-                        c.execute("SELECT active FROM rss_feeds WHERE id = %s", (rss_id,))
-                    else:
-                        c.execute("SELECT active FROM rss_feeds WHERE id = ?", (rss_id,))
-                    result = c.fetchone()
-                    conn.close()
-                    
-                    if result and result[0] == 1:  # Active
-                        new_jobs = self.fetch_rss_jobs(rss_id, rss_url)
-                        if new_jobs > 0:
-                            print(f"RSS {rss_id}: Fetched {new_jobs} new jobs")
-                    else:
-                        print(f"RSS {rss_id}: Paused")
-                        
+                    moved = self.archive_old_jobs()
+                    if moved:
+                        print(f"Archived {moved} jobs older than {JOBS_ARCHIVE_AFTER_DAYS} days")
                 except Exception as e:
-                    print(f"RSS {rss_id} fetch error: {e}")
-                
-                time.sleep(600)  # 10 minutes
+                    print(f"Job archive error: {e}")
+                stop.wait(JOBS_ARCHIVE_INTERVAL)
         
-        if rss_id not in self.rss_threads:
-            thread = threading.Thread(target=fetch_loop, daemon=True)
-            thread.start()
-            self.rss_threads[rss_id] = thread
+        threading.Thread(target=archive_loop, daemon=True).start()
     
-    def start_all_active_feeds(self):
-        feeds = self.get_rss_feeds()
-        for feed in feeds:
-            if feed[3] == 1:  # Active
-                self.start_rss_fetcher(feed[0], feed[2])
+    def chat(self, prompt, max_tokens, force_refresh=False, model="gpt-4o-mini"):
+        """Completion text for a single user message, through the LLM cache. Returns (text, cached)."""
+        def create():
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content
+        return self.llm_cache.get_or_create(model, prompt, max_tokens, create, force_refresh)
     
-    def extract_keywords(self, job_description, rss_id):
+    def chat_stream(self, prompt, max_tokens, force_refresh=False, model="gpt-4o-mini", timeout=None):
+        """chat, streamed: (pieces, cached), where pieces yields the text as the model writes it"""
+        def create_stream():
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True,
+                timeout=timeout
+            )
+            try:
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                response.close()
+        return self.llm_cache.stream(model, prompt, max_tokens, create_stream, force_refresh)
+    
+    def extract_keywords(self, job_description, rss_id, force_refresh=False):
         debug_log = []
         try:
             # Get custom prompt for this RSS feed
-            conn = self.get_db_connection()
-            c = conn.cursor()
-            if os.getenv('DATABASE_URL'):
-                c.execute("SELECT keyword_prompt FROM rss_feeds WHERE id = %s", (rss_id,))
-            else:
-                c.execute("SELECT keyword_prompt FROM rss_feeds WHERE id = ?", (rss_id,))
-            prompt_template = c.fetchone()[0]
-            conn.close()
+            prompt_template = self.feed_configs.field(rss_id, 'keyword_prompt')
             
             prompt = prompt_template.format(job_description=job_description)
             
             debug_log.append("Starting keyword extraction...")
             debug_log.append("Calling OpenAI for keyword extraction...")
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50
-            )
-            keywords = response.choices[0].message.content.strip().split(',')
+            content, cached = self.chat(prompt, 50, force_refresh)
+            if cached:
+                debug_log.append("Keywords served from the LLM cache")
+            keywords = content.strip().split(',')
             result = [k.strip().strip('"').strip("'") for k in keywords[:2]]  # Remove quotes
             debug_log.append(f"Keywords extracted: {result}")
             return result, debug_log
@@ -464,18 +787,12 @@ class MultiRSSProposalSystem:
             debug_log.append(f"Using fallback keywords: {result}")
             return result, debug_log
     
-    def generate_proposal(self, job_title, job_description, examples, client_first_name, rss_id):
+    def proposal_prompt(self, job_title, job_description, examples, client_first_name, rss_id):
+        """(prompt, debug_log) from the feed's proposal prompt"""
         debug_log = []
         
         # Get custom prompt for this RSS feed
-        conn = self.get_db_connection()
-        c = conn.cursor()
-        if os.getenv('DATABASE_URL'):
-            c.execute("SELECT proposal_prompt FROM rss_feeds WHERE id = %s", (rss_id,))
-        else:
-            c.execute("SELECT proposal_prompt FROM rss_feeds WHERE id = ?", (rss_id,))
-        prompt_template = c.fetchone()[0]
-        conn.close()
+        prompt_template = self.feed_configs.field(rss_id, 'proposal_prompt')
         
         examples_text = ""
         if examples:
@@ -495,150 +812,210 @@ class MultiRSSProposalSystem:
             examples_text=examples_text,
             greeting=greeting
         )
-        
+        return prompt, debug_log
+    
+    def generate_proposal(self, job_title, job_description, examples, client_first_name, rss_id, force_refresh=False):
+        prompt, debug_log = self.proposal_prompt(job_title, job_description, examples, client_first_name, rss_id)
         try:
             debug_log.append("Calling OpenAI for proposal generation...")
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000
-            )
-            proposal = response.choices[0].message.content.strip()
-            debug_log.append("Proposal generated successfully")
+            content, cached = self.chat(prompt, 1000, force_refresh)
+            proposal = content.strip()
+            debug_log.append("Proposal served from the LLM cache" if cached else "Proposal generated successfully")
             return proposal, debug_log
         except Exception as e:
             debug_log.append(f"Proposal generation failed: {str(e)}")
             return f"Error generating proposal: {e}", debug_log
     
-    def get_work_examples(self, keywords):
-        """Get work examples from Google Play Store"""
-        debug_log = []
-        debug_log.append(f"Starting Google Play Store search with keywords: {keywords}")
-        # Updated search functionality
+    def proposal_stages(self):
+        """keywords -> Play Store searches (2 keywords x countries) -> examples -> proposal.
         
-        try:
-            from google_play_scraper import search
-            debug_log.append("Google Play Scraper imported successfully")
-        except ImportError:
-            debug_log.append("ERROR: google-play-scraper not installed")
-            return self.get_fallback_examples(keywords), debug_log
+        Every stage result is a (value, debug_log) pair. Run inputs: job, rss_id, force_refresh.
+        """
+        def keyword_fallback(results, error):
+            keywords = random.sample(GENERIC_KEYWORDS, 2)
+            return keywords, [f"Keyword extraction failed: {error}", f"Using fallback keywords: {keywords}"]
         
-        examples = []
+        stages = [Stage('keywords', lambda r: self.extract_keywords(r['job'][2], r['rss_id'], r['force_refresh']),
+                        timeout=PROPOSAL_KEYWORDS_TIMEOUT, fallback=keyword_fallback)]
+        stages.extend(play_store.stages(timeout=PLAY_SEARCH_TIMEOUT))
         
-        # Search each keyword
-        for i, keyword in enumerate(keywords[:2]):
-            try:
-                debug_log.append(f"Searching keyword {i+1}: '{keyword}'")
-                
-                # Try multiple countries to get results
-                countries = ['us', 'gb', 'ca', 'au']
-                apps_found = []
-                
-                for country in countries:
-                    try:
-                        debug_log.append(f"Searching '{keyword}' in {country}")
-                        results = search(
-                            keyword,
-                            lang="en",
-                            country=country,
-                            n_hits=20
-                        )
-                        
-                        if results:
-                            debug_log.append(f"Found {len(results)} results for '{keyword}' in {country}")
-                        else:
-                            debug_log.append(f"No results found for '{keyword}' in {country}")
-                            continue
-                            
-                            for app in results:
-                                try:
-                                    # Accept ALL apps regardless of score
-                                    app_data = {
-                                        'name': app.get('title', 'Unknown App'),
-                                        'description': str(app.get('description', 'No description'))[:200] + '...',
-                                        'url': f"https://play.google.com/store/apps/details?id={app.get('appId', '')}",
-                                        'installs': str(app.get('installs', '0')),
-                                        'score': app.get('score', 0)
-                                    }
-                                    apps_found.append(app_data)
-                                    debug_log.append(f"Added app: {app_data['name']}")
-                                except Exception as e:
-                                    debug_log.append(f"Error processing app: {e}")
-                                    continue
-                            
-                            if len(apps_found) >= 10:
-                                break
-                                
-                    except Exception as e:
-                        debug_log.append(f"Error searching {country}: {e}")
-                        continue
-                
-                # Add apps per keyword
-                keyword_apps = apps_found[:10]
-                examples.extend(keyword_apps)
-                debug_log.append(f"Added {len(keyword_apps)} apps for '{keyword}'")
-                
-            except Exception as e:
-                debug_log.append(f"Error with keyword '{keyword}': {e}")
+        def proposal(r):
+            job = r['job']
+            return self.generate_proposal(job[1], job[2], r['examples'][0], self.proposal_first_name(job),
+                                          r['rss_id'], r['force_refresh'])
         
-        # If we got real apps, return them
-        if examples:
-            # Remove duplicates by app ID
-            seen_ids = set()
-            unique_examples = []
-            for app in examples:
-                app_id = app['url'].split('id=')[-1] if 'id=' in app['url'] else app['name']
-                if app_id not in seen_ids:
-                    seen_ids.add(app_id)
-                    unique_examples.append(app)
+        stages.append(Stage('proposal', proposal, deps=('examples',), timeout=PROPOSAL_LLM_TIMEOUT))
+        return stages
+    
+    def proposal_first_name(self, job):
+        """Client first name for the greeting: enriched name, then the job's client name, else 'there'"""
+        client_first_name = job[9] or job[16] or 'there'
+        if client_first_name != 'there':
+            client_first_name = client_first_name.split()[0]
+        return client_first_name
+    
+    def pipeline_debug_log(self, results, timings, total):
+        """Stage debug logs followed by a line per stage timing and the slowest stage"""
+        debug_log = []
+        for name in timings:
+            if results.get(name) is not None:
+                debug_log.extend(results[name][1])
+        ran = {name: timing for name, timing in timings.items() if timing.status != 'skipped'}
+        for name, timing in ran.items():
+            status = '' if timing.status == 'ok' else f" ({timing.status})"
+            debug_log.append(f"Stage {name}: {timing.seconds * 1000:.0f} ms{status}")
+        slowest = max(ran, key=lambda name: ran[name].seconds)
+        debug_log.append(f"Pipeline: {total * 1000:.0f} ms, slowest stage {slowest}")
+        return debug_log
+    
+    def build_proposal(self, job, rss_id, force_refresh=False):
+        """Run the proposal pipeline for a jobs row: (proposal, examples, keywords, debug_log)"""
+        started = time.perf_counter()
+        results, timings = self.proposal_pipeline.run(self.proposal_executor,
+                                                      {'job': job, 'rss_id': rss_id, 'force_refresh': force_refresh})
+        total = time.perf_counter() - started
+        self.proposal_metrics.observe(timings, total)
+        debug_log = self.pipeline_debug_log(results, timings, total)
+        return results['proposal'][0], results['examples'][0], results['keywords'][0], debug_log
+    
+    def stream_proposal(self, job, rss_id, force_refresh=False):
+        """build_proposal with the proposal text streamed. Yields (event, data): 'context' with the keywords
+        and examples once they are known, 'delta' for each piece of proposal text that is final, then
+        'done' with what build_proposal returns, or 'error' if the completion fails."""
+        started = time.perf_counter()
+        results, timings = self.proposal_context_pipeline.run(
+            self.proposal_executor, {'job': job, 'rss_id': rss_id, 'force_refresh': force_refresh})
+        examples, keywords = results['examples'][0], results['keywords'][0]
+        yield 'context', {'examples': examples, 'keywords': keywords}
+        
+        prompt, debug_log = self.proposal_prompt(job[1], job[2], examples, self.proposal_first_name(job), rss_id)
+        results['proposal'] = (None, debug_log)
+        stage_started = time.perf_counter()
+        first_piece = None
+        text = StreamedCopyText(format=None)  # proposals are stored as written, only stripped
+        try:
+            debug_log.append("Streaming proposal from OpenAI...")
+            pieces, cached = self.chat_stream(prompt, 1000, force_refresh, timeout=PROPOSAL_LLM_TIMEOUT)
+            for piece in pieces:
+                if first_piece is None:
+                    first_piece = time.perf_counter() - stage_started
+                delta = text.feed(piece)
+                if delta:
+                    yield 'delta', {'text': delta}
+            delta = text.close()
+            if delta:
+                yield 'delta', {'text': delta}
+        except Exception as e:
+            timings['proposal'] = pipeline.StageTiming(time.perf_counter() - stage_started, 'error')
+            self.proposal_metrics.observe(timings, time.perf_counter() - started)
+            debug_log.append(f"Proposal generation failed: {str(e)}")
+            yield 'error', {'error': f"Error generating proposal: {e}",
+                            'debug_log': self.pipeline_debug_log(results, timings, time.perf_counter() - started)}
+            return
+        
+        timings['proposal'] = pipeline.StageTiming(time.perf_counter() - stage_started, 'ok')
+        total = time.perf_counter() - started
+        self.proposal_metrics.observe(timings, total)
+        debug_log.append("Proposal served from the LLM cache" if cached else
+                         f"Proposal streamed, first text after {(first_piece or 0) * 1000:.0f} ms")
+        yield 'done', {'proposal': text.text.strip(), 'examples': examples, 'keywords': keywords,
+                       'debug_log': self.pipeline_debug_log(results, timings, total), 'cached': cached}
+    
+    def save_proposal(self, job_id, proposal, examples, debug_log, replace=True):
+        """Store a job's proposal and mark the job processed. With replace=False an existing proposal
+        is kept; returns whether this one was stored."""
+        conn = self.get_db_connection()
+        c = conn.cursor()
+        is_postgres = os.getenv('DATABASE_URL') is not None
+        p = '%s' if is_postgres else '?'
+        values = (job_id, proposal, json.dumps(examples), datetime.now().isoformat(), json.dumps(debug_log))
+        
+        if not replace:
+            c.execute(f"""INSERT INTO proposals (job_id, proposal, examples, created_at, debug_log)
+                          VALUES ({p}, {p}, {p}, {p}, {p}) ON CONFLICT (job_id) DO NOTHING""", values)
+            stored = c.rowcount > 0
+        elif is_postgres:
+            # Check if proposal exists, update or insert
+            c.execute("SELECT id FROM proposals WHERE job_id = %s", (job_id,))
+            existing = c.fetchone()
             
-            unique_examples.sort(key=lambda x: x['score'], reverse=True)
-            debug_log.append(f"Returning {len(unique_examples)} real Google Play Store apps")
-            return unique_examples[:10], debug_log
-        
-        # Fallback if no real apps found
-        debug_log.append("No real apps found, using fallback")
-        return self.get_fallback_examples(keywords), debug_log
-    
-    def get_fallback_examples(self, keywords):
-        """Fallback examples when Google Play Store fails"""
-        return [
-            {
-                'name': 'ChatGPT',
-                'description': 'The official ChatGPT app by OpenAI. Get instant answers, find creative inspiration, learn something new...',
-                'url': 'https://play.google.com/store/apps/details?id=com.openai.chatgpt',
-                'installs': '50,000,000+',
-                'score': 4.5
-            },
-            {
-                'name': 'Google Assistant',
-                'description': 'Meet your Google Assistant. Ask it questions. Tell it to do things. It is your own personal Google...',
-                'url': 'https://play.google.com/store/apps/details?id=com.google.android.apps.googleassistant',
-                'installs': '1,000,000,000+',
-                'score': 4.1
-            },
-            {
-                'name': 'Replika: My AI Friend',
-                'description': 'Replika is an AI companion who is eager to learn and would love to see the world through your eyes...',
-                'url': 'https://play.google.com/store/apps/details?id=ai.replika.app',
-                'installs': '10,000,000+',
-                'score': 4.2
-            },
-            {
-                'name': 'Speechify Text to Speech Voice',
-                'description': 'Listen to docs, articles, PDFs, email — anything you read — by adding audio to any text with Speechify...',
-                'url': 'https://play.google.com/store/apps/details?id=com.cliffweitzman.speechify2',
-                'installs': '5,000,000+',
-                'score': 4.4
-            },
-            {
-                'name': 'Voice Recorder',
-                'description': 'Simple and reliable voice recorder that allows you to record voice memos and important meetings...',
-                'url': 'https://play.google.com/store/apps/details?id=com.media.bestrecorder.audiorecorder',
-                'installs': '100,000,000+',
-                'score': 4.6
-            }
-        ]
+            if existing:
+                c.execute("""UPDATE proposals SET 
+                            proposal = %s, examples = %s, created_at = %s, debug_log = %s
+                            WHERE job_id = %s""",
+                         values[1:] + (job_id,))
+            else:
+                c.execute("""INSERT INTO proposals 
+                            (job_id, proposal, examples, created_at, debug_log)
+                            VALUES (%s, %s, %s, %s, %s)""",
+                         values)
+            stored = True
+        else:
+            c.execute("""INSERT OR REPLACE INTO proposals 
+                        (job_id, proposal, examples, created_at, debug_log)
+                        VALUES (?, ?, ?, ?, ?)""",
+                     values)
+            stored = True
+        if stored:
+            queries.execute(c, 'mark_job_processed', (job_id,))
+        
+        conn.commit()
+        conn.close()
+        return stored
+    
+    def auto_proposal_feed_ids(self):
+        return [feed[0] for feed in self.feed_configs.all() if self.feed_configs.field(feed[0], 'auto_proposals')]
+    
+    def queue_auto_proposals(self, jobs):
+        """Queue (id, description, skills, posted_at) jobs for background proposals, best team match
+        and newest first"""
+        if not self.auto_proposals.running or not jobs:
+            return
+        profiles = self.get_team_profiles()
+        now = datetime.now()
+        for job_id, description, skills, posted_at in jobs:
+            matches = self.match_job_to_team(description or '', skills or '', profiles)
+            posted = parse_posted_date(posted_at) or now
+            age_hours = max((now - posted).total_seconds(), 0) / 3600
+            self.auto_proposals.submit(job_id, auto_proposals.priority(matches[0]['match_score'] if matches else 0,
+                                                                       age_hours, AUTO_PROPOSAL_AGE_PENALTY))
+    
+    def sweep_auto_proposals(self):
+        """Queue recent jobs of auto-proposal feeds that still have no proposal"""
+        feed_ids = self.auto_proposal_feed_ids()
+        if not feed_ids:
+            return
+        p = '%s' if os.getenv('DATABASE_URL') else '?'
+        since = (datetime.now() - timedelta(hours=AUTO_PROPOSAL_MAX_AGE_HOURS)).strftime(POSTED_AT_FORMAT)
+        with self.read_pool.connection() as conn:
+            c = conn.cursor()
+            c.execute(f"""SELECT id, description, skills, posted_at FROM jobs
+                          WHERE rss_source_id IN ({', '.join([p] * len(feed_ids))}) AND posted_at >= {p}
+                            AND duplicate_of IS NULL
+                            AND NOT EXISTS (SELECT 1 FROM proposals WHERE proposals.job_id = jobs.id)
+                          ORDER BY posted_at DESC LIMIT {int(AUTO_PROPOSAL_MAX_QUEUED)}""",
+                      (*feed_ids, since))
+            jobs = c.fetchall()
+        self.queue_auto_proposals(jobs)
+    
+    def generate_auto_proposal(self, job_id):
+        """Background worker: generate and store a proposal unless the job already has one"""
+        with self.read_pool.connection() as conn:
+            c = conn.cursor()
+            p = '%s' if os.getenv('DATABASE_URL') else '?'
+            c.execute(f"SELECT * FROM jobs WHERE id = {p}", (job_id,))
+            job = c.fetchone()
+            c.execute(f"SELECT 1 FROM proposals WHERE job_id = {p}", (job_id,))
+            has_proposal = c.fetchone() is not None
+        if job is None or has_proposal:
+            return False
+        
+        # rss_source_id is column 23 of the jobs table
+        proposal, examples, keywords, debug_log = self.build_proposal(job, job[23])
+        if proposal.startswith('Error generating proposal'):
+            raise RuntimeError(proposal)
+        debug_log.insert(0, "Generated in the background when the job was ingested")
+        return self.save_proposal(job_id, proposal, examples, debug_log, replace=False)
     
     def import_team_profiles(self, cursor, is_postgres=False):
         """Import team profiles from CSV data"""
@@ -666,16 +1043,17 @@ class MultiRSSProposalSystem:
                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", profile)
     
     def get_team_profiles(self):
-        conn = self.get_db_connection()
+        conn = self.get_db_connection(readonly=True)
         c = conn.cursor()
         c.execute("SELECT * FROM team_profiles ORDER BY name")
         profiles = c.fetchall()
         conn.close()
         return profiles
     
-    def match_job_to_team(self, job_description, job_skills):
+    def match_job_to_team(self, job_description, job_skills, profiles=None):
         """Match job requirements to team member skills"""
-        profiles = self.get_team_profiles()
+        if profiles is None:
+            profiles = self.get_team_profiles()
         matches = []
         
         job_text = (job_description + " " + job_skills).lower()
@@ -727,7 +1105,7 @@ def login():
         email = request.form['email']
         password = request.form['password']
         
-        conn = system.get_db_connection()
+        conn = system.get_db_connection(readonly=True)
         c = conn.cursor()
         if os.getenv('DATABASE_URL'):
             c.execute("SELECT * FROM users WHERE email = %s AND password = %s AND active = 1", (email, password))
@@ -759,19 +1137,29 @@ def index():
 @login_required
 def rss_jobs(rss_id):
     feeds = system.get_rss_feeds()
-    jobs = system.get_jobs_by_rss(rss_id)
+    try:
+        jobs, next_cursor = system.get_jobs_page('feed', rss_id, request.args.get('cursor'), request.args.get('limit', type=int),
+                                                 include_archived=request.args.get('archived') == '1')
+    except ValueError:
+        return redirect(url_for('rss_jobs', rss_id=rss_id))
     current_feed = next((f for f in feeds if f[0] == rss_id), None)
-    return render_template('rss_jobs.html', feeds=feeds, jobs=jobs, current_feed=current_feed)
+    return render_template('rss_jobs.html', feeds=feeds, jobs=jobs, current_feed=current_feed,
+                           next_cursor=next_cursor, is_first_page=not request.args.get('cursor'))
 
 @app.route('/rss/chrome')
 @login_required
 def chrome_jobs():
     feeds = system.get_rss_feeds()
     # Find Manual Jobs RSS feed (Chrome extension uses this)
-    manual_feed = next((f for f in feeds if f[1] == "Manual Jobs"), None)
+    manual_feed = system.feed_configs.get(system.feed_configs.id_for("Manual Jobs"))
     if manual_feed:
-        jobs = system.get_jobs_by_rss(manual_feed[0])
-        return render_template('rss_jobs.html', feeds=feeds, jobs=jobs, current_feed=manual_feed)
+        try:
+            jobs, next_cursor = system.get_jobs_page('feed', manual_feed[0], request.args.get('cursor'), request.args.get('limit', type=int),
+                                                     include_archived=request.args.get('archived') == '1')
+        except ValueError:
+            return redirect(url_for('chrome_jobs'))
+        return render_template('rss_jobs.html', feeds=feeds, jobs=jobs, current_feed=manual_feed,
+                               next_cursor=next_cursor, is_first_page=not request.args.get('cursor'))
     else:
         return "Chrome extension RSS feed not found", 404
 
@@ -790,43 +1178,94 @@ def team_management():
 @app.route('/enriched-jobs')
 @login_required
 def enriched_jobs():
-    conn = system.get_db_connection()
-    c = conn.cursor()
-    is_postgres = os.getenv('DATABASE_URL') is not None
-    
-    # Order by posted_date since enriched_at column doesn't exist in PostgreSQL yet
-    if is_postgres:
-        c.execute("""SELECT id, title, description, url, client, budget, posted_date, processed,
-                     client_type, client_name, client_company, client_city, client_country, 
-                     linkedin_url, email, phone, whatsapp, enriched, decision_maker, skills, 
-                     categories, hourly_rate, site, rss_source_id, outreach_status, 
-                     proposal_status, submitted_by, enriched_at, enriched_by
-                     FROM jobs WHERE enriched = 1 AND (outreach_status != 'Sent' OR outreach_status IS NULL) ORDER BY CAST(posted_date AS TIMESTAMP) DESC""")
-    else:
-        c.execute("SELECT * FROM jobs WHERE enriched = 1 AND (outreach_status != 'Sent' OR outreach_status IS NULL) ORDER BY datetime(posted_date) DESC")
-    jobs = c.fetchall()
-    conn.close()
-    return render_template('enriched_jobs.html', jobs=jobs)
+    try:
+        jobs, next_cursor = system.get_jobs_page('enriched', cursor=request.args.get('cursor'), limit=request.args.get('limit', type=int))
+    except ValueError:
+        return redirect(url_for('enriched_jobs'))
+    return render_template('enriched_jobs.html', jobs=jobs, next_cursor=next_cursor,
+                           is_first_page=not request.args.get('cursor'))
 
 @app.route('/sent-jobs')
 @login_required
 def sent_jobs():
-    conn = system.get_db_connection()
+    try:
+        jobs, next_cursor = system.get_jobs_page('sent', cursor=request.args.get('cursor'), limit=request.args.get('limit', type=int))
+    except ValueError:
+        return redirect(url_for('sent_jobs'))
+    return render_template('sent_jobs.html', jobs=jobs, next_cursor=next_cursor,
+                           is_first_page=not request.args.get('cursor'))
+
+@app.route('/api/jobs/<view>')
+def jobs_page_api(view):
+    """One page of a job list tab as JSON (view = feed | enriched | sent)"""
+    # Allow Chrome extension requests
+    if 'user_email' not in session and request.headers.get('X-Chrome-Extension') != 'mindwork':
+        return jsonify({'error': 'Authentication required'}), 401
+    if view not in job_lists.VIEWS:
+        return jsonify({'success': False, 'error': f'Unknown view: {view}'}), 404
+    
+    rss_id = request.args.get('rss_id', type=int)
+    if view == 'feed' and rss_id is None:
+        return jsonify({'success': False, 'error': 'rss_id is required for the feed view'}), 400
+    
+    try:
+        jobs, next_cursor = system.get_jobs_page(view, rss_id, request.args.get('cursor'), request.args.get('limit', type=int),
+                                                 include_archived=request.args.get('archived') == '1')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    columns = [field.split()[-1] for field in job_lists.FIELDS]
+    return jsonify({
+        'success': True,
+        'jobs': [{col: (str(value) if isinstance(value, datetime) else value) for col, value in zip(columns, job)} for job in jobs],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/job/<job_id>/details')
+@login_required
+def job_details_api(job_id):
+    """Full description, skills and categories for a job card, loaded when it is expanded"""
+    conn = system.get_db_connection(readonly=True)
     c = conn.cursor()
-    is_postgres = os.getenv('DATABASE_URL') is not None
+    job = None
+    for statement in ('job_details', 'archived_job_details'):
+        queries.execute(c, statement, (job_id,))
+        job = c.fetchone()
+        if job:
+            break
+    conn.close()
     
-    if is_postgres:
-        c.execute("""SELECT id, title, description, url, client, budget, posted_date, processed,
-                     client_type, client_name, client_company, client_city, client_country, 
-                     linkedin_url, email, phone, whatsapp, enriched, decision_maker, skills, 
-                     categories, hourly_rate, site, rss_source_id, outreach_status, 
-                     proposal_status, submitted_by, enriched_at, enriched_by
-                     FROM jobs WHERE enriched = 1 AND outreach_status = 'Sent' ORDER BY CAST(posted_date AS TIMESTAMP) DESC""")
-    else:
-        c.execute("SELECT * FROM jobs WHERE enriched = 1 AND outreach_status = 'Sent' ORDER BY datetime(posted_date) DESC")
-    jobs = c.fetchall()
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'description': job[0] or '',
+        'skills': job[1] or 'Not specified',
+        'categories': job[2] or 'Not specified'
+    })
+
+@app.route('/api/job/<job_id>/proposal')
+@login_required
+def job_proposal_api(job_id):
+    """The stored proposal of a job (generated on request or in the background)"""
+    conn = system.get_db_connection(readonly=True)
+    c = conn.cursor()
+    p = '%s' if os.getenv('DATABASE_URL') else '?'
+    c.execute(f"SELECT proposal, examples, debug_log, created_at FROM proposals WHERE job_id = {p}", (job_id,))
+    row = c.fetchone()
     conn.close()
-    return render_template('sent_jobs.html', jobs=jobs)
+    
+    if not row:
+        return jsonify({'success': False, 'error': 'No proposal yet'}), 404
+    
+    return jsonify({
+        'success': True,
+        'proposal': row[0],
+        'examples': json.loads(row[1]) if row[1] else [],
+        'debug_log': json.loads(row[2]) if row[2] else [],
+        'created_at': row[3]
+    })
 
 @app.route('/leads')
 @login_required
@@ -1061,12 +1500,13 @@ def add_rss():
                  (data['name'], data['url'], data['keyword_prompt'], 
                   data['proposal_prompt'], data['olostep_prompt']))
         rss_id = c.lastrowid
+    system.feed_configs.invalidate(c)
     
     conn.commit()
     conn.close()
     
-    # Start fetcher for new RSS
-    system.start_rss_fetcher(rss_id, data['url'])
+    # Start polling the new feed
+    system.feeds.start(rss_id, data['url'], name=data['name'])
     
     return jsonify({'success': True, 'rss_id': rss_id})
 
@@ -1081,17 +1521,49 @@ def toggle_rss(rss_id):
         c.execute("UPDATE rss_feeds SET active = 1 - active WHERE id = ?", (rss_id,))
         c.execute("SELECT active FROM rss_feeds WHERE id = ?", (rss_id,))
     new_status = c.fetchone()[0]
+    system.feed_configs.invalidate(c)
     conn.commit()
     conn.close()
     
+    if new_status == 1:
+        system.feeds.resume(rss_id)
+    else:
+        system.feeds.pause(rss_id)
+    
     return jsonify({'success': True, 'active': new_status})
 
 @app.route('/update_prompts/<int:rss_id>', methods=['POST'])
 def update_prompts(rss_id):
     data = request.json
     
+    poll_interval = ...
+    if 'poll_interval' in data:
+        # Blank means adaptive scheduling
+        raw_interval = str(data['poll_interval'] or '').strip()
+        try:
+            poll_interval = int(raw_interval) if raw_interval else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Poll interval must be a whole number of seconds'})
+        if poll_interval is not None and poll_interval < FEED_POLL_MIN_INTERVAL:
+            return jsonify({'success': False, 'error': f'Poll interval must be at least {FEED_POLL_MIN_INTERVAL} seconds'})
+    
     conn = system.get_db_connection()
     c = conn.cursor()
+    p = '%s' if os.getenv('DATABASE_URL') else '?'
+    
+    if poll_interval is not ...:
+        c.execute(f"UPDATE rss_feeds SET poll_interval = {p} WHERE id = {p}", (poll_interval, rss_id))
+    
+    if 'auto_proposals' in data:
+        c.execute(f"UPDATE rss_feeds SET auto_proposals = {p} WHERE id = {p}", (1 if data['auto_proposals'] else 0, rss_id))
+    
+    url = (data.get('url') or '').strip() or None
+    if url:
+        # Conditional GET validators and the high-water mark belong to the old URL
+        c.execute(f"""UPDATE rss_feeds SET url = {p}, etag = NULL, modified = NULL, content_hash = NULL,
+                          last_published_at = NULL, recent_guids = NULL
+                      WHERE id = {p} AND url != {p}""", (url, rss_id, url))
+    
     if os.getenv('DATABASE_URL'):
         c.execute("""UPDATE rss_feeds SET 
                      keyword_prompt = %s, proposal_prompt = %s, olostep_prompt = %s
@@ -1104,9 +1576,12 @@ def update_prompts(rss_id):
                      WHERE id = ?""",
                  (data['keyword_prompt'], data['proposal_prompt'], 
                   data['olostep_prompt'], rss_id))
+    system.feed_configs.invalidate(c)
     conn.commit()
     conn.close()
     
+    system.feeds.reconfigure(rss_id, url=url, poll_interval=poll_interval)
+    
     return jsonify({'success': True})
 
 @app.route('/generate_proposal', methods=['POST'])
@@ -1114,6 +1589,8 @@ def generate_proposal():
     data = request.json
     job_id = data['job_id']
     rss_id = data['rss_id']
+    # Bypass the LLM cache and store a fresh completion
+    force_refresh = bool(data.get('force_refresh'))
     
     # Get job details
     conn = system.get_db_connection()
@@ -1129,51 +1606,11 @@ def generate_proposal():
         return jsonify({'error': 'Job not found'})
     
     try:
-        # Extract keywords and generate proposal
-        keywords, debug_log = system.extract_keywords(job[2], rss_id)
-        examples, examples_debug = system.get_work_examples(keywords)
-        debug_log.extend(examples_debug)
-        
-        client_first_name = job[9] or job[16] or 'there'
-        if client_first_name != 'there':
-            client_first_name = client_first_name.split()[0]
-        
-        proposal, proposal_debug = system.generate_proposal(job[1], job[2], examples, client_first_name, rss_id)
-        debug_log.extend(proposal_debug)
+        # Extract keywords, search work examples and generate the proposal (see proposal_stages)
+        proposal, examples, keywords, debug_log = system.build_proposal(job, rss_id, force_refresh)
         
         # Save proposal
-        conn = system.get_db_connection()
-        c = conn.cursor()
-        is_postgres = os.getenv('DATABASE_URL') is not None
-        
-        if is_postgres:
-            # Check if proposal exists, update or insert
-            c.execute("SELECT id FROM proposals WHERE job_id = %s", (job_id,))
-            existing = c.fetchone()
-            
-            if existing:
-                c.execute("""UPDATE proposals SET 
-                            proposal = %s, examples = %s, created_at = %s, debug_log = %s
-                            WHERE job_id = %s""",
-                         (proposal, json.dumps(examples), datetime.now().isoformat(), 
-                          json.dumps(debug_log), job_id))
-            else:
-                c.execute("""INSERT INTO proposals 
-                            (job_id, proposal, examples, created_at, debug_log)
-                            VALUES (%s, %s, %s, %s, %s)""",
-                         (job_id, proposal, json.dumps(examples), datetime.now().isoformat(), 
-                          json.dumps(debug_log)))
-            c.execute("UPDATE jobs SET processed = 1 WHERE id = %s", (job_id,))
-        else:
-            c.execute("""INSERT OR REPLACE INTO proposals 
-                        (job_id, proposal, examples, created_at, debug_log)
-                        VALUES (?, ?, ?, ?, ?)""",
-                     (job_id, proposal, json.dumps(examples), datetime.now().isoformat(), 
-                      json.dumps(debug_log)))
-            c.execute("UPDATE jobs SET processed = 1 WHERE id = ?", (job_id,))
-        
-        conn.commit()
-        conn.close()
+        system.save_proposal(job_id, proposal, examples, debug_log)
         
         return jsonify({
             'proposal': proposal,
@@ -1184,6 +1621,49 @@ def generate_proposal():
     except Exception as e:
         return jsonify({'error': str(e), 'debug_log': [f'Error: {str(e)}']})
 
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream (event, data) pairs to the browser as they are produced"""
+    def generate():
+        yield ': stream open\n\n'  # flushes the headers through proxies right away
+        for event, data in events:
+            yield sse_event(event, data)
+    # X-Accel-Buffering stops nginx (and Railway's proxy) from holding the stream back
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/generate_proposal/stream', methods=['POST'])
+def generate_proposal_stream():
+    """/generate_proposal as Server-Sent Events: context, delta..., then done (or error). The proposal is
+    saved once the stream has finished."""
+    data = request.json
+    job_id = data['job_id']
+    rss_id = data['rss_id']
+    force_refresh = bool(data.get('force_refresh'))
+    
+    with system.read_pool.connection() as conn:
+        c = conn.cursor()
+        p = '%s' if os.getenv('DATABASE_URL') else '?'
+        c.execute(f"SELECT * FROM jobs WHERE id = {p}", (job_id,))
+        job = c.fetchone()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'})
+    
+    def events():
+        try:
+            for event, payload in system.stream_proposal(job, rss_id, force_refresh):
+                if event == 'done':
+                    system.save_proposal(job_id, payload['proposal'], payload['examples'], payload['debug_log'])
+                yield event, payload
+        except Exception as e:
+            yield 'error', {'error': str(e), 'debug_log': [f'Error: {str(e)}']}
+    
+    return sse_response(events())
+
 @app.route('/enrich_client', methods=['POST'])
 def enrich_client():
     try:
@@ -1296,45 +1776,20 @@ def enrich_client():
         conn = system.get_db_connection()
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
-        
-        # Add columns if they don't exist (skip for PostgreSQL as they should exist)
-        if not is_postgres:
-            try:
-                c.execute('ALTER TABLE jobs ADD COLUMN enriched_at TEXT')
-            except:
-                pass  # Column already exists
-            
-            try:
-                c.execute('ALTER TABLE jobs ADD COLUMN outreach_status TEXT DEFAULT "Pending"')
-            except:
-                pass  # Column already exists
-                
-            try:
-                c.execute('ALTER TABLE jobs ADD COLUMN proposal_status TEXT DEFAULT "Not Submitted"')
-            except:
-                pass  # Column already exists
-                
-            try:
-                c.execute('ALTER TABLE jobs ADD COLUMN submitted_by TEXT')
-            except:
-                pass  # Column already exists
-                
-            try:
-                c.execute('ALTER TABLE jobs ADD COLUMN enriched_by TEXT')
-            except:
-                pass  # Column already exists
+        before = rollups.job_snapshot(c, job_id, is_postgres)
         
         if is_postgres:
             c.execute("""UPDATE jobs SET 
                         client_name = %s, client_company = %s, 
                         client_city = %s, client_country = %s, linkedin_url = %s, 
                         email = %s, phone = %s, whatsapp = %s, enriched = 1,
-                        decision_maker = %s, enriched_by = %s
+                        decision_maker = %s, enriched_by = %s, enriched_at = %s
                         WHERE id = %s""",
                      (final_person_name, final_company_name, 
                       city, country, result.get('linkedin', ''), 
                       result.get('email', ''), result.get('phone', ''), 
-                      result.get('whatsapp', ''), search_target, enrichment_author, job_id))
+                      result.get('whatsapp', ''), search_target, enrichment_author, 
+                      datetime.now().isoformat(), job_id))
         else:
             c.execute("""UPDATE jobs SET 
                         client_name = ?, client_company = ?, 
@@ -1347,6 +1802,7 @@ def enrich_client():
                       result.get('email', ''), result.get('phone', ''), 
                       result.get('whatsapp', ''), search_target, enrichment_author, 
                       datetime.now().isoformat(), job_id))
+        rollups.apply_change(c, before, rollups.job_snapshot(c, job_id, is_postgres), is_postgres)
         
         conn.commit()
         conn.close()
@@ -1373,7 +1829,7 @@ def api_login():
     email = data.get('email')
     password = data.get('password')
     
-    conn = system.get_db_connection()
+    conn = system.get_db_connection(readonly=True)
     c = conn.cursor()
     if os.getenv('DATABASE_URL'):
         c.execute("SELECT * FROM users WHERE email = %s AND password = %s AND active = 1", (email, password))
@@ -1408,19 +1864,9 @@ def check_job():
     if not job_url:
         return jsonify({'exists': False, 'error': 'URL required'})
     
-    # Generate job ID using same logic as create-job
-    url_for_id = job_url.split('?')[0]  # Remove query parameters
-    title_for_id = job_title.strip()
-    id_string = f"{url_for_id}_{title_for_id}"
-    job_id = hashlib.md5(id_string.encode()).hexdigest()
-    
-    conn = system.get_db_connection()
+    conn = system.get_db_connection(readonly=True)
     c = conn.cursor()
-    if os.getenv('DATABASE_URL'):
-        c.execute("SELECT id FROM jobs WHERE id = %s", (job_id,))
-    else:
-        c.execute("SELECT id FROM jobs WHERE id = ?", (job_id,))
-    result = c.fetchone()
+    result = system.find_job(c, job_url, job_keys.extension_job_id(job_url, job_title))
     conn.close()
     
     if result:
@@ -1461,25 +1907,18 @@ def enrich_job():
     if not job_url:
         return jsonify({'success': False, 'error': 'Job URL is required'})
     
-    # Generate job ID using same logic as create-job
-    url_for_id = job_url.split('?')[0]  # Remove query parameters
-    title_for_id = job_title.strip()
-    id_string = f"{url_for_id}_{title_for_id}"
-    job_id = hashlib.md5(id_string.encode()).hexdigest()
+    job_id = job_keys.extension_job_id(job_url, job_title)
     
     try:
         conn = system.get_db_connection()
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
         
-        # Check if job exists
-        if is_postgres:
-            c.execute("SELECT id, enriched FROM jobs WHERE id = %s", (job_id,))
-        else:
-            c.execute("SELECT id, enriched FROM jobs WHERE id = ?", (job_id,))
-        existing_job = c.fetchone()
+        # Check if job exists (whichever path stored it)
+        existing_job = system.find_job(c, job_url, job_id, restore=True)
         
         if existing_job:
+            job_id = existing_job[0]
             # Job exists - update enrichment fields only if not already enriched
             if existing_job[1] != 1:  # Not enriched yet
                 if is_postgres:
@@ -1537,11 +1976,9 @@ def create_job():
         extension_name = 'mindwork'
         print(f"DETECTED: MindWork extension (basic job data only)")
     
-    # Generate job ID from URL + title to handle slight URL variations
-    url_for_id = data['url'].split('?')[0]  # Remove query parameters
-    title_for_id = data.get('title', '').strip()
-    id_string = f"{url_for_id}_{title_for_id}"
-    job_id = hashlib.md5(id_string.encode()).hexdigest()
+    # Id for a new job; an existing one is found by its Upwork key (see job_keys.py)
+    job_id = job_keys.extension_job_id(data['url'], data.get('title', ''))
+    upwork_key = job_keys.upwork_key(data['url'])
     
     try:
         conn = system.get_db_connection()
@@ -1549,22 +1986,28 @@ def create_job():
         is_postgres = os.getenv('DATABASE_URL') is not None
         
         # Use provided RSS ID or default to Manual Jobs
-        rss_id = data.get('rss_id')
-        if not rss_id:
-            if is_postgres:
-                c.execute("SELECT id FROM rss_feeds WHERE name = %s LIMIT 1", ('Manual Jobs',))
-            else:
-                c.execute("SELECT id FROM rss_feeds WHERE name = ? LIMIT 1", ('Manual Jobs',))
-            result = c.fetchone()
-            if result:
-                rss_id = result[0]
+        rss_id = data.get('rss_id') or system.feed_configs.id_for('Manual Jobs')
         
-        # Check if job already exists
-        if is_postgres:
-            c.execute("SELECT id, enriched FROM jobs WHERE id = %s", (job_id,))
-        else:
-            c.execute("SELECT id, enriched FROM jobs WHERE id = ?", (job_id,))
-        existing_job = c.fetchone()
+        # Check if job already exists, e.g. stored by the RSS fetcher under its link's id
+        existing_job = system.find_job(c, data['url'], job_id, restore=True)
+        if existing_job:
+            job_id = existing_job[0]
+        
+        # Otherwise look for the same job stored under another id (its RSS entry, or a repost)
+        fingerprint = near_dup.simhash(data.get('title', ''), data.get('description', ''))
+        duplicate_of = None
+        near_dup_info = {}
+        if not existing_job:
+            match = near_dup.find(c, fingerprint, NEAR_DUP_MAX_DISTANCE, is_postgres)
+            if match and NEAR_DUP_ACTION == 'merge':
+                print(f"Job {job_id} is a near-duplicate of {match[0]} ({match[1]} bits), merging")
+                near_dup_info = {'merged_from': job_id}
+                job_id = match[0]
+                queries.execute(c, 'job_enriched_flag', (job_id,))
+                existing_job = c.fetchone()
+            elif match:
+                duplicate_of = match[0]
+                near_dup_info = {'duplicate_of': duplicate_of}
         
         if existing_job:
             # Job exists - update with new data
@@ -1593,6 +2036,10 @@ def create_job():
                     update_fields.append(field)
                     update_values.append(value)
             
+            if 'title' in update_fields and 'description' in update_fields:
+                update_fields.append('simhash')
+                update_values.append(fingerprint)
+            
             if update_fields:
                 update_values.append(job_id)
                 
@@ -1607,41 +2054,50 @@ def create_job():
                 c.execute(query, tuple(update_values))
                 conn.commit()
                 conn.close()
-                return jsonify({'success': True, 'jobId': job_id, 'action': 'updated', 'extension': extension_name, 'updated_fields': update_fields})
+                return jsonify({'success': True, 'jobId': job_id, 'action': 'updated', 'extension': extension_name, 'updated_fields': update_fields, **near_dup_info})
             else:
+                conn.commit()  # keeps a job find_job restored from the archive
                 conn.close()
-                return jsonify({'success': True, 'jobId': job_id, 'action': 'no_updates', 'extension': extension_name})
+                return jsonify({'success': True, 'jobId': job_id, 'action': 'no_updates', 'extension': extension_name, **near_dup_info})
         else:
             # New job - create with all provided data
             print(f"Creating new job {job_id}")
+            posted_date = data.get('posted_date', datetime.now().isoformat())
             if is_postgres:
                 c.execute("""INSERT INTO jobs 
                             (id, title, description, url, client, budget, posted_date, 
                              hourly_rate, skills, categories, rss_source_id, client_name, 
-                             client_company, client_city, client_country)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                             client_company, client_city, client_country, posted_at, simhash, duplicate_of,
+                             upwork_key)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
                          (job_id, data.get('title', ''), data.get('description', ''), 
                           data['url'], data.get('client', 'Unknown'), data.get('budget', 'Not specified'),
-                          data.get('posted_date', datetime.now().isoformat()), 
+                          posted_date, 
                           data.get('hourly_rate', 'Not specified'), data.get('skills', 'Not specified'),
                           data.get('categories', 'Not specified'), rss_id, data.get('client_name', ''),
-                          data.get('client_company', ''), data.get('client_city', ''), data.get('client_country', '')))
+                          data.get('client_company', ''), data.get('client_city', ''), data.get('client_country', ''),
+                          to_posted_at(posted_date), fingerprint, duplicate_of, upwork_key))
             else:
                 c.execute("""INSERT INTO jobs 
                             (id, title, description, url, client, budget, posted_date, 
                              hourly_rate, skills, categories, rss_source_id, client_name, 
-                             client_company, client_city, client_country)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                             client_company, client_city, client_country, posted_at, simhash, duplicate_of,
+                             upwork_key)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                          (job_id, data.get('title', ''), data.get('description', ''), 
                           data['url'], data.get('client', 'Unknown'), data.get('budget', 'Not specified'),
-                          data.get('posted_date', datetime.now().isoformat()), 
+                          posted_date, 
                           data.get('hourly_rate', 'Not specified'), data.get('skills', 'Not specified'),
                           data.get('categories', 'Not specified'), rss_id, data.get('client_name', ''),
-                          data.get('client_company', ''), data.get('client_city', ''), data.get('client_country', '')))
+                          data.get('client_company', ''), data.get('client_city', ''), data.get('client_country', ''),
+                          to_posted_at(posted_date), fingerprint, duplicate_of, upwork_key))
             
             conn.commit()
             conn.close()
-            return jsonify({'success': True, 'jobId': job_id, 'action': 'created', 'extension': extension_name})
+            if duplicate_of is None and system.feed_configs.field(rss_id, 'auto_proposals'):
+                system.queue_auto_proposals([(job_id, data.get('description', ''), data.get('skills', ''),
+                                              to_posted_at(posted_date))])
+            return jsonify({'success': True, 'jobId': job_id, 'action': 'created', 'extension': extension_name, **near_dup_info})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e), 'extension': extension_name})
 
@@ -1649,10 +2105,10 @@ def create_job():
 def job_detail(job_id):
     # Redirect to Manual Jobs RSS feed for Chrome plugin jobs
     feeds = system.get_rss_feeds()
-    manual_feed = next((f for f in feeds if f[1] == "Manual Jobs"), None)
+    manual_feed_id = system.feed_configs.id_for("Manual Jobs")
     
-    if manual_feed:
-        return redirect(f'/rss/{manual_feed[0]}?highlight={job_id}')
+    if manual_feed_id:
+        return redirect(f'/rss/{manual_feed_id}?highlight={job_id}')
     elif feeds:
         return redirect(f'/rss/{feeds[0][0]}?highlight={job_id}')
     else:
@@ -1673,28 +2129,18 @@ def update_job_status():
         conn = system.get_db_connection()
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
+        before = rollups.job_snapshot(c, job_id, is_postgres)
         
-        if is_postgres:
-            c.execute("""UPDATE jobs SET 
-                        proposal_status=%s, submitted_by=%s, outreach_status=%s
-                        WHERE id=%s""",
-                     (proposal_status, submitted_by, outreach_status, job_id))
-        else:
-            c.execute("""UPDATE jobs SET 
-                        proposal_status=?, submitted_by=?, outreach_status=?
-                        WHERE id=?""",
-                     (proposal_status, submitted_by, outreach_status, job_id))
+        queries.execute(c, 'update_job_status', (proposal_status, submitted_by, outreach_status, job_id))
         
         rows_affected = c.rowcount
+        rollups.apply_change(c, before, rollups.job_snapshot(c, job_id, is_postgres), is_postgres)
         conn.commit()
         
         print(f"[UPDATE_JOB_STATUS] Updated {rows_affected} rows")
         
         # Verify
-        if is_postgres:
-            c.execute("SELECT proposal_status, submitted_by, outreach_status FROM jobs WHERE id=%s", (job_id,))
-        else:
-            c.execute("SELECT proposal_status, submitted_by, outreach_status FROM jobs WHERE id=?", (job_id,))
+        queries.execute(c, 'job_status', (job_id,))
         
         result = c.fetchone()
         print(f"[UPDATE_JOB_STATUS] Verified values: {result}")
@@ -1728,16 +2174,6 @@ def update_enrichment():
         c = conn.cursor()
         is_postgres = os.getenv('DATABASE_URL') is not None
         
-        # Add columns if they don't exist (PostgreSQL should have them)
-        if not is_postgres:
-            for column in ['outreach_status TEXT DEFAULT "Pending"', 'proposal_status TEXT DEFAULT "Not Submitted"', 'submitted_by TEXT']:
-                try:
-                    c.execute(f'ALTER TABLE jobs ADD COLUMN {column}')
-                    conn.commit()
-                except:
-                    conn.rollback()
-                    pass
-        
         # Build UPDATE query dynamically to only update provided fields
         update_fields = []
         update_values = []
@@ -1781,17 +2217,16 @@ def update_enrichment():
         print(f"[UPDATE_ENRICHMENT] Query: {query}")
         print(f"[UPDATE_ENRICHMENT] Values: {update_values}")
         
+        before = rollups.job_snapshot(c, job_id, is_postgres)
         c.execute(query, tuple(update_values))
         rows_affected = c.rowcount
+        rollups.apply_change(c, before, rollups.job_snapshot(c, job_id, is_postgres), is_postgres)
         
         conn.commit()
         print(f"[UPDATE_ENRICHMENT] Updated {rows_affected} rows for job {job_id}")
         
         # Verify the update
-        if is_postgres:
-            c.execute("SELECT proposal_status, submitted_by, outreach_status FROM jobs WHERE id=%s", (job_id,))
-        else:
-            c.execute("SELECT proposal_status, submitted_by, outreach_status FROM jobs WHERE id=?", (job_id,))
+        queries.execute(c, 'job_status', (job_id,))
         
         result = c.fetchone()
         print(f"[UPDATE_ENRICHMENT] Verification - Current values: {result}")
@@ -1818,14 +2253,17 @@ def delete_job(job_id):
     try:
         conn = system.get_db_connection()
         c = conn.cursor()
+        is_postgres = os.getenv('DATABASE_URL') is not None
+        before = rollups.job_snapshot(c, job_id, is_postgres)
         
         # Delete job and related proposals
-        if os.getenv('DATABASE_URL'):
+        if is_postgres:
             c.execute("DELETE FROM proposals WHERE job_id = %s", (job_id,))
             c.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
         else:
             c.execute("DELETE FROM proposals WHERE job_id = ?", (job_id,))
             c.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        rollups.apply_change(c, before, None, is_postgres)
         
         conn.commit()
         conn.close()
@@ -1866,6 +2304,7 @@ def create_manual_feed():
                     VALUES (?, ?, ?, ?, ?)""",
                  ("Manual Jobs", "manual://jobs", default_keyword_prompt, 
                   default_proposal_prompt, default_olostep_prompt))
+    system.feed_configs.invalidate(c)
     
     conn.commit()
     conn.close()
@@ -1879,22 +2318,8 @@ def fix_job_sources():
     is_postgres = os.getenv('DATABASE_URL') is not None
     
     # Get RSS feed IDs
-    if is_postgres:
-        c.execute("SELECT id FROM rss_feeds WHERE name = %s", ('Web Development',))
-        web_dev_result = c.fetchone()
-        web_dev_id = web_dev_result[0] if web_dev_result else None
-        
-        c.execute("SELECT id FROM rss_feeds WHERE name = %s", ('Manual Jobs',))
-        manual_result = c.fetchone()
-        manual_id = manual_result[0] if manual_result else None
-    else:
-        c.execute("SELECT id FROM rss_feeds WHERE name = ?", ('Web Development',))
-        web_dev_result = c.fetchone()
-        web_dev_id = web_dev_result[0] if web_dev_result else None
-        
-        c.execute("SELECT id FROM rss_feeds WHERE name = ?", ('Manual Jobs',))
-        manual_result = c.fetchone()
-        manual_id = manual_result[0] if manual_result else None
+    web_dev_id = system.feed_configs.id_for('Web Development')
+    manual_id = system.feed_configs.id_for('Manual Jobs')
     
     if not web_dev_id or not manual_id:
         conn.close()
@@ -1932,18 +2357,12 @@ def debug_manual_jobs():
     is_postgres = os.getenv('DATABASE_URL') is not None
     
     # Get Manual Jobs RSS feed ID
-    if is_postgres:
-        c.execute("SELECT id FROM rss_feeds WHERE name = %s", ('Manual Jobs',))
-    else:
-        c.execute("SELECT id FROM rss_feeds WHERE name = ?", ('Manual Jobs',))
-    manual_result = c.fetchone()
+    manual_id = system.feed_configs.id_for('Manual Jobs')
     
-    if not manual_result:
+    if not manual_id:
         conn.close()
         return jsonify({'error': 'Manual Jobs RSS feed not found'})
     
-    manual_id = manual_result[0]
-    
     # Get all jobs in Manual Jobs
     if is_postgres:
         c.execute("SELECT id, title, url, rss_source_id FROM jobs WHERE rss_source_id = %s", (manual_id,))
@@ -2185,45 +2604,27 @@ Neha N.,"React, React Native, Flutter & Nodejs Developer | 6+ Years | AI Expert"
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/generate_outreach', methods=['POST'])
-def generate_outreach():
-    try:
-        data = request.json
-        outreach_type = data['type']
-        prompt = data['prompt']
-        job_title = data['job_title']
-        job_description = data['job_description']
+def outreach_prompt(data):
+    """(prompt, max_tokens, response key) for a /generate_outreach request, or None for an unknown type"""
+    outreach_type = data['type']
+    prompt = data['prompt']
+    job_title = data['job_title']
+    job_description = data['job_description']
+    
+    if outreach_type == 'whatsapp':
+        full_prompt = f"{prompt}\n\nJob Title: {job_title}\nJob Description: {job_description}\n\nGenerate a brief, friendly WhatsApp message. Use double line breaks (\\n\\n) between paragraphs for proper formatting when copying to WhatsApp:"
+        return full_prompt, 250, 'message'
         
-        if outreach_type == 'whatsapp':
-            full_prompt = f"{prompt}\n\nJob Title: {job_title}\nJob Description: {job_description}\n\nGenerate a brief, friendly WhatsApp message. Use double line breaks (\\n\\n) between paragraphs for proper formatting when copying to WhatsApp:"
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": full_prompt}],
-                max_tokens=250
-            )
-            message = response.choices[0].message.content.strip()
-            formatted_message = copy_formatted_text(message)
-            return jsonify({'success': True, 'message': formatted_message})
-            
-        elif outreach_type == 'linkedin':
-            full_prompt = f"{prompt}\n\nJob Title: {job_title}\nJob Description: {job_description}\n\nGenerate a professional LinkedIn message. Use double line breaks (\\n\\n) between paragraphs for proper formatting when copying to LinkedIn:"
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": full_prompt}],
-                max_tokens=400
-            )
-            message = response.choices[0].message.content.strip()
-            formatted_message = copy_formatted_text(message)
-            return jsonify({'success': True, 'message': formatted_message})
-            
-        elif outreach_type == 'email':
-            client_name = data.get('client_name', '')
-            client_first_name = client_name.split()[0] if client_name else 'there'
-            
-            # Use the new Gmail-ready prompt with subject and follow-ups
-            email_prompt = f"""✅ FINAL REVERSE PROMPT — GMAIL-READY, POLITE UPWORK OUTREACH
+    elif outreach_type == 'linkedin':
+        full_prompt = f"{prompt}\n\nJob Title: {job_title}\nJob Description: {job_description}\n\nGenerate a professional LinkedIn message. Use double line breaks (\\n\\n) between paragraphs for proper formatting when copying to LinkedIn:"
+        return full_prompt, 400, 'message'
+        
+    elif outreach_type == 'email':
+        client_name = data.get('client_name', '')
+        client_first_name = client_name.split()[0] if client_name else 'there'
+        
+        # Use the new Gmail-ready prompt with subject and follow-ups
+        email_prompt = f"""✅ FINAL REVERSE PROMPT — GMAIL-READY, POLITE UPWORK OUTREACH
 
 You are to generate FOUR outputs:
 
@@ -2361,24 +2762,57 @@ FOLLOW-UP EMAIL 1:
 
 FOLLOW-UP EMAIL 2:
 [follow-up 2 content here]"""
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": email_prompt}],
-                max_tokens=1200
-            )
-            
-            result = response.choices[0].message.content.strip()
-            formatted_result = copy_formatted_text(result)
-            
-            return jsonify({
-                'success': True,
-                'result': formatted_result
-            })
+        return email_prompt, 1200, 'result'
+    
+    return None
+
+@app.route('/generate_outreach', methods=['POST'])
+def generate_outreach():
+    try:
+        data = request.json
+        force_refresh = bool(data.get('force_refresh'))
+        outreach = outreach_prompt(data)
+        if outreach is None:
+            return jsonify({'success': False, 'error': f"Unknown outreach type: {data['type']}"})
+        full_prompt, max_tokens, key = outreach
+        
+        result, cached = system.chat(full_prompt, max_tokens, force_refresh)
+        return jsonify({'success': True, key: copy_formatted_text(result.strip()), 'cached': cached})
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/generate_outreach/stream', methods=['POST'])
+def generate_outreach_stream():
+    """/generate_outreach as Server-Sent Events: delta events with copy-formatted text as it is written,
+    then done with the whole message (or error). The finished completion is kept in the LLM cache."""
+    data = request.json
+    force_refresh = bool(data.get('force_refresh'))
+    try:
+        outreach = outreach_prompt(data)
+    except KeyError as e:
+        return jsonify({'success': False, 'error': f"Missing field: {e}"})
+    if outreach is None:
+        return jsonify({'success': False, 'error': f"Unknown outreach type: {data['type']}"})
+    full_prompt, max_tokens, key = outreach
+    
+    def events():
+        text = StreamedCopyText()
+        try:
+            pieces, cached = system.chat_stream(full_prompt, max_tokens, force_refresh)
+            for piece in pieces:
+                delta = text.feed(piece)
+                if delta:
+                    yield 'delta', {'text': delta}
+            delta = text.close()
+            if delta:
+                yield 'delta', {'text': delta}
+            yield 'done', {'success': True, key: copy_formatted_text(text.text.strip()), 'cached': cached}
+        except Exception as e:
+            yield 'error', {'success': False, 'error': str(e)}
+    
+    return sse_response(events())
+
 @app.route('/fix-vollna-jobs', methods=['GET', 'POST'])
 def fix_vollna_jobs():
     conn = system.get_db_connection()
@@ -2386,24 +2820,13 @@ def fix_vollna_jobs():
     is_postgres = os.getenv('DATABASE_URL') is not None
     
     # Get RSS feed IDs
-    if is_postgres:
-        c.execute("SELECT id FROM rss_feeds WHERE name = %s", ('Web Development',))
-        web_dev_result = c.fetchone()
-        c.execute("SELECT id FROM rss_feeds WHERE name = %s", ('Manual Jobs',))
-        manual_result = c.fetchone()
-    else:
-        c.execute("SELECT id FROM rss_feeds WHERE name = ?", ('Web Development',))
-        web_dev_result = c.fetchone()
-        c.execute("SELECT id FROM rss_feeds WHERE name = ?", ('Manual Jobs',))
-        manual_result = c.fetchone()
+    web_dev_id = system.feed_configs.id_for('Web Development')
+    manual_id = system.feed_configs.id_for('Manual Jobs')
     
-    if not web_dev_result or not manual_result:
+    if not web_dev_id or not manual_id:
         conn.close()
         return jsonify({'success': False, 'error': 'RSS feeds not found'})
     
-    web_dev_id = web_dev_result[0]
-    manual_id = manual_result[0]
-    
     # Move vollna.com jobs from Manual Jobs to Web Development
     if is_postgres:
         c.execute("UPDATE jobs SET rss_source_id = %s WHERE rss_source_id = %s AND url LIKE '%vollna.com%'", (web_dev_id, manual_id))
@@ -2471,77 +2894,62 @@ Use Unicode formatting, no markdown. Be conversational but professional."""
                      keyword_prompt = ?, proposal_prompt = ?, olostep_prompt = ?
                      WHERE name = ?""",
                  (correct_keyword_prompt, correct_proposal_prompt, correct_olostep_prompt, 'Web Development'))
+    system.feed_configs.invalidate(c)
     
     conn.commit()
     conn.close()
     
     return jsonify({'success': True, 'message': 'Web Development prompts updated to correct version'})
 
-# Start all active RSS feeds
-system.start_all_active_feeds()
+# Feed polling and archiving run in whichever worker process wins the leader election
+system.leader.start()
 
 @app.route('/analytics')
 @login_required
 def analytics():
-    conn = system.get_db_connection()
+    conn = system.get_db_connection(readonly=True)
     c = conn.cursor()
-    is_postgres = os.getenv('DATABASE_URL') is not None
     
-    # Monthly enrichment stats
-    if is_postgres:
-        c.execute("""
-            SELECT 
-                DATE_TRUNC('month', CAST(posted_date AS DATE)) as month,
-                enriched_by,
-                COUNT(*) as count
-            FROM jobs 
-            WHERE enriched = 1 AND enriched_by IS NOT NULL
-            GROUP BY DATE_TRUNC('month', CAST(posted_date AS DATE)), enriched_by
-            ORDER BY month DESC, enriched_by
-        """)
-    else:
-        c.execute("""
-            SELECT 
-                strftime('%Y-%m', posted_date) as month,
-                enriched_by,
-                COUNT(*) as count
-            FROM jobs 
-            WHERE enriched = 1 AND enriched_by IS NOT NULL
-            GROUP BY strftime('%Y-%m', posted_date), enriched_by
-            ORDER BY month DESC, enriched_by
-        """)
-    enrichment_stats = c.fetchall()
-    
-    # Monthly proposal submission stats
-    if is_postgres:
-        c.execute("""
-            SELECT 
-                DATE_TRUNC('month', CAST(posted_date AS DATE)) as month,
-                submitted_by,
-                proposal_status,
-                COUNT(*) as count
-            FROM jobs 
-            WHERE submitted_by IS NOT NULL AND proposal_status != 'Not Submitted'
-            GROUP BY DATE_TRUNC('month', CAST(posted_date AS DATE)), submitted_by, proposal_status
-            ORDER BY month DESC, submitted_by, proposal_status
-        """)
-    else:
-        c.execute("""
-            SELECT 
-                strftime('%Y-%m', posted_date) as month,
-                submitted_by,
-                proposal_status,
-                COUNT(*) as count
-            FROM jobs 
-            WHERE submitted_by IS NOT NULL AND proposal_status != 'Not Submitted'
-            GROUP BY strftime('%Y-%m', posted_date), submitted_by, proposal_status
-            ORDER BY month DESC, submitted_by, proposal_status
-        """)
-    proposal_stats = c.fetchall()
+    # Monthly counts come from the rollup tables maintained on every job update
+    enrichment_stats, proposal_stats = rollups.read(c)
     
     conn.close()
     return render_template('analytics.html', enrichment_stats=enrichment_stats, proposal_stats=proposal_stats)
 
+@app.route('/rebuild-analytics', methods=['POST'])
+@login_required
+def rebuild_analytics():
+    """Regenerate the analytics rollup tables from the jobs table"""
+    try:
+        conn = system.get_db_connection()
+        c = conn.cursor()
+        is_postgres = os.getenv('DATABASE_URL') is not None
+        
+        rollups.rebuild(c, is_postgres)
+        conn.commit()
+        enrichment_stats, proposal_stats = rollups.read(c)
+        conn.close()
+        
+        return jsonify({'success': True, 'enrichment_rows': len(enrichment_stats), 'proposal_rows': len(proposal_stats)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/archive-jobs', methods=['POST'])
+@login_required
+def archive_jobs():
+    """Move untouched jobs older than ?days= (default JOBS_ARCHIVE_AFTER_DAYS) to jobs_archive"""
+    try:
+        days = request.args.get('days', JOBS_ARCHIVE_AFTER_DAYS, type=int)
+        moved = system.archive_old_jobs(days)
+        
+        conn = system.get_db_connection(readonly=True)
+        counts = archive.tier_counts(conn.cursor())
+        conn.close()
+        
+        return jsonify({'success': True, 'archived': moved, 'older_than_days': days, **counts})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/check_whatsapp', methods=['POST'])
 def check_whatsapp():
     """Check if a phone number has WhatsApp using a simple API approach"""
@@ -2643,6 +3051,57 @@ def check_db_type():
         'using_postgres': bool(os.getenv('DATABASE_URL'))
     })
 
+@app.route('/api/fetch-stats')
+def fetch_stats():
+    """RSS poll outcomes per feed; not_modified and unchanged polls skipped parsing and DB work"""
+    with system.fetch_stats_lock:
+        feeds = {rss_id: dict(stats) for rss_id, stats in system.fetch_stats.items()}
+    totals = {}
+    for stats in feeds.values():
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+    totals['skipped'] = totals.get('not_modified', 0) + totals.get('unchanged', 0)
+    return jsonify({'totals': totals, 'feeds': feeds, 'schedule': system.scheduler.status(),
+                    'http': system.http.stats(), 'leader': system.leader.status()})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Feed ingest series in the Prometheus text format (this process only)"""
+    return system.metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/api/feeds/status')
+def feeds_status():
+    """Every registered feed's configuration and polling state in this process"""
+    feeds = system.feeds.status()
+    with system.fetch_stats_lock:
+        for rss_id, feed in feeds.items():
+            feed['fetches'] = dict(system.fetch_stats.get(rss_id, {}))
+    return jsonify({'leader': system.leader.status(), 'feeds': feeds})
+
+@app.route('/api/query-stats')
+def query_stats():
+    """Call counts and latency of the registered hot statements (see queries.py)"""
+    return jsonify({
+        'prepared_statements': bool(os.getenv('DATABASE_URL')) and queries.PG_PREPARED_STATEMENTS,
+        'statements': queries.stats()
+    })
+
+@app.route('/api/llm-cache-stats')
+def llm_cache_stats():
+    """Hit/miss counters of the LLM completions cache in this process"""
+    return jsonify(system.llm_cache.stats())
+
+@app.route('/api/auto-proposals/status')
+def auto_proposals_status():
+    """Background proposal queue and today's spend (workers only run in the leader process)"""
+    return jsonify(dict(system.auto_proposals.status(), feeds=system.auto_proposal_feed_ids()))
+
+@app.route('/api/db-pool-stats')
+def db_pool_stats():
+    if system.read_pool is system.pool:
+        return jsonify(system.pool.stats())
+    return jsonify({'writer': system.pool.stats(), 'readers': system.read_pool.stats()})
+
 @app.route('/fix-null-statuses', methods=['POST'])
 def fix_null_statuses():
     """Set default values for NULL status fields"""
@@ -2694,6 +3153,11 @@ def fix_null_statuses():
             """)
             rows3 = c.rowcount
         
+        # submitted_by '' instead of NULL puts submitted jobs into the proposal rollup; recount rather
+        # than replaying every row through apply_change
+        if rows1 or rows3:
+            rollups.rebuild(c, is_postgres)
+        
         conn.commit()
         conn.close()
         
@@ -2792,6 +3256,49 @@ def debug_columns():
         'column_count': len(column_list)
     })
 
+@app.route('/debug-query-plans')
+@login_required
+def debug_query_plans():
+    """EXPLAIN the job list queries and check each one is served by its index"""
+    conn = system.get_db_connection(readonly=True)
+    c = conn.cursor()
+    is_postgres = os.getenv('DATABASE_URL') is not None
+
+    if is_postgres:
+        # Small tables make a seq scan cheapest; disable it to prove the index is usable
+        c.execute("SET LOCAL enable_seqscan = off")
+
+    plans = {}
+    for name, view, paged in [(view, view, False) for view in job_lists.VIEWS] + \
+                             [(f'{view}_page', view, True) for view in job_lists.VIEWS]:
+        index_name = job_lists.VIEWS[view][1]
+        query = job_lists.sql(view, is_postgres, after_cursor=paged, limit=JOBS_PAGE_SIZE + 1 if paged else None)
+        params = [0] if view == 'feed' else []
+        if paged:
+            params.extend(['2024-01-01 00:00:00', ''])
+        if is_postgres:
+            c.execute("EXPLAIN " + query, params)
+            plan = [row[0] for row in c.fetchall()]
+        else:
+            c.execute("EXPLAIN QUERY PLAN " + query, params)
+            plan = [row[-1] for row in c.fetchall()]
+        plan_text = '\n'.join(plan)
+        plans[name] = {
+            'expected_index': index_name,
+            'uses_index': index_name in plan_text,
+            # Sorting in a separate step means the index order isn't being used
+            'sorts_in_memory': 'Sort' in plan_text or 'TEMP B-TREE' in plan_text,
+            'plan': plan
+        }
+
+    conn.close()
+
+    return jsonify({
+        'database_type': 'PostgreSQL' if is_postgres else 'SQLite',
+        'all_indexed': all(p['uses_index'] and not p['sorts_in_memory'] for p in plans.values()),
+        'plans': plans
+    })
+
 @app.route('/add-status-columns', methods=['POST'])
 def add_status_columns():
     try:
@@ -2921,33 +3428,6 @@ def fix_missing_columns():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-# Add missing columns on startup for PostgreSQL
-if os.getenv('DATABASE_URL'):
-    try:
-        conn = system.get_db_connection()
-        c = conn.cursor()
-        
-        # Add missing columns if they don't exist
-        columns_to_add = [
-            ('proposal_status', 'TEXT DEFAULT \'Not Submitted\''),
-            ('submitted_by', 'TEXT'),
-            ('enriched_by', 'TEXT')
-        ]
-        
-        for column_name, column_def in columns_to_add:
-            try:
-                c.execute(f'ALTER TABLE jobs ADD COLUMN {column_name} {column_def}')
-                conn.commit()
-                print(f"Added column {column_name} to jobs table")
-            except Exception as e:
-                if 'already exists' not in str(e).lower():
-                    print(f"Error adding column {column_name}: {e}")
-                conn.rollback()
-        
-        conn.close()
-    except Exception as e:
-        print(f"Error adding columns: {e}")
-
 @app.route('/fix-leads-constraint', methods=['GET', 'POST'])
 def fix_leads_constraint():
     try:
@@ -0,0 +1,150 @@
+"""Cold storage tier for old, untouched jobs.
+
+RSS feeds keep adding jobs that nobody ever enriches or bids on. Once such a
+job is older than ``JOBS_ARCHIVE_AFTER_DAYS`` it is moved out of the hot
+``jobs`` table into ``jobs_archive``. The list pages, the ingest existence
+check and the analytics rollups then only touch the recent working set.
+Archived jobs are still visible when a list is asked for ``include_archived``.
+When the Chrome extension opens or enriches an archived job again, it is
+moved back into ``jobs`` (``restore_job``).
+
+On Postgres ``jobs_archive`` is declaratively partitioned by posted month
+(``jobs_archive_y2024m01`` ...), so whole months can later be detached or
+dropped cheaply. On SQLite it is a plain table with the same columns.
+
+    python archive.py [--days N]     # move old jobs now
+    python archive.py --status       # row counts per tier
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+ARCHIVE_TABLE = 'jobs_archive'
+
+# Only jobs nobody has worked on: not enriched, no proposal submitted, no generated proposal
+ARCHIVABLE = """enriched = 0
+    AND (proposal_status IS NULL OR proposal_status = 'Not Submitted')
+    AND NOT EXISTS (SELECT 1 FROM proposals WHERE proposals.job_id = jobs.id)"""
+
+
+def create_archive_table(c, is_postgres):
+    """Migration step: the archive table and its lookup indexes"""
+    if is_postgres:
+        c.execute(f"""CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (LIKE jobs INCLUDING DEFAULTS)
+                      PARTITION BY RANGE (posted_at)""")
+        # Catches rows without a posted_at (or outside any monthly partition)
+        c.execute(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE}_default PARTITION OF {ARCHIVE_TABLE} DEFAULT")
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_jobs_archive_id ON {ARCHIVE_TABLE} (id)")
+    else:
+        c.execute(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} AS SELECT * FROM jobs WHERE 0")
+        c.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_archive_id ON {ARCHIVE_TABLE} (id)")
+    c.execute(f"""CREATE INDEX IF NOT EXISTS idx_jobs_archive_feed_posted
+                  ON {ARCHIVE_TABLE} (rss_source_id, enriched, posted_at DESC, id DESC)""")
+
+
+def partition_name(month):
+    return f"{ARCHIVE_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def ensure_partition(c, month):
+    """Create the monthly partition of jobs_archive holding ``month`` (Postgres only)"""
+    start = month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    c.execute(f"""CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {ARCHIVE_TABLE}
+                  FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')""")
+
+
+def _columns(c, table, is_postgres):
+    if is_postgres:
+        c.execute("""SELECT column_name FROM information_schema.columns
+                     WHERE table_name = %s AND table_schema = current_schema()
+                     ORDER BY ordinal_position""", (table,))
+        return [row[0] for row in c.fetchall()]
+    c.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in c.fetchall()]
+
+
+def archive_old_jobs(conn, is_postgres, older_than_days, batch_size=5000):
+    """Move archivable jobs posted more than ``older_than_days`` ago. Returns rows moved."""
+    c = conn.cursor()
+    p = '%s' if is_postgres else '?'
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    if is_postgres:
+        # Another worker is already archiving; nothing to do
+        c.execute("SELECT pg_try_advisory_lock(hashtext('mindwork_jobs_archive'))")
+        if not c.fetchone()[0]:
+            conn.rollback()
+            return 0
+    try:
+        archive_columns = set(_columns(c, ARCHIVE_TABLE, is_postgres))
+        columns = ', '.join(col for col in _columns(c, 'jobs', is_postgres) if col in archive_columns)
+        batch = f"""SELECT id FROM jobs WHERE posted_at < {p} AND {ARCHIVABLE}
+                    ORDER BY posted_at, id LIMIT {int(batch_size)}"""
+
+        if is_postgres:
+            c.execute(f"""SELECT DISTINCT date_trunc('month', posted_at) FROM jobs
+                          WHERE posted_at < %s AND {ARCHIVABLE}""", (cutoff,))
+            for (month,) in c.fetchall():
+                ensure_partition(c, month)
+            conn.commit()
+
+        moved = 0
+        while True:
+            if is_postgres:
+                c.execute(f"""WITH moved AS (
+                                  DELETE FROM jobs WHERE id IN ({batch}) RETURNING {columns})
+                              INSERT INTO {ARCHIVE_TABLE} ({columns}) SELECT {columns} FROM moved""", (cutoff,))
+            else:
+                c.execute(f"INSERT OR IGNORE INTO {ARCHIVE_TABLE} ({columns}) SELECT {columns} FROM jobs WHERE id IN ({batch})",
+                          (cutoff,))
+                c.execute(f"DELETE FROM jobs WHERE id IN ({batch})", (cutoff,))
+            count = c.rowcount
+            conn.commit()
+            moved += count
+            if count < batch_size:
+                return moved
+    finally:
+        if is_postgres:
+            conn.rollback()
+            c.execute("SELECT pg_advisory_unlock(hashtext('mindwork_jobs_archive'))")
+            conn.commit()
+
+
+def restore_job(c, job_id, is_postgres):
+    """Move one archived job back into jobs (someone is working on it again). Returns whether it moved.
+    If jobs already holds the same job, the archived copy is dropped."""
+    archive_columns = set(_columns(c, ARCHIVE_TABLE, is_postgres))
+    columns = ', '.join(col for col in _columns(c, 'jobs', is_postgres) if col in archive_columns)
+    if is_postgres:
+        c.execute(f"""WITH moved AS (
+                          DELETE FROM {ARCHIVE_TABLE} WHERE id = %s RETURNING {columns})
+                      INSERT INTO jobs ({columns}) SELECT {columns} FROM moved ON CONFLICT DO NOTHING""", (job_id,))
+        return c.rowcount > 0
+    c.execute(f"INSERT OR IGNORE INTO jobs ({columns}) SELECT {columns} FROM {ARCHIVE_TABLE} WHERE id = ?", (job_id,))
+    moved = c.rowcount > 0
+    c.execute(f"DELETE FROM {ARCHIVE_TABLE} WHERE id = ?", (job_id,))
+    return moved
+
+
+def tier_counts(c):
+    c.execute("SELECT COUNT(*) FROM jobs")
+    hot = c.fetchone()[0]
+    c.execute(f"SELECT COUNT(*) FROM {ARCHIVE_TABLE}")
+    return {'hot_jobs': hot, 'archived_jobs': c.fetchone()[0]}
+
+
+if __name__ == '__main__':
+    from migrations import _connect
+
+    conn, is_postgres = _connect()
+    try:
+        if '--status' in sys.argv[1:]:
+            print(tier_counts(conn.cursor()))
+        else:
+            days = int(os.getenv('JOBS_ARCHIVE_AFTER_DAYS', 90))
+            if '--days' in sys.argv[1:]:
+                days = int(sys.argv[sys.argv.index('--days') + 1])
+            print(f"Archived {archive_old_jobs(conn, is_postgres, days)} jobs older than {days} days")
+    finally:
+        conn.close()
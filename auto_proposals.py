@@ -0,0 +1,216 @@
+"""Background proposal generation for newly ingested jobs.
+
+Feeds with ``auto_proposals`` turned on (admin page) get a proposal for
+every new job while nobody is looking, so opening the job shows it at once
+instead of waiting on the proposal pipeline. Jobs are queued by
+fetch_rss_jobs and /api/create-job. A sweep every ``sweep_interval``
+seconds queues the recent jobs that still have no proposal, which covers
+jobs inserted through other worker processes and a restart. Only the
+leader (see leader.py) runs the workers.
+
+The queue is a bounded heap ordered by ``priority``: the best team match
+first, minus an age penalty, so fresh jobs beat stale ones. When the
+queue is full, the lowest priority job is dropped. The sweep brings it
+back if it is still recent.
+
+Each generated proposal is charged an estimated cost against a daily
+budget. Spend per day is kept in ``auto_proposal_spend``, so a restart
+doesn't reset it. Once today's budget is used up, queued jobs wait for the
+next day.
+
+    queue = AutoProposalQueue(generate, get_connection, is_postgres, sweep=queue_recent_jobs)
+    queue.start()
+    queue.submit(job_id, priority(match_score=62.5, age_hours=0.2, age_penalty=10))
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime
+
+
+def priority(match_score, age_hours, age_penalty):
+    """Higher runs first: the best team match score (0-100) less ``age_penalty`` points per hour of age"""
+    return match_score - age_hours * age_penalty
+
+
+class AutoProposalQueue:
+    def __init__(self, generate, get_connection, is_postgres, workers=2, daily_budget=1.0,
+                 cost_per_proposal=0.002, max_queued=500, sweep=None, sweep_interval=60):
+        """``generate(job_id)`` stores a proposal and returns True, or False when there was nothing to do
+        (job gone or already has one). ``sweep()`` queues jobs found in the database."""
+        self.generate = generate
+        self.get_connection = get_connection
+        self.is_postgres = is_postgres
+        self.workers = workers
+        self.daily_budget = daily_budget
+        self.cost_per_proposal = cost_per_proposal
+        self.max_queued = max_queued
+        self.sweep = sweep
+        self.sweep_interval = sweep_interval
+        self._heap = []  # (-priority, sequence, job_id)
+        self._queued = set()
+        self._running = set()
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = None
+        self._spent = None  # (day, cost) for today, including proposals being generated
+        self._stats = {'generated': 0, 'skipped': 0, 'failed': 0, 'dropped': 0}
+
+    @property
+    def running(self):
+        return self._stop is not None and not self._stop.is_set()
+
+    def start(self):
+        if self.running or self.workers <= 0:
+            return
+        stop = self._stop = threading.Event()
+        for i in range(self.workers):
+            threading.Thread(target=self._work, args=(stop,), name=f'auto-proposal-{i}', daemon=True).start()
+        if self.sweep is not None:
+            threading.Thread(target=self._sweep_loop, args=(stop,), name='auto-proposal-sweep', daemon=True).start()
+
+    def stop(self):
+        if self._stop is None:
+            return
+        self._stop.set()
+        with self._cond:
+            self._heap.clear()
+            self._queued.clear()
+            self._cond.notify_all()
+
+    def submit(self, job_id, job_priority):
+        """Queue a job; ignored when the workers don't run in this process or it is already queued"""
+        with self._cond:
+            if not self.running or job_id in self._queued or job_id in self._running:
+                return False
+            heapq.heappush(self._heap, (-job_priority, next(self._sequence), job_id))
+            self._queued.add(job_id)
+            dropped = None
+            if len(self._heap) > self.max_queued:
+                dropped = max(self._heap)
+                self._heap.remove(dropped)
+                heapq.heapify(self._heap)
+                self._queued.discard(dropped[2])
+                self._stats['dropped'] += 1
+            self._cond.notify()
+            return dropped is None or dropped[2] != job_id
+
+    # Daily budget
+
+    def _today(self):
+        return datetime.now().strftime('%Y-%m-%d')
+
+    def _load_spent(self, day):
+        p = '%s' if self.is_postgres else '?'
+        conn = self.get_connection(readonly=True)
+        try:
+            c = conn.cursor()
+            c.execute(f"SELECT cost FROM auto_proposal_spend WHERE day = {p}", (day,))
+            row = c.fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else 0.0
+
+    def _reserve(self):
+        """Set aside the cost of one proposal from today's budget. Returns the day, or None once it is spent."""
+        day = self._today()
+        if self._spent is None or self._spent[0] != day:
+            spent = self._load_spent(day)
+            with self._cond:
+                if self._spent is None or self._spent[0] != day:
+                    self._spent = (day, spent)
+        with self._cond:
+            day, spent = self._spent
+            if spent + self.cost_per_proposal > self.daily_budget:
+                return None
+            self._spent = (day, spent + self.cost_per_proposal)
+            return day
+
+    def _refund(self, day):
+        with self._cond:
+            if self._spent[0] == day:
+                self._spent = (day, max(self._spent[1] - self.cost_per_proposal, 0.0))
+
+    def _charge(self, day):
+        p = '%s' if self.is_postgres else '?'
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.execute(f"""INSERT INTO auto_proposal_spend (day, proposals, cost) VALUES ({p}, 1, {p})
+                          ON CONFLICT (day) DO UPDATE SET proposals = auto_proposal_spend.proposals + 1,
+                              cost = auto_proposal_spend.cost + excluded.cost""",
+                      (day, self.cost_per_proposal))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # Workers
+
+    def _next(self, stop):
+        """Highest priority (-priority, sequence, job_id) entry, waiting for one; None once stopped"""
+        with self._cond:
+            while not self._heap and not stop.is_set():
+                self._cond.wait(1)
+            if stop.is_set():
+                return None
+            entry = heapq.heappop(self._heap)
+            self._queued.discard(entry[2])
+            self._running.add(entry[2])
+            return entry
+
+    def _put_back(self, entry):
+        with self._cond:
+            self._running.discard(entry[2])
+            if self.running:
+                heapq.heappush(self._heap, entry)
+                self._queued.add(entry[2])
+
+    def _work(self, stop):
+        while not stop.is_set():
+            entry = self._next(stop)
+            if entry is None:
+                return
+            try:
+                day = self._reserve()
+            except Exception as e:
+                print(f"Auto proposal budget error: {e}")
+                day = None
+            if day is None:
+                # Budget spent (or unreadable): wait, then check again in case the day has changed
+                self._put_back(entry)
+                stop.wait(60)
+                continue
+
+            job_id = entry[2]
+            try:
+                generated = self.generate(job_id)
+            except Exception as e:
+                generated = None
+                print(f"Auto proposal error for job {job_id}: {e}")
+            with self._cond:
+                self._running.discard(job_id)
+                self._stats['generated' if generated else 'skipped' if generated is False else 'failed'] += 1
+            if generated:
+                try:
+                    self._charge(day)
+                except Exception as e:
+                    print(f"Auto proposal spend error: {e}")
+            else:
+                self._refund(day)
+
+    def _sweep_loop(self, stop):
+        while not stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Auto proposal sweep error: {e}")
+            stop.wait(self.sweep_interval)
+
+    def status(self):
+        with self._cond:
+            stats = dict(self._stats, queued=len(self._heap), generating=len(self._running))
+            spent = self._spent
+        stats.update(running=self.running, workers=self.workers, daily_budget=self.daily_budget,
+                     cost_per_proposal=self.cost_per_proposal,
+                     spent_today=round(spent[1], 4) if spent and spent[0] == self._today() else None)
+        return stats
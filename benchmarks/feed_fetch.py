@@ -0,0 +1,141 @@
+"""Wall time to download and parse a wave of due feeds.
+
+Serves ``--feeds`` local RSS feeds (each response delayed by ``--latency``
+to stand in for a remote server) and fetches all of them three ways:
+
+* sequential - one blocking ``feedparser.parse(url)`` after another
+* workers    - the scheduler's worker pool downloading with ``requests``
+               and parsing in the same thread (a worker is tied up for
+               the whole round trip)
+* async      - the shared AsyncFeedClient downloads every feed at once;
+               each response is parsed in the worker pool as it arrives
+
+    python benchmarks/feed_fetch.py [--feeds 50] [--entries 50] [--latency 0.2] [--workers 4]
+"""
+import argparse
+import http.server
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_http import AsyncFeedClient  # noqa: E402
+
+ITEM = """<item>
+  <title><![CDATA[Benchmark job {n} - Upwork]]></title>
+  <link>https://www.upwork.com/jobs/Benchmark-job_%7E0{feed:04d}{n:012d}?source=rss</link>
+  <description><![CDATA[{description}<br /><b>Hourly Range</b>: $25.00-$50.00
+<br /><b>Skills</b>: Python, Flask, PostgreSQL<br /><b>Category</b>: Web Development]]></description>
+  <pubDate>Mon, 06 Jan 2025 10:{minute:02d}:00 +0000</pubDate>
+</item>"""
+DESCRIPTION = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 20
+
+
+def feed_body(feed, entries):
+    items = '\n'.join(ITEM.format(n=n, feed=feed, minute=n % 60, description=DESCRIPTION) for n in range(entries))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed {feed}</title>{items}</channel></rss>""".encode()
+
+
+def serve(feeds, entries, latency):
+    bodies = {f"/feed/{n}": feed_body(n, entries) for n in range(feeds)}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = bodies.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sequential(urls, workers):
+    return [len(feedparser.parse(url).entries) for url in urls]
+
+
+def blocking_workers(urls, workers):
+    session = requests.Session()
+
+    def poll(url):
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        return len(feedparser.parse(response.content).entries)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(poll, urls))
+
+
+def async_stage(urls, workers):
+    client = AsyncFeedClient(timeout=30, max_connections=len(urls), per_host=len(urls))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def parse(future):
+                response = future.result()
+                response.raise_for_status()
+                return len(feedparser.parse(response.content).entries)
+
+            parsed = []
+            handed_off = threading.Semaphore(0)
+
+            def downloaded(future):
+                parsed.append(pool.submit(parse, future))
+                handed_off.release()
+
+            for url in urls:
+                client.fetch(url).add_done_callback(downloaded)
+            for _ in urls:
+                handed_off.acquire()
+            return [future.result() for future in parsed]
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=50)
+    parser.add_argument('--entries', type=int, default=50, help='items per feed')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds the server waits before answering')
+    parser.add_argument('--workers', type=int, default=4, help='FEED_SCHEDULER_WORKERS')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    server = serve(args.feeds, args.entries, args.latency)
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/feed/{n}" for n in range(args.feeds)]
+    print(f"{args.feeds} feeds x {args.entries} entries, {args.latency * 1000:.0f}ms server latency, "
+          f"{args.workers} workers")
+
+    for name, run in (('sequential', sequential), ('workers', blocking_workers), ('async', async_stage)):
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            counts = run(urls, args.workers)
+            timings.append(time.perf_counter() - started)
+            assert sum(counts) == args.feeds * args.entries, f"{name}: parsed {sum(counts)} entries"
+        print(f"{name:>10}: best {min(timings):6.2f}s   mean {sum(timings) / len(timings):6.2f}s   "
+              f"feeds/s {args.feeds / min(timings):7.1f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Per-entry cost of turning parsed feed entries into job rows.
+
+Compares the extraction that used to be inline in fetch_rss_jobs (repeated
+split/replace calls per field) with normalizer.normalize_entry. Both run
+over the same parsed entries, so feedparser's own cost is left out. The
+run also checks that both produce the same fields.
+
+The corpus is one or more saved feed bodies (e.g. ``curl -o feed.xml
+<vollna feed url>``). Without any, a vollna-style corpus is generated.
+
+    python benchmarks/normalize_entries.py [feed.xml ...] [--entries 5000] [--rounds 5]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalizer  # noqa: E402
+from feed_watermark import entry_job_id, entry_published  # noqa: E402
+from timestamps import to_posted_at  # noqa: E402
+
+SKILLS = ['Python', 'Django', 'Flask', 'React', 'Node.js', 'PostgreSQL', 'AWS', 'Figma', 'Shopify',
+          'WordPress', 'Flutter', 'Swift', 'Kotlin', 'Docker', 'GraphQL', 'TypeScript']
+CATEGORIES = ['Web Development', 'Mobile Development', 'Web & Mobile Design', 'Ecommerce Development',
+              'Data Science & Analytics']
+TEXT = ('We are looking for an experienced developer to help us build and maintain our platform. '
+        'You will work closely with our product team. ')
+
+
+def generated_corpus(count):
+    random.seed(7)
+    items = []
+    for n in range(count):
+        if n % 3 == 0:
+            low = random.randint(10, 60)
+            budget = f" (Hourly Rate: ${low}.00-${low + random.randint(5, 40)}.00)"
+        elif n % 3 == 1:
+            budget = f" (Fixed Price: ${random.randint(1, 50) * 100:,})"
+        else:
+            budget = ''
+        skills = ', '.join(random.sample(SKILLS, random.randint(2, 6)))
+        description = TEXT * random.randint(1, 8)
+        if n % 5:
+            description += f" Skills: {skills} Categories: {random.choice(CATEGORIES)}"
+        minute = n % 60
+        items.append(f"""<item><title><![CDATA[Job {n}: build something{budget}]]></title>
+<link>https://www.upwork.com/jobs/~0{n:018d}</link>
+<description><![CDATA[{description}]]></description>
+<pubDate>Mon, 06 Jan 2025 10:{minute:02d}:00 +0000</pubDate></item>""")
+    return f"""<?xml version="1.0"?><rss version="2.0"><channel><title>corpus</title>
+{''.join(items)}</channel></rss>"""
+
+
+def legacy_row(entry, rss_id):
+    """fetch_rss_jobs' field extraction before normalizer.py (minus its per-entry print)"""
+    job_id = hashlib.md5(entry.link.encode()).hexdigest()
+    budget = 'Not specified'
+    hourly_rate = 'Not specified'
+    if 'Hourly Rate:' in entry.title:
+        rate_part = entry.title.split('Hourly Rate:')[1].strip().rstrip(')')
+        hourly_rate = rate_part
+        budget = f"Hourly: {rate_part}"
+    elif 'Fixed Price:' in entry.title:
+        price_part = entry.title.split('Fixed Price:')[1].strip().rstrip(')')
+        budget = f"Fixed: {price_part}"
+
+    posted_date = entry.get('published', datetime.now().isoformat())
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        from time import mktime
+        posted_date = datetime.fromtimestamp(mktime(entry.published_parsed)).isoformat()
+
+    skills = 'Not specified'
+    if 'Skills:' in entry.description:
+        skills_part = entry.description.split('Skills:')[1]
+        if 'Categories:' in skills_part:
+            skills_part = skills_part.split('Categories:')[0]
+        skills = skills_part.strip().replace(']]>', '').replace('<![CDATA[', '')
+
+    categories = 'Not specified'
+    if 'Categories:' in entry.description:
+        cat_part = entry.description.split('Categories:')[1]
+        categories = cat_part.strip().replace(']]>', '').replace('<![CDATA[', '')
+
+    description = entry.description
+    if 'Skills:' in description:
+        description = description.split('Skills:')[0].strip()
+    description = description.replace('<![CDATA[', '').replace(']]>', '').strip()
+
+    return (job_id, entry.title, description, entry.link, entry.get('author', 'Unknown'), budget,
+            posted_date, hourly_rate, skills, categories, rss_id, to_posted_at(posted_date))
+
+
+def new_row(entry, rss_id):
+    return normalizer.normalize_entry(entry_job_id(entry), entry_published(entry), entry, rss_id).row()
+
+
+def mismatches(entries):
+    """Entries where the two extractions disagree (skills/categories compared as lists)"""
+    as_list = normalizer._split_list
+    count = 0
+    for entry in entries:
+        old, new = legacy_row(entry, 1), new_row(entry, 1)
+        same = old[:8] == new[:8] and old[10:12] == new[10:12]
+        for index in (8, 9):
+            old_items = [] if old[index] == 'Not specified' else as_list(old[index])
+            new_items = [] if new[index] == 'Not specified' else as_list(new[index])
+            same = same and old_items == new_items
+        count += not same
+    return count
+
+
+def measure(extract, entries, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for entry in entries:
+            extract(entry, 1)
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6 / len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus', nargs='*', help='saved feed bodies (RSS/Atom files)')
+    parser.add_argument('--entries', type=int, default=5000, help='size of the generated corpus')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.corpus:
+        entries = [entry for path in args.corpus for entry in normalizer.parse(path)]
+    else:
+        entries = normalizer.parse(generated_corpus(args.entries))
+    print(f"{len(entries)} entries, {mismatches(entries)} with differing fields")
+
+    legacy = measure(legacy_row, entries, args.rounds)
+    compiled = measure(new_row, entries, args.rounds)
+    print(f"    legacy: {legacy:7.2f} us/entry")
+    print(f"normalizer: {compiled:7.2f} us/entry   ({legacy / compiled:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Read latency of the job list query while RSS-style writers are inserting.
+
+Compares the stock SQLite setup (one default connection per thread, rollback
+journal, synchronous=FULL) with the tuned profile from sqlite_db.py (WAL, a
+single writer connection, per-thread read-only connections).
+
+    python benchmarks/sqlite_read_latency.py [--seconds 10] [--writers 4] [--readers 4]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations  # noqa: E402
+import sqlite_db  # noqa: E402
+
+FEED_PAGE = """SELECT id, title, posted_at FROM jobs
+               WHERE rss_source_id = ? AND enriched = 0
+               ORDER BY posted_at DESC, id DESC LIMIT 51"""
+INSERT = """INSERT INTO jobs (id, title, description, url, rss_source_id, posted_date, posted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO NOTHING"""
+FEEDS = 8
+BATCH = 50
+DESCRIPTION = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 40
+
+
+def job_rows(count):
+    now = datetime.now()
+    rows = []
+    for _ in range(count):
+        link = f"https://www.upwork.com/jobs/~0{random.getrandbits(64):016x}"
+        posted = (now - timedelta(seconds=random.randint(0, 86400 * 30))).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append((hashlib.md5(link.encode()).hexdigest(), 'Benchmark job', DESCRIPTION, link,
+                     random.randint(1, FEEDS), posted, posted))
+    return rows
+
+
+def setup(path, seed_rows):
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn, False)
+    conn.executemany(INSERT, job_rows(seed_rows))
+    conn.commit()
+    conn.close()
+
+
+class Stock:
+    """What the app did before: independent default connections"""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def _conn(self):
+        if getattr(self.local, 'conn', None) is None:
+            self.local.conn = sqlite3.connect(self.path, check_same_thread=False)
+        return self.local.conn
+
+    def write(self, rows):
+        conn = self._conn()
+        conn.executemany(INSERT, rows)
+        conn.commit()
+
+    def read(self, rss_id):
+        return self._conn().execute(FEED_PAGE, (rss_id,)).fetchall()
+
+
+class Tuned:
+    def __init__(self, path):
+        self.writer = sqlite_db.WriterConnection(lambda: sqlite_db.connect(path))
+        self.readers = sqlite_db.ThreadReaders(lambda: sqlite_db.connect(path, readonly=True))
+
+    def write(self, rows):
+        with self.writer.connection() as conn:
+            conn.cursor().executemany(INSERT, rows)
+            conn.commit()
+
+    def read(self, rss_id):
+        with self.readers.connection() as conn:
+            c = conn.cursor()
+            c.execute(FEED_PAGE, (rss_id,))
+            return c.fetchall()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(name, backend, seconds, writers, readers):
+    stop = threading.Event()
+    latencies = []
+    counters = {'writes': 0, 'read_errors': 0, 'write_errors': 0}
+    lock = threading.Lock()
+
+    def writer():
+        while not stop.is_set():
+            try:
+                backend.write(job_rows(BATCH))
+                with lock:
+                    counters['writes'] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    counters['write_errors'] += 1
+            time.sleep(0.005)
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                backend.read(random.randint(1, FEEDS))
+                local.append((time.perf_counter() - started) * 1000)
+            except sqlite3.OperationalError:
+                with lock:
+                    counters['read_errors'] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    print(f"{name:>6}: reads/s {len(latencies) / seconds:8.0f}   "
+          f"p50 {percentile(latencies, 50):7.2f}ms  p95 {percentile(latencies, 95):7.2f}ms  "
+          f"p99 {percentile(latencies, 99):7.2f}ms  max {max(latencies, default=0):8.2f}ms   "
+          f"batches written {counters['writes']:5d}   "
+          f"errors r/w {counters['read_errors']}/{counters['write_errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4, help='concurrent fetcher-style writer threads')
+    parser.add_argument('--readers', type=int, default=4, help='concurrent list-page reader threads')
+    parser.add_argument('--seed-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, backend_cls in (('stock', Stock), ('tuned', Tuned)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            setup(path, args.seed_rows)
+            run(name, backend_cls(path), args.seconds, args.writers, args.readers)
+
+
+if __name__ == '__main__':
+    main()
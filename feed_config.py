@@ -0,0 +1,102 @@
+"""In-process cache of the rss_feeds configuration.
+
+Every page renders the feed list, and every proposal reads a feed's
+prompts. Both used to be a SELECT on rss_feeds; now they come from a
+snapshot of the table held in each process, with id -> row and
+name -> id lookups.
+
+The snapshot is tagged with the ``rss_feeds`` counter in
+``config_versions``. Every write to a feed's configuration calls
+``invalidate(c)`` in its own transaction, which bumps the counter, so other
+processes see the change on their next version check (at most every
+``check_interval`` seconds, one single-row SELECT) and reload. The writing
+process checks on every access until it sees the new version.
+
+Fetch state (etag, modified, content_hash, the high-water mark) changes on
+every poll without a version bump, so it is stale in the snapshot; read it
+through its own queries.
+
+    feed_configs = FeedConfigCache(get_connection, is_postgres)
+    feed_configs.all()                  # rows as SELECT * FROM rss_feeds ORDER BY name
+    feed_configs.id_for('Manual Jobs')
+    feed_configs.field(rss_id, 'proposal_prompt')
+"""
+import threading
+import time
+
+VERSION_NAME = 'rss_feeds'
+
+
+class FeedConfigCache:
+    def __init__(self, get_connection, is_postgres, check_interval=5.0):
+        """``get_connection(readonly=...)`` checks out a DB connection"""
+        self.get_connection = get_connection
+        self.is_postgres = is_postgres
+        self.check_interval = check_interval
+        self.version = None
+        self._rows = []
+        self._by_id = {}
+        self._by_name = {}
+        self._columns = {}  # column name -> index in a row
+        self._next_check = 0.0
+        self._check_until = 0.0  # after a local write: check every access until it shows up
+        self._lock = threading.Lock()
+
+    def _load(self):
+        p = '%s' if self.is_postgres else '?'
+        conn = self.get_connection(readonly=True)
+        try:
+            c = conn.cursor()
+            c.execute(f"SELECT version FROM config_versions WHERE name = {p}", (VERSION_NAME,))
+            version = c.fetchone()[0]
+            if version == self.version:
+                return
+            c.execute("SELECT * FROM rss_feeds ORDER BY name")
+            columns = {column[0]: i for i, column in enumerate(c.description)}
+            rows = c.fetchall()
+        finally:
+            conn.close()
+        self._rows = rows
+        self._by_id = {row[0]: row for row in rows}
+        # First feed by name order wins, like the old SELECT ... WHERE name = ? LIMIT 1
+        self._by_name = {}
+        for row in rows:
+            self._by_name.setdefault(row[1], row[0])
+        self._columns = columns
+        self.version = version
+        self._check_until = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        with self._lock:
+            if self.version is None or now >= self._next_check or now < self._check_until:
+                self._load()
+                self._next_check = now + self.check_interval
+
+    def all(self):
+        """Every feed row, ordered by name"""
+        self._refresh()
+        return list(self._rows)
+
+    def get(self, rss_id):
+        self._refresh()
+        if isinstance(rss_id, str) and rss_id.isdigit():  # ids from JSON bodies and forms
+            rss_id = int(rss_id)
+        return self._by_id.get(rss_id)
+
+    def id_for(self, name):
+        """Id of the feed with this name, or None"""
+        self._refresh()
+        return self._by_name.get(name)
+
+    def field(self, rss_id, column):
+        """One column of a feed, e.g. 'keyword_prompt'; None for an unknown feed"""
+        row = self.get(rss_id)
+        return None if row is None else row[self._columns[column]]
+
+    def invalidate(self, c):
+        """Bump the version in the caller's transaction, after it has written to rss_feeds"""
+        p = '%s' if self.is_postgres else '?'
+        c.execute(f"UPDATE config_versions SET version = version + 1 WHERE name = {p}", (VERSION_NAME,))
+        with self._lock:
+            self._check_until = time.monotonic() + self.check_interval
@@ -0,0 +1,114 @@
+"""Shared asyncio HTTP client for feed downloads.
+
+One background event loop owns a single ``httpx.AsyncClient``, so every feed
+download shares its connection pool. Connections are kept alive between
+polls, and HTTP/2 multiplexes requests to the same host over one connection
+when the ``h2`` package is installed (``httpx[http2]``). A per-host semaphore
+caps how many requests go to one host at once, whatever the total
+concurrency is.
+
+Callers on ordinary threads get a ``concurrent.futures.Future`` back:
+
+    client = AsyncFeedClient(timeout=30, per_host=8)
+    future = client.fetch(url, {'If-None-Match': etag})
+    response = future.result()  # httpx.Response
+"""
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncFeedClient:
+    def __init__(self, timeout=30, max_connections=20, per_host=8, keepalive_expiry=60,
+                 http2=True, headers=None):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.headers = headers or {}
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._host_limits = {}  # host -> asyncio.Semaphore, only touched on the loop
+        self._in_flight = 0
+        self._requests = 0
+        self._http_versions = {}
+
+    # Lifecycle
+
+    def start(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=self.keepalive_expiry),
+                headers=self.headers,
+                follow_redirects=True)
+            self._thread = threading.Thread(target=self._loop.run_forever, name='feed-http', daemon=True)
+            self._thread.start()
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+            client, self._client = self._client, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        self._host_limits = {}
+
+    # Requests
+
+    async def get(self, url, headers=None):
+        """GET on the loop, waiting for a free slot for the URL's host"""
+        host = urlparse(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        async with limit:
+            self._in_flight += 1
+            try:
+                response = await self._client.get(url, headers=headers)
+            finally:
+                self._in_flight -= 1
+        self._requests += 1
+        self._http_versions[response.http_version] = self._http_versions.get(response.http_version, 0) + 1
+        return response
+
+    def submit(self, coro):
+        """Run a coroutine on the client's loop; returns a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def fetch(self, url, headers=None):
+        return self.submit(self.get(url, headers))
+
+    def stats(self):
+        return {
+            'http2': self.http2,
+            'requests': self._requests,
+            'in_flight': self._in_flight,
+            'hosts': len(self._host_limits),
+            'http_versions': dict(self._http_versions),
+            'max_connections': self.max_connections,
+            'per_host': self.per_host,
+        }
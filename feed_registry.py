@@ -0,0 +1,119 @@
+"""In-process registry of RSS feeds and their polling lifecycle.
+
+The registry holds each feed's configuration (name, URL, active flag, fixed
+poll interval) and drives the FeedScheduler to match it:
+
+* ``start``       - register a feed and schedule it (or hold it paused)
+* ``stop``        - forget a feed entirely
+* ``pause``       - keep the feed registered but stop polling it
+* ``resume``      - poll a paused feed again
+* ``reconfigure`` - change URL, name or interval. A new URL is polled right away.
+
+The admin routes call these directly, so a change made through this
+process takes effect on the spot, and paused feeds cost nothing between
+polls. Changes made through other worker processes arrive via ``sync``,
+which reconciles the registry with the rows in rss_feeds.
+
+Every process keeps a registry, but only the leader (see leader.py) runs
+the scheduler that polls.
+"""
+import threading
+
+
+class FeedConfig:
+    def __init__(self, rss_id, name, url, active=True, poll_interval=None):
+        self.rss_id = rss_id
+        self.name = name
+        self.url = url
+        self.active = active
+        self.poll_interval = poll_interval
+
+
+class FeedRegistry:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._feeds = {}
+        self._lock = threading.RLock()
+
+    def start(self, rss_id, url, name=None, poll_interval=None, active=True):
+        with self._lock:
+            if rss_id in self._feeds:
+                self.reconfigure(rss_id, url=url, name=name, poll_interval=poll_interval)
+                (self.resume if active else self.pause)(rss_id)
+                return
+            self._feeds[rss_id] = FeedConfig(rss_id, name, url, active, poll_interval)
+            self.scheduler.add(rss_id, url, fixed_interval=poll_interval, paused=not active)
+
+    def stop(self, rss_id):
+        with self._lock:
+            self._feeds.pop(rss_id, None)
+            self.scheduler.remove(rss_id)
+
+    def pause(self, rss_id):
+        with self._lock:
+            config = self._feeds.get(rss_id)
+            if config:
+                config.active = False
+                self.scheduler.pause(rss_id)
+
+    def resume(self, rss_id):
+        with self._lock:
+            config = self._feeds.get(rss_id)
+            if config:
+                config.active = True
+                self.scheduler.resume(rss_id)
+
+    def reconfigure(self, rss_id, url=None, name=None, poll_interval=...):
+        """Change a feed's settings; leave an argument out to keep it (poll_interval=None means adaptive)"""
+        with self._lock:
+            config = self._feeds.get(rss_id)
+            if config is None:
+                return
+            if name is not None:
+                config.name = name
+            if poll_interval is not ... and poll_interval != config.poll_interval:
+                config.poll_interval = poll_interval
+                self.scheduler.update(rss_id, fixed_interval=poll_interval)
+            if url is not None and url != config.url:
+                config.url = url
+                self.scheduler.update(rss_id, url=url)
+                self.scheduler.poll_now(rss_id)
+
+    def sync(self, feeds):
+        """Reconcile with the full list of feeds as ``FeedConfig``s (e.g. freshly read from rss_feeds)"""
+        with self._lock:
+            feeds = {feed.rss_id: feed for feed in feeds}
+            for rss_id in list(self._feeds):
+                if rss_id not in feeds:
+                    self.stop(rss_id)
+            for feed in feeds.values():
+                self.start(feed.rss_id, feed.url, name=feed.name, poll_interval=feed.poll_interval,
+                           active=feed.active)
+
+    def __contains__(self, rss_id):
+        with self._lock:
+            return rss_id in self._feeds
+
+    def get(self, rss_id):
+        with self._lock:
+            return self._feeds.get(rss_id)
+
+    def status(self):
+        """Configuration and polling state per feed"""
+        schedule = self.scheduler.status()
+        with self._lock:
+            feeds = dict(self._feeds)
+        result = {}
+        for rss_id, config in feeds.items():
+            polling = schedule.get(rss_id, {})
+            if not config.active:
+                state = 'paused'
+            elif polling.get('running'):
+                state = 'polling'
+            elif polling.get('consecutive_errors'):
+                state = 'backing_off'
+            else:
+                state = 'waiting'
+            result[rss_id] = dict(polling, name=config.name, url=config.url, active=config.active,
+                                  poll_interval=config.poll_interval, state=state)
+        return result
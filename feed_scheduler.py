@@ -0,0 +1,298 @@
+"""Single scheduler for all RSS feed polls.
+
+Replaces the one-sleeping-thread-per-feed model: one dispatcher thread keeps
+a heap of next-due times and hands due feeds to a fixed worker pool, so the
+thread count doesn't grow with the number of feeds. A feed is never polled
+twice at once. Its next poll is scheduled when the current one finishes.
+
+Each feed's interval adapts between ``min_interval`` and ``max_interval``:
+
+* new jobs found - move towards the interval that would yield about
+  ``target_new`` jobs per poll (busy feeds get polled sooner)
+* nothing new (including 304 / unchanged polls) - grow the interval by 50%
+* error - exponential backoff from the current interval, capped at
+  ``max_backoff``, reset by the next successful poll
+* fixed interval - a feed configured with its own interval (admin page)
+  always uses it
+
+Every delay gets +/- ``jitter`` so feeds started together drift apart.
+
+With a ``fetch`` stage the download no longer occupies a worker: the
+dispatcher starts it (typically on a shared async HTTP client, see
+feed_http.py) and the feed only reaches the worker pool once the response
+is in. All due feeds download concurrently while the workers parse and
+ingest the ones that have already arrived.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FeedState:
+    def __init__(self, rss_id, url, interval, fixed_interval=None):
+        self.rss_id = rss_id
+        self.url = url
+        self.interval = interval
+        self.fixed_interval = fixed_interval
+        self.paused = False
+        self.generation = 0  # bumped to invalidate heap entries
+        self.due_at = None
+        self.running = False
+        self.errors = 0
+        self.last_polled_at = None
+        self.last_new_jobs = None
+        self.last_error = None
+        self.polls = 0
+
+
+class FeedScheduler:
+    def __init__(self, poll, workers=4, min_interval=120, max_interval=1800,
+                 default_interval=600, target_new=5, max_backoff=3600, jitter=0.1, fetch=None):
+        """``poll(rss_id, url)`` returns the number of new jobs, None to leave the interval alone, or raises.
+
+        ``fetch(rss_id, url)``, if given, runs on the dispatcher and returns a
+        concurrent.futures.Future of the download (None skips this poll). ``poll`` is
+        then called as ``poll(rss_id, url, future)`` once the future is done.
+        """
+        self._poll = poll
+        self._fetch = fetch
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.target_new = target_new
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+        self._feeds = {}
+        self._heap = []  # (due_at, seq, rss_id, generation)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = None
+        self._thread = None
+        self._stopped = False
+        self._downloads = {}  # download future -> FeedState, while the fetch stage is in flight
+
+    # Lifecycle
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='feed-poll')
+            self._thread = threading.Thread(target=self._dispatch_loop, name='feed-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop dispatching. Downloads in flight are cancelled and polls already parsing finish first;
+        feeds interrupted this way are due again as soon as the scheduler is restarted."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+            executor, self._executor = self._executor, None
+        if thread:
+            thread.join()  # no new downloads after this
+        with self._cond:
+            downloads = list(self._downloads)
+        # wait() never counts a cancelled future as done, so only wait for the ones that can't be cancelled
+        wait([future for future in downloads if not future.cancel()])
+        if executor:
+            executor.shutdown(wait=True)
+
+    # Feeds
+
+    def add(self, rss_id, url, fixed_interval=None, delay=None, paused=False):
+        """Schedule a feed (first poll after ``delay`` seconds, default: spread over a few seconds)"""
+        with self._cond:
+            if rss_id in self._feeds:
+                return
+            state = FeedState(rss_id, url, fixed_interval or self.default_interval, fixed_interval)
+            self._feeds[rss_id] = state
+            if paused:
+                state.paused = True
+            else:
+                self._push(state, random.uniform(0, 5) if delay is None else delay)
+
+    def remove(self, rss_id):
+        with self._cond:
+            state = self._feeds.pop(rss_id, None)
+            if state:
+                state.generation += 1
+
+    def update(self, rss_id, url=None, fixed_interval=...):
+        """Change a feed's URL and/or fixed interval (None = adaptive); applies from the next poll"""
+        with self._cond:
+            state = self._feeds.get(rss_id)
+            if state is None:
+                return
+            if url is not None:
+                state.url = url
+            if fixed_interval is not ...:
+                state.fixed_interval = fixed_interval
+                state.interval = fixed_interval or self.default_interval
+                if not state.running and not state.paused:
+                    self._push(state, self._jittered(state.interval))
+
+    def pause(self, rss_id):
+        """Stop polling a feed but keep its state; a poll in progress finishes first"""
+        with self._cond:
+            state = self._feeds.get(rss_id)
+            if state and not state.paused:
+                state.paused = True
+                state.generation += 1
+                state.due_at = None
+
+    def resume(self, rss_id, delay=None):
+        with self._cond:
+            state = self._feeds.get(rss_id)
+            if state and state.paused:
+                state.paused = False
+                if not state.running:
+                    self._push(state, random.uniform(0, 5) if delay is None else delay)
+
+    def poll_now(self, rss_id):
+        with self._cond:
+            state = self._feeds.get(rss_id)
+            if state and not state.running and not state.paused:
+                self._push(state, 0)
+
+    def __contains__(self, rss_id):
+        with self._cond:
+            return rss_id in self._feeds
+
+    # Scheduling
+
+    def _jittered(self, delay):
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _push(self, state, delay):
+        # Caller holds self._cond
+        state.generation += 1
+        state.due_at = time.time() + delay
+        heapq.heappush(self._heap, (state.due_at, next(self._seq), state.rss_id, state.generation))
+        self._cond.notify()
+
+    def next_interval(self, state, new_jobs):
+        """Interval after a successful poll that found ``new_jobs`` (None = no observation)"""
+        if state.fixed_interval:
+            return state.fixed_interval
+        if new_jobs is None:
+            return state.interval
+        if new_jobs > 0:
+            ideal = state.interval * self.target_new / new_jobs
+            interval = (state.interval + ideal) / 2
+        else:
+            interval = state.interval * 1.5
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def backoff_delay(self, state):
+        return min(self.max_backoff, state.interval * (2 ** state.errors))
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap and self._heap[0][0] <= time.time():
+                        break
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, rss_id, generation = heapq.heappop(self._heap)
+                state = self._feeds.get(rss_id)
+                if state is None or state.generation != generation or state.running:
+                    continue  # removed, rescheduled since, or still running
+                state.running = True
+                url = state.url
+                executor = self._executor
+            if self._fetch is not None:
+                self._start_fetch(executor, state, url)
+                continue
+            try:
+                executor.submit(self._run, state, url)
+            except RuntimeError:
+                self._abandon(state)  # executor shut down by stop()
+                return
+
+    def _start_fetch(self, executor, state, url):
+        try:
+            future = self._fetch(state.rss_id, url)
+        except Exception as e:
+            self._finish(state, None, e)
+            return
+        if future is None:
+            self._finish(state, None, None)
+            return
+
+        with self._cond:
+            self._downloads[future] = state
+
+        def downloaded(future):
+            with self._cond:
+                self._downloads.pop(future, None)
+                stopped = self._stopped
+            if stopped or future.cancelled():
+                self._abandon(state)
+                return
+            try:
+                executor.submit(self._run, state, url, future)
+            except RuntimeError:
+                self._abandon(state)  # executor shut down by stop()
+        future.add_done_callback(downloaded)
+
+    def _run(self, state, url, *fetched):
+        new_jobs, error = None, None
+        try:
+            new_jobs = self._poll(state.rss_id, url, *fetched)
+        except Exception as e:
+            error = e
+        self._finish(state, new_jobs, error)
+
+    def _abandon(self, state):
+        """A poll dropped by stop(): not counted, and due again right away once restarted"""
+        with self._cond:
+            state.running = False
+            if self._feeds.get(state.rss_id) is state and not state.paused:
+                self._push(state, 0)
+
+    def _finish(self, state, new_jobs, error):
+        with self._cond:
+            state.running = False
+            state.polls += 1
+            state.last_polled_at = time.time()
+            if error is not None:
+                state.errors += 1
+                state.last_error = str(error)
+                delay = self.backoff_delay(state)
+            else:
+                state.errors = 0
+                state.last_error = None
+                state.last_new_jobs = new_jobs
+                state.interval = self.next_interval(state, new_jobs)
+                delay = state.interval
+            if self._feeds.get(state.rss_id) is state and not state.paused:
+                self._push(state, self._jittered(delay))
+
+    def status(self):
+        now = time.time()
+        with self._cond:
+            return {
+                rss_id: {
+                    'url': state.url,
+                    'interval': round(state.interval, 1),
+                    'fixed_interval': state.fixed_interval,
+                    'running': state.running,
+                    'paused': state.paused,
+                    'next_poll_in': None if state.running or state.due_at is None else round(max(0.0, state.due_at - now), 1),
+                    'polls': state.polls,
+                    'last_new_jobs': state.last_new_jobs,
+                    'consecutive_errors': state.errors,
+                    'last_error': state.last_error,
+                }
+                for rss_id, state in self._feeds.items()
+            }
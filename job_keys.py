@@ -0,0 +1,102 @@
+"""Canonical Upwork job keys.
+
+Every Upwork job has a stable ciphertext id, ``~01`` or ``~02`` followed by
+hex digits. It appears in every URL form the app sees:
+
+    https://www.upwork.com/jobs/Build-Flask-API_~0123456789abcdef01/
+    https://www.upwork.com/jobs/~0123456789abcdef01?referrer_url_path=...
+    https://www.upwork.com/freelance-jobs/apply/Build-Flask-API_~0123456789abcdef01/
+    https://www.vollna.com/go?url=https%3A%2F%2Fwww.upwork.com%2Fjobs%2F~0123456789abcdef01
+
+Job row ids are still hashes of whatever each ingest path saw (the RSS link,
+or URL + title from the extension). The key is stored in the uniquely
+indexed ``upwork_key`` column and is what ingest and lookups match on, so
+the RSS fetcher and the extension resolve the same job to the same row.
+Jobs whose URL carries no key (some redirect links) fall back to the id.
+Migration 10 merged the rows that already shared a key.
+"""
+import hashlib
+import re
+from urllib.parse import unquote
+
+import archive
+
+_KEY = re.compile(r'~(0[0-9a-f]{10,})', re.I)
+
+# Text columns a merged row fills in from its duplicates when it has no value of its own
+MERGE_FILL_COLUMNS = ('client', 'budget', 'hourly_rate', 'skills', 'categories', 'client_type',
+                      'client_name', 'client_company', 'client_city', 'client_country', 'linkedin_url',
+                      'email', 'phone', 'whatsapp', 'decision_maker', 'site', 'enriched_at',
+                      'enriched_by', 'submitted_by')
+_EMPTY = (None, '', 'Not specified', 'Unknown')
+
+
+def upwork_key(url):
+    """``~0...`` job key in any Upwork or redirect URL form, or None"""
+    if not url:
+        return None
+    # Redirect targets are percent-encoded, sometimes twice
+    match = _KEY.search(url) or _KEY.search(unquote(unquote(url)))
+    return f"~{match.group(1).lower()}" if match else None
+
+
+def extension_job_id(url, title):
+    """Row id the Chrome extension routes give a new job: URL without query + title"""
+    return hashlib.md5(f"{url.split('?')[0]}_{title.strip()}".encode()).hexdigest()
+
+
+def backfill(c, is_postgres):
+    """Migration step: extract keys for jobs stored before the upwork_key column existed"""
+    p = '%s' if is_postgres else '?'
+    for table in ('jobs', archive.ARCHIVE_TABLE):
+        c.execute(f"SELECT id, url FROM {table} WHERE upwork_key IS NULL")
+        rows = [(key, job_id) for key, job_id in ((upwork_key(url), job_id) for job_id, url in c.fetchall()) if key]
+        if rows:
+            c.executemany(f"UPDATE {table} SET upwork_key = {p} WHERE id = {p}", rows)
+
+
+def _rank(row):
+    """Which copy of a job survives a merge: worked-on beats untouched"""
+    return (row['enriched'] == 1,
+            row['proposal_status'] not in (None, 'Not Submitted'),
+            row['outreach_status'] not in (None, 'Pending'),
+            row['processed'] == 1)
+
+
+def merge_duplicates(c, is_postgres):
+    """Collapse jobs rows sharing an upwork_key into one. Returns the number of rows removed.
+
+    The survivor is the most worked-on copy (the oldest one on a tie). It takes over empty
+    fields and the proposal of the others, and near-duplicates flagged against them.
+    """
+    p = '%s' if is_postgres else '?'
+    c.execute("SELECT upwork_key FROM jobs WHERE upwork_key IS NOT NULL GROUP BY upwork_key HAVING COUNT(*) > 1")
+    removed = 0
+    for (key,) in c.fetchall():
+        c.execute(f"SELECT * FROM jobs WHERE upwork_key = {p} ORDER BY posted_at, id", (key,))
+        columns = [column[0] for column in c.description]
+        rows = [dict(zip(columns, row)) for row in c.fetchall()]
+        keeper = max(rows, key=_rank)
+        others = sorted((row for row in rows if row is not keeper), key=_rank, reverse=True)
+
+        fill = {}
+        for column in MERGE_FILL_COLUMNS:
+            if column in keeper and keeper[column] in _EMPTY:
+                value = next((row[column] for row in others if row[column] not in _EMPTY), None)
+                if value is not None:
+                    fill[column] = value
+        if fill:
+            assignments = ', '.join(f"{column} = {p}" for column in fill)
+            c.execute(f"UPDATE jobs SET {assignments} WHERE id = {p}", tuple(fill.values()) + (keeper['id'],))
+
+        for row in others:
+            # proposals.job_id is unique: move the first proposal over, drop the rest
+            c.execute(f"""UPDATE proposals SET job_id = {p} WHERE job_id = {p}
+                          AND NOT EXISTS (SELECT 1 FROM proposals WHERE job_id = {p})""",
+                      (keeper['id'], row['id'], keeper['id']))
+            c.execute(f"DELETE FROM proposals WHERE job_id = {p}", (row['id'],))
+            c.execute(f"UPDATE jobs SET duplicate_of = {p} WHERE duplicate_of = {p}", (keeper['id'], row['id']))
+            c.execute(f"DELETE FROM jobs WHERE id = {p}", (row['id'],))
+            removed += 1
+    return removed
+
@@ -0,0 +1,51 @@
+"""SQL for the job list tabs (feed, enriched, sent).
+
+Each tab is a filter on jobs listed newest first. Every filter has an
+index (see migrations.py) that serves both the filter and the
+``posted_at DESC, id DESC`` order, so a page reads only the rows it shows.
+Pages continue with a keyset cursor on (posted_at, id).
+tests/test_query_plans.py checks that the plans stay that way.
+
+    c.execute(job_lists.sql('feed', is_postgres, limit=51), (rss_id,))
+"""
+import archive
+
+# Tab -> (filter, the index that serves it in posted_at order)
+VIEWS = {
+    'feed': ("rss_source_id = {p} AND enriched = 0", 'idx_jobs_feed_posted'),
+    'enriched': ("enriched = 1 AND (outreach_status != 'Sent' OR outreach_status IS NULL)", 'idx_jobs_enriched_unsent'),
+    'sent': ("enriched = 1 AND outreach_status = 'Sent'", 'idx_jobs_sent'),
+}
+
+# Slim card projection. Positions match the full jobs row the templates index into,
+# but the description is cut to the preview length and skills/categories are left
+# out - cards load those on demand from /api/job/<id>/details.
+DESCRIPTION_PREVIEW = 200
+FIELDS = [
+    'id', 'title', f'SUBSTR(description, 1, {DESCRIPTION_PREVIEW}) AS description', 'url',
+    'client', 'budget', 'posted_date', 'processed', 'client_type', 'client_name',
+    'client_company', 'client_city', 'client_country', 'linkedin_url', 'email', 'phone',
+    'whatsapp', 'enriched', 'decision_maker', 'NULL AS skills', 'NULL AS categories',
+    'hourly_rate', 'site', 'rss_source_id', 'outreach_status', 'proposal_status',
+    'submitted_by', 'enriched_at', 'enriched_by', 'posted_at', 'duplicate_of'
+]
+COLUMNS = ', '.join(FIELDS)
+
+
+def sql(view, is_postgres, after_cursor=False, limit=None, include_archived=False):
+    """SELECT for one page of a tab. Parameters: the feed id ('feed' only), then the cursor's
+    posted_at and id with after_cursor; include_archived repeats them for jobs_archive."""
+    where, _ = VIEWS[view]
+    p = '%s' if is_postgres else '?'
+    where = where.format(p=p)
+    if after_cursor:
+        # Keyset pagination: continue strictly after the last (posted_at, id) seen
+        where += f" AND (posted_at, id) < ({p}, {p})"
+    order = " ORDER BY posted_at DESC, id DESC" + (f" LIMIT {int(limit)}" if limit else "")
+    query = f"SELECT {COLUMNS} FROM jobs WHERE {where}{order}"
+    if include_archived:
+        # Each tier returns its own top rows, merged by the outer sort; parameters repeat per tier
+        archived = f"SELECT {COLUMNS} FROM {archive.ARCHIVE_TABLE} WHERE {where}{order}"
+        query = (f"SELECT * FROM (SELECT * FROM ({query}) AS hot UNION ALL "
+                 f"SELECT * FROM ({archived}) AS cold) AS all_jobs{order}")
+    return query
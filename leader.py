@@ -0,0 +1,179 @@
+"""Leader election for background work.
+
+Every web worker process imports app.py, but feed polling and archiving
+should run in exactly one of them. Each process runs an election thread
+that keeps trying to take a lock, and whichever process holds it is the
+leader:
+
+* Postgres - a session-level advisory lock held on a dedicated connection
+  (not a pooled one). If the leader dies, its connection closes and the
+  server releases the lock.
+* SQLite - an exclusive ``flock`` on a lock file next to the database. The
+  kernel releases it when the process exits.
+
+Standbys retry every ``interval`` seconds, so one of them takes over within
+about that long after the leader goes away. The leader checks its lock on
+the same interval and steps down if it lost it (e.g. its Postgres
+connection dropped), so two processes never lead at once for longer than
+one interval.
+
+    election = LeaderElection(AdvisoryLock(connect), on_elected=start, on_demoted=stop,
+                              on_check=sync)
+    election.start()
+"""
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+
+class AdvisoryLock:
+    """Postgres session-level advisory lock on its own connection"""
+
+    def __init__(self, connect, name='mindwork_background_leader'):
+        self._connect = connect
+        self.name = name
+        self._conn = None
+
+    def _close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def try_acquire(self):
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+                self._conn.autocommit = True
+            c = self._conn.cursor()
+            c.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (self.name,))
+            if c.fetchone()[0]:
+                return True
+        except Exception:
+            pass
+        self._close()
+        return False
+
+    def check(self):
+        """Whether the lock is still held; a dead connection means the server released it"""
+        try:
+            c = self._conn.cursor()
+            c.execute("""SELECT 1 FROM pg_locks
+                         WHERE locktype = 'advisory' AND pid = pg_backend_pid() AND granted""")
+            if c.fetchone():
+                return True
+        except Exception:
+            pass
+        self._close()
+        return False
+
+    def release(self):
+        self._close()
+
+
+class FileLock:
+    """Exclusive flock on a lock file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def try_acquire(self):
+        if fcntl is None:
+            return True
+        lock_file = open(self.path, 'a+')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def check(self):
+        return fcntl is None or self._file is not None
+
+    def release(self):
+        lock_file, self._file = self._file, None
+        if lock_file is not None:
+            lock_file.close()  # drops the flock
+
+
+class LeaderElection:
+    def __init__(self, lock, on_elected, on_demoted, on_check=None, interval=15):
+        """``on_elected``/``on_demoted`` start and stop the background work; ``on_check``
+        runs after every check, leader or not"""
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_check = on_check
+        self.interval = interval
+        self.is_leader = False
+        self.leader_since = None
+        self.elections = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='leader-election', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread:
+            thread.join()
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Leader election callback error: {e}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if not self.is_leader:
+                if self.lock.try_acquire():
+                    self.is_leader = True
+                    self.leader_since = time.time()
+                    self.elections += 1
+                    print(f"Process {os.getpid()} is now the background worker leader")
+                    self._call(self.on_elected)
+            elif not self.lock.check():
+                self._step_down("lost the leader lock")
+            if self.on_check:
+                self._call(self.on_check)
+            self._stop.wait(self.interval)
+
+        if self.is_leader:
+            self._step_down("shutting down")
+        self.lock.release()
+
+    def _step_down(self, reason):
+        self.is_leader = False
+        self.leader_since = None
+        print(f"Process {os.getpid()} stopped leading background work: {reason}")
+        self._call(self.on_demoted)
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'is_leader': self.is_leader,
+            'leader_for': round(time.time() - self.leader_since, 1) if self.leader_since else None,
+            'elections_won': self.elections,
+            'check_interval': self.interval,
+        }
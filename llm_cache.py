@@ -0,0 +1,219 @@
+"""Content-addressed cache for LLM completions.
+
+Keyword extraction, proposals and outreach messages are single-prompt chat
+completions. The same prompt comes back whenever someone clicks
+"Proposal" again, or the same job is handled through both ingest paths.
+The completion text is cached under sha256(model, max_tokens, prompt):
+
+* an in-memory LRU in each process, in front of
+* the ``llm_cache`` table, shared by every process and kept across restarts.
+
+Entries expire ``ttl`` seconds after they were created. The table is capped
+at ``max_rows``; when it grows past that, the least recently used rows are
+deleted. Only table hits refresh ``last_used_at``, so a key that stays hot
+in memory can still age out of the table. Concurrent requests for the same
+key in one process wait for the first call instead of repeating it.
+``force_refresh`` skips the lookup and replaces the stored text.
+
+``stream`` is the same for streamed completions: a hit yields the stored
+text in one piece, a miss relays the pieces as they arrive and stores the
+whole text once the stream has ended. Streams don't wait for each other,
+and one that is abandoned part way (the browser went away) stores nothing.
+
+    cache = LLMCache(get_connection, is_postgres)
+    text, cached = cache.get_or_create('gpt-4o-mini', prompt, 1000, call_openai)
+    pieces, cached = cache.stream('gpt-4o-mini', prompt, 1000, stream_openai)
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(model, prompt, max_tokens):
+    return hashlib.sha256(json.dumps([model, max_tokens, prompt]).encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, get_connection, is_postgres, ttl=30 * 86400, memory_entries=512, max_rows=20000,
+                 evict_every=100):
+        """``get_connection(readonly=...)`` checks out a DB connection; ttl=0 turns the cache off"""
+        self.get_connection = get_connection
+        self.is_postgres = is_postgres
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.evict_every = evict_every
+        self._memory = OrderedDict()  # key -> (text, created_at)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Event set when the first caller has stored its result
+        self._stores = 0
+        self._stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0, 'evicted': 0}
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def _remember(self, key, text, created_at):
+        with self._lock:
+            self._memory[key] = (text, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if now - entry[1] > self.ttl:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry[0]
+
+    def _from_db(self, key, now):
+        p = '%s' if self.is_postgres else '?'
+        conn = self.get_connection(readonly=True)
+        try:
+            c = conn.cursor()
+            c.execute(f"SELECT response, created_at FROM llm_cache WHERE cache_key = {p}", (key,))
+            row = c.fetchone()
+        finally:
+            conn.close()
+        if row is None or now - row[1] > self.ttl:
+            return None
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.execute(f"UPDATE llm_cache SET last_used_at = {p}, hits = hits + 1 WHERE cache_key = {p}", (now, key))
+            conn.commit()
+        finally:
+            conn.close()
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def get(self, key):
+        """Cached text for a key, or None"""
+        now = time.time()
+        text = self._from_memory(key, now)
+        if text is not None:
+            self._count('memory_hits')
+            return text
+        text = self._from_db(key, now)
+        if text is not None:
+            self._count('db_hits')
+        return text
+
+    def put(self, key, model, max_tokens, text):
+        now = time.time()
+        p = '%s' if self.is_postgres else '?'
+        conn = self.get_connection()
+        try:
+            c = conn.cursor()
+            c.execute(f"""INSERT INTO llm_cache (cache_key, model, max_tokens, response, created_at, last_used_at, hits)
+                          VALUES ({p}, {p}, {p}, {p}, {p}, {p}, 0)
+                          ON CONFLICT (cache_key) DO UPDATE SET response = excluded.response,
+                              created_at = excluded.created_at, last_used_at = excluded.last_used_at""",
+                      (key, model, max_tokens, text, now, now))
+            with self._lock:
+                self._stores += 1
+                evict = self._stores % self.evict_every == 0
+            if evict:
+                self._count('evicted', self.evict(c, now))
+            conn.commit()
+        finally:
+            conn.close()
+        self._remember(key, text, now)
+
+    def evict(self, c, now=None):
+        """Delete expired rows and the least recently used ones beyond max_rows. Returns rows deleted."""
+        now = time.time() if now is None else now
+        p = '%s' if self.is_postgres else '?'
+        c.execute(f"DELETE FROM llm_cache WHERE created_at < {p}", (now - self.ttl,))
+        deleted = c.rowcount
+        c.execute(f"SELECT last_used_at FROM llm_cache ORDER BY last_used_at DESC LIMIT 1 OFFSET {int(self.max_rows)}")
+        cutoff = c.fetchone()
+        if cutoff:
+            c.execute(f"DELETE FROM llm_cache WHERE last_used_at <= {p}", cutoff)
+            deleted += c.rowcount
+        return deleted
+
+    def _lookup(self, key):
+        try:
+            return self.get(key)
+        except Exception as e:
+            # The cache must never take the feature down with it
+            print(f"LLM cache read error: {e}")
+            self._count('errors')
+            return None
+
+    def _store(self, key, model, max_tokens, text):
+        try:
+            self.put(key, model, max_tokens, text)
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+            self._count('errors')
+
+    def get_or_create(self, model, prompt, max_tokens, create, force_refresh=False):
+        """(text, cached) for a prompt; ``create()`` makes the call and returns the text on a miss"""
+        if not self.enabled:
+            return create(), False
+        key = cache_key(model, prompt, max_tokens)
+        while True:
+            if not force_refresh:
+                text = self._lookup(key)
+                if text is not None:
+                    return text, True
+            with self._lock:
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    done = self._inflight[key] = threading.Event()
+            if waiting is None:
+                break
+            waiting.wait()
+            force_refresh = False  # the call we waited for just refreshed it
+
+        try:
+            self._count('refreshes' if force_refresh else 'misses')
+            text = create()
+            self._store(key, model, max_tokens, text)
+            return text, False
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def stream(self, model, prompt, max_tokens, create_stream, force_refresh=False):
+        """(pieces, cached) for a prompt; ``create_stream()`` makes the call and returns an iterable of text
+        pieces on a miss. The call starts when ``pieces`` is first iterated."""
+        if not self.enabled:
+            return iter(create_stream()), False
+        key = cache_key(model, prompt, max_tokens)
+        if not force_refresh:
+            text = self._lookup(key)
+            if text is not None:
+                return iter([text]), True
+        return self._relay(key, model, max_tokens, create_stream, force_refresh), False
+
+    def _relay(self, key, model, max_tokens, create_stream, force_refresh):
+        self._count('refreshes' if force_refresh else 'misses')
+        pieces = []
+        for piece in create_stream():
+            pieces.append(piece)
+            yield piece
+        self._store(key, model, max_tokens, ''.join(pieces))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 3) if lookups else None
+        stats.update(ttl=self.ttl, memory_capacity=self.memory_entries, max_rows=self.max_rows)
+        return stats
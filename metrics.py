@@ -0,0 +1,227 @@
+"""Ingest metrics in the Prometheus text exposition format.
+
+A few counters, gauges and histograms kept in process memory and rendered
+by ``/metrics`` for a Prometheus scrape, without a client library. Values
+are per process. Feeds are only polled by the leader (see leader.py), so
+``mindwork_background_leader`` tells which scrape target carries the feed
+series.
+
+    registry = Registry()
+    fetches = registry.histogram('feed_fetch_seconds', 'Feed download time', ['feed'], buckets=(0.1, 1, 10))
+    fetches.observe(0.42, feed=3)
+    registry.render()
+"""
+import math
+import threading
+import time
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}  # label values tuple -> value
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        """(suffix, label names, label values, value) for every series"""
+        with self._lock:
+            values = dict(self._values)
+        return [('', self.labels, key, value) for key, value in sorted(values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=(), collect=None):
+        """``collect`` returns {label values tuple: value} at render time instead of set() values"""
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self.collect is None:
+            return super().samples()
+        values = {tuple(str(value) for value in key): value for key, value in self.collect().items()}
+        return [('', self.labels, key, value) for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0, 0.0]  # bucket counts, count, sum
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), count, total) for key, (counts, count, total) in self._values.items()}
+        samples = []
+        names = self.labels + ('le',)
+        for key, (counts, count, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', names, key + (_format_value(float(bound)),), cumulative))
+            samples.append(('_count', self.labels, key, count))
+            samples.append(('_sum', self.labels, key, total))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), collect=None):
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name, help, labels=(), **kwargs):
+        return self.register(Histogram(name, help, labels, **kwargs))
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+class FeedMetrics:
+    """The RSS ingest series, labelled by feed id"""
+
+    def __init__(self, registry=None, is_leader=None):
+        self.registry = registry or Registry()
+        r = self.registry
+        self.polls = r.counter('mindwork_feed_polls_total',
+                               'Feed polls by outcome (not_modified, unchanged, parsed, errors)', ['feed', 'outcome'])
+        self.fetch_seconds = r.histogram('mindwork_feed_fetch_seconds', 'HTTP download time of a feed', ['feed'],
+                                         buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30))
+        self.bytes = r.counter('mindwork_feed_downloaded_bytes_total', 'Feed body bytes downloaded', ['feed'])
+        self.entries = r.counter('mindwork_feed_entries_parsed_total', 'Entries in parsed feed bodies', ['feed'])
+        self.new_jobs = r.counter('mindwork_feed_new_jobs_total', 'Jobs inserted from a feed', ['feed'])
+        self.near_duplicates = r.counter('mindwork_feed_near_duplicates_total',
+                                         'Feed entries matched to a stored job by near_dup', ['feed'])
+        self.new_job_ratio = r.gauge('mindwork_feed_new_job_ratio',
+                                     'New jobs / entries parsed, on the last parsed poll', ['feed'])
+        self.db_write_seconds = r.histogram('mindwork_feed_db_write_seconds',
+                                            'Time to insert a poll\'s jobs and commit', ['feed'],
+                                            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+        self.last_success = r.gauge('mindwork_feed_last_success_timestamp_seconds',
+                                    'Unix time of the last poll without an error', ['feed'])
+        self.last_success_age = r.gauge('mindwork_feed_last_success_age_seconds',
+                                        'Seconds since the last poll without an error', ['feed'],
+                                        collect=self._last_success_ages)
+        if is_leader is not None:
+            r.gauge('mindwork_background_leader', '1 if this process polls feeds',
+                    collect=lambda: {(): 1 if is_leader() else 0})
+
+    def _last_success_ages(self):
+        now = time.time()
+        return {key: round(now - at, 3) for _, _, key, at in self.last_success.samples()}
+
+    def poll(self, rss_id, outcome):
+        self.polls.inc(feed=rss_id, outcome=outcome)
+        if outcome != 'errors':
+            self.last_success.set(time.time(), feed=rss_id)
+
+    def download(self, rss_id, seconds, size):
+        self.fetch_seconds.observe(seconds, feed=rss_id)
+        self.bytes.inc(size, feed=rss_id)
+
+    def ingest(self, rss_id, entries, inserted, near_duplicates, db_seconds):
+        self.entries.inc(entries, feed=rss_id)
+        self.new_jobs.inc(inserted, feed=rss_id)
+        self.near_duplicates.inc(near_duplicates, feed=rss_id)
+        if entries:
+            self.new_job_ratio.set(inserted / entries, feed=rss_id)
+        self.db_write_seconds.observe(db_seconds, feed=rss_id)
+
+    def render(self):
+        return self.registry.render()
+
+
+class ProposalMetrics:
+    """Stage and end-to-end latency of the /generate_proposal pipeline"""
+
+    def __init__(self, registry=None):
+        self.registry = registry or Registry()
+        r = self.registry
+        buckets = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+        self.stage_seconds = r.histogram('mindwork_proposal_stage_seconds', 'Time per proposal pipeline stage',
+                                         ['stage'], buckets=buckets)
+        self.stage_failures = r.counter('mindwork_proposal_stage_failures_total',
+                                        'Proposal stages that timed out or raised', ['stage', 'status'])
+        self.seconds = r.histogram('mindwork_proposal_seconds', 'End-to-end proposal pipeline time', buckets=buckets)
+
+    def observe(self, timings, seconds):
+        """``timings`` as returned by pipeline.Pipeline.run"""
+        for stage, timing in timings.items():
+            if timing.status == 'skipped':
+                continue
+            self.stage_seconds.observe(timing.seconds, stage=stage)
+            if timing.status != 'ok':
+                self.stage_failures.inc(stage=stage, status=timing.status)
+        self.seconds.observe(seconds)
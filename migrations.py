@@ -0,0 +1,286 @@
+"""Versioned schema migrations for the PostgreSQL and SQLite databases.
+
+Each migration runs exactly once and is recorded in the ``schema_version``
+table, so app startup and request handlers never have to probe the schema
+with ALTER TABLE. Apply pending migrations at deploy time with:
+
+    python migrations.py            # apply everything pending
+    python migrations.py --status   # show current/latest version
+
+The app also calls ``migrate()`` on boot; when the schema is already current
+that is a no-op CREATE TABLE IF NOT EXISTS plus a single SELECT.
+"""
+import os
+import sys
+from datetime import datetime
+
+import archive
+import job_keys
+import near_dup
+import rollups
+from timestamps import to_posted_at
+
+
+class AddColumn:
+    """Idempotent ``ALTER TABLE ... ADD COLUMN`` that works on both dialects."""
+
+    def __init__(self, table, column, definition):
+        self.table = table
+        self.column = column
+        self.definition = definition
+
+    def apply(self, c, is_postgres):
+        if is_postgres:
+            c.execute(f'ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS {self.column} {self.definition}')
+            return
+        c.execute(f'PRAGMA table_info({self.table})')
+        if self.column not in [row[1] for row in c.fetchall()]:
+            c.execute(f'ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}')
+
+
+def sql(postgres, sqlite=None):
+    """A statement with an optional SQLite-specific variant"""
+    return {'postgres': postgres, 'sqlite': sqlite if sqlite is not None else postgres}
+
+
+def _backfill_posted_at(c, is_postgres):
+    """Populate posted_at from the free-form posted_date text"""
+    c.execute("SELECT id, posted_date FROM jobs WHERE posted_at IS NULL")
+    rows = [(to_posted_at(posted_date), job_id) for job_id, posted_date in c.fetchall()]
+    if rows:
+        placeholder = '%s' if is_postgres else '?'
+        c.executemany(f"UPDATE jobs SET posted_at = {placeholder} WHERE id = {placeholder}", rows)
+
+
+def _run_step(c, step, is_postgres):
+    if isinstance(step, AddColumn):
+        step.apply(c, is_postgres)
+    elif callable(step):
+        step(c, is_postgres)
+    elif isinstance(step, dict):
+        c.execute(step['postgres' if is_postgres else 'sqlite'])
+    else:
+        c.execute(step)
+
+
+MIGRATIONS = [
+    (1, 'baseline schema', [
+        sql('''CREATE TABLE IF NOT EXISTS users
+               (id SERIAL PRIMARY KEY, email TEXT UNIQUE, password TEXT, active INTEGER DEFAULT 1)''',
+            '''CREATE TABLE IF NOT EXISTS users
+               (id INTEGER PRIMARY KEY, email TEXT UNIQUE, password TEXT, active INTEGER DEFAULT 1)'''),
+        sql('''CREATE TABLE IF NOT EXISTS rss_feeds
+               (id SERIAL PRIMARY KEY, name TEXT, url TEXT, active INTEGER DEFAULT 1,
+                keyword_prompt TEXT, proposal_prompt TEXT, olostep_prompt TEXT)''',
+            '''CREATE TABLE IF NOT EXISTS rss_feeds
+               (id INTEGER PRIMARY KEY, name TEXT, url TEXT, active INTEGER DEFAULT 1,
+                keyword_prompt TEXT, proposal_prompt TEXT, olostep_prompt TEXT)'''),
+        '''CREATE TABLE IF NOT EXISTS jobs
+           (id TEXT PRIMARY KEY, title TEXT, description TEXT, url TEXT,
+            client TEXT, budget TEXT, posted_date TEXT, processed INTEGER DEFAULT 0,
+            client_type TEXT, client_name TEXT, client_company TEXT, client_city TEXT,
+            client_country TEXT, linkedin_url TEXT, email TEXT, phone TEXT,
+            whatsapp TEXT, enriched INTEGER DEFAULT 0, decision_maker TEXT,
+            skills TEXT, categories TEXT, hourly_rate TEXT, site TEXT, rss_source_id INTEGER)''',
+        sql('''CREATE TABLE IF NOT EXISTS proposals
+               (id SERIAL PRIMARY KEY, job_id TEXT UNIQUE, proposal TEXT,
+                examples TEXT, created_at TEXT, debug_log TEXT, enrichment_author TEXT)''',
+            '''CREATE TABLE IF NOT EXISTS proposals
+               (id INTEGER PRIMARY KEY, job_id TEXT UNIQUE, proposal TEXT,
+                examples TEXT, created_at TEXT, debug_log TEXT, enrichment_author TEXT)'''),
+        sql('''CREATE TABLE IF NOT EXISTS team_profiles
+               (id SERIAL PRIMARY KEY, name TEXT, title TEXT, skills TEXT,
+                description TEXT, profile_url TEXT, hourly_rate TEXT,
+                experience_years INTEGER, specialization TEXT, active INTEGER DEFAULT 1)''',
+            '''CREATE TABLE IF NOT EXISTS team_profiles
+               (id INTEGER PRIMARY KEY, name TEXT, title TEXT, skills TEXT,
+                description TEXT, profile_url TEXT, hourly_rate TEXT,
+                experience_years INTEGER, specialization TEXT, active INTEGER DEFAULT 1)'''),
+        # Columns that older databases picked up via ALTER TABLE over time.
+        # Order matters: templates read the status columns positionally (24-28).
+        AddColumn('jobs', 'rss_source_id', 'INTEGER'),
+        AddColumn('jobs', 'client_type', 'TEXT'),
+        AddColumn('jobs', 'client_name', 'TEXT'),
+        AddColumn('jobs', 'client_company', 'TEXT'),
+        AddColumn('jobs', 'client_city', 'TEXT'),
+        AddColumn('jobs', 'client_country', 'TEXT'),
+        AddColumn('jobs', 'linkedin_url', 'TEXT'),
+        AddColumn('jobs', 'email', 'TEXT'),
+        AddColumn('jobs', 'phone', 'TEXT'),
+        AddColumn('jobs', 'whatsapp', 'TEXT'),
+        AddColumn('jobs', 'enriched', 'INTEGER DEFAULT 0'),
+        AddColumn('jobs', 'decision_maker', 'TEXT'),
+        AddColumn('jobs', 'skills', 'TEXT'),
+        AddColumn('jobs', 'categories', 'TEXT'),
+        AddColumn('jobs', 'hourly_rate', 'TEXT'),
+        AddColumn('jobs', 'site', 'TEXT'),
+        AddColumn('jobs', 'outreach_status', "TEXT DEFAULT 'Pending'"),
+        AddColumn('jobs', 'proposal_status', "TEXT DEFAULT 'Not Submitted'"),
+        AddColumn('jobs', 'submitted_by', 'TEXT'),
+        AddColumn('jobs', 'enriched_at', 'TEXT'),
+        AddColumn('jobs', 'enriched_by', 'TEXT'),
+    ]),
+    (2, 'typed posted_at column and job list indexes', [
+        AddColumn('jobs', 'posted_at', 'TIMESTAMP'),
+        _backfill_posted_at,
+        # Feed tab: WHERE rss_source_id = ? AND enriched = 0 ORDER BY posted_at DESC, id DESC
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_feed_posted
+           ON jobs (rss_source_id, enriched, posted_at DESC, id DESC)''',
+        # Enriched tab: enriched, not yet sent
+        '''CREATE INDEX IF NOT EXISTS idx_jobs_enriched_unsent
+           ON jobs (posted_at DESC, id DESC)
+           WHERE enriched = 1 AND (outreach_status != 'Sent' OR outreach_status IS NULL)''',
+        # Sent tab
+        """CREATE INDEX IF NOT EXISTS idx_jobs_sent
+           ON jobs (posted_at DESC, id DESC)
+           WHERE enriched = 1 AND outreach_status = 'Sent'""",
+    ]),
+    (3, 'monthly analytics rollups', [
+        f'''CREATE TABLE IF NOT EXISTS {rollups.ENRICHMENT_TABLE}
+            (month TEXT, enriched_by TEXT, job_count INTEGER NOT NULL DEFAULT 0,
+             PRIMARY KEY (month, enriched_by))''',
+        f'''CREATE TABLE IF NOT EXISTS {rollups.PROPOSAL_TABLE}
+            (month TEXT, submitted_by TEXT, proposal_status TEXT, job_count INTEGER NOT NULL DEFAULT 0,
+             PRIMARY KEY (month, submitted_by, proposal_status))''',
+        rollups.rebuild,
+    ]),
+    (4, 'jobs archive tier', [
+        archive.create_archive_table,
+    ]),
+    (5, 'conditional GET state for RSS feeds', [
+        AddColumn('rss_feeds', 'etag', 'TEXT'),
+        AddColumn('rss_feeds', 'modified', 'TEXT'),
+        AddColumn('rss_feeds', 'content_hash', 'TEXT'),
+    ]),
+    (6, 'per-feed poll interval', [
+        # Seconds between polls; NULL lets the scheduler adapt it
+        AddColumn('rss_feeds', 'poll_interval', 'INTEGER'),
+    ]),
+    (7, 'per-feed high-water mark', [
+        # Newest published time ingested, and a JSON list of the most recent job ids (see feed_watermark.py)
+        AddColumn('rss_feeds', 'last_published_at', 'TEXT'),
+        AddColumn('rss_feeds', 'recent_guids', 'TEXT'),
+    ]),
+    (8, 'parsed budget columns', [
+        # 'hourly' or 'fixed', with the dollar range parsed from the budget text (see normalizer.py)
+        AddColumn('jobs', 'budget_type', 'TEXT'),
+        AddColumn('jobs', 'budget_min', 'REAL'),
+        AddColumn('jobs', 'budget_max', 'REAL'),
+        AddColumn(archive.ARCHIVE_TABLE, 'budget_type', 'TEXT'),
+        AddColumn(archive.ARCHIVE_TABLE, 'budget_min', 'REAL'),
+        AddColumn(archive.ARCHIVE_TABLE, 'budget_max', 'REAL'),
+    ]),
+    (9, 'near-duplicate fingerprints', [
+        # 64-bit SimHash of title + description, and the job a near-duplicate was flagged against (see near_dup.py)
+        AddColumn('jobs', 'simhash', 'BIGINT'),
+        AddColumn('jobs', 'duplicate_of', 'TEXT'),
+        AddColumn(archive.ARCHIVE_TABLE, 'simhash', 'BIGINT'),
+        AddColumn(archive.ARCHIVE_TABLE, 'duplicate_of', 'TEXT'),
+        near_dup.backfill,
+        near_dup.create_band_indexes,
+    ]),
+    (10, 'canonical Upwork job key', [
+        # The ~0... job id from the URL (see job_keys.py); one jobs row per key
+        AddColumn('jobs', 'upwork_key', 'TEXT'),
+        AddColumn(archive.ARCHIVE_TABLE, 'upwork_key', 'TEXT'),
+        job_keys.backfill,
+        job_keys.merge_duplicates,
+        rollups.rebuild,
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_upwork_key ON jobs (upwork_key)',
+        f'CREATE INDEX IF NOT EXISTS idx_jobs_archive_upwork_key ON {archive.ARCHIVE_TABLE} (upwork_key)',
+    ]),
+    (11, 'LLM response cache', [
+        # Completion text by sha256(model, max_tokens, prompt); times are Unix seconds (see llm_cache.py)
+        sql('''CREATE TABLE IF NOT EXISTS llm_cache
+               (cache_key TEXT PRIMARY KEY, model TEXT, max_tokens INTEGER, response TEXT,
+                created_at DOUBLE PRECISION, last_used_at DOUBLE PRECISION, hits INTEGER DEFAULT 0)''',
+            '''CREATE TABLE IF NOT EXISTS llm_cache
+               (cache_key TEXT PRIMARY KEY, model TEXT, max_tokens INTEGER, response TEXT,
+                created_at REAL, last_used_at REAL, hits INTEGER DEFAULT 0)'''),
+        'CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at)',
+    ]),
+    (12, 'configuration version counters', [
+        # Bumped by every rss_feeds configuration write, so processes know to reload (see feed_config.py)
+        'CREATE TABLE IF NOT EXISTS config_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)',
+        "INSERT INTO config_versions (name, version) VALUES ('rss_feeds', 0) ON CONFLICT (name) DO NOTHING",
+    ]),
+    (13, 'background proposal generation', [
+        # Per-feed opt-in, and what the background workers spent per day (see auto_proposals.py)
+        AddColumn('rss_feeds', 'auto_proposals', 'INTEGER DEFAULT 0'),
+        sql('CREATE TABLE IF NOT EXISTS auto_proposal_spend (day TEXT PRIMARY KEY, proposals INTEGER DEFAULT 0, cost DOUBLE PRECISION DEFAULT 0)',
+            'CREATE TABLE IF NOT EXISTS auto_proposal_spend (day TEXT PRIMARY KEY, proposals INTEGER DEFAULT 0, cost REAL DEFAULT 0)'),
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(c):
+    c.execute("SELECT MAX(version) FROM schema_version")
+    row = c.fetchone()
+    return row[0] or 0
+
+
+def migrate(conn, is_postgres, verbose=False):
+    """Apply pending migrations in order. Returns the list of applied versions."""
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                 (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)''')
+    conn.commit()
+
+    if current_version(c) >= LATEST_VERSION:
+        return []
+
+    if is_postgres:
+        # Serialize concurrent deploys/workers booting at the same time
+        c.execute("SELECT pg_advisory_lock(hashtext('mindwork_schema_migrations'))")
+    try:
+        version = current_version(c)
+        applied = []
+        placeholder = '%s' if is_postgres else '?'
+        for number, name, steps in MIGRATIONS:
+            if number <= version:
+                continue
+            try:
+                for step in steps:
+                    _run_step(c, step, is_postgres)
+                c.execute(f"INSERT INTO schema_version (version, name, applied_at) VALUES ({placeholder}, {placeholder}, {placeholder})",
+                          (number, name, datetime.now().isoformat()))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(number)
+            if verbose:
+                print(f"Applied migration {number}: {name}")
+    finally:
+        if is_postgres:
+            c.execute("SELECT pg_advisory_unlock(hashtext('mindwork_schema_migrations'))")
+            conn.commit()
+    return applied
+
+
+def _connect():
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        import psycopg2
+        return psycopg2.connect(database_url), True
+    import sqlite3
+    return sqlite3.connect('proposals.db'), False
+
+
+if __name__ == '__main__':
+    conn, is_postgres = _connect()
+    try:
+        if '--status' in sys.argv[1:]:
+            c = conn.cursor()
+            c.execute('''CREATE TABLE IF NOT EXISTS schema_version
+                         (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)''')
+            conn.commit()
+            print(f"Schema version {current_version(c)} (latest {LATEST_VERSION})")
+        else:
+            applied = migrate(conn, is_postgres, verbose=True)
+            if not applied:
+                print(f"Schema already at version {LATEST_VERSION}")
+    finally:
+        conn.close()
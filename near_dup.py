@@ -0,0 +1,160 @@
+"""SimHash near-duplicate detection for ingested jobs.
+
+The same Upwork job reaches the jobs table under different ids. The RSS
+fetcher keys on the entry link, the Chrome extension keys on URL + title,
+and reposts come back with an edited title. Each job therefore stores a
+64-bit SimHash of its normalized title + description, and two jobs whose
+fingerprints differ in at most ``NEAR_DUP_MAX_DISTANCE`` bits are treated
+as the same job.
+
+Lookups are banded: the fingerprint is split into four 16-bit bands, each
+with an expression index on jobs. Two fingerprints within 3 bits of each
+other must agree exactly on at least one band, so a UNION of four index
+lookups returns every candidate, and the exact distance is checked in
+Python. (SQLite won't use expression indexes for an OR of the bands.) The
+index lives in the database, so it is shared by every worker process.
+Distances above 3 still work, but pairs that differ in every band are
+missed.
+
+    python near_dup.py --scan    # flag duplicates among jobs already stored
+"""
+import hashlib
+import re
+import sys
+
+BANDS = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+# Must match the indexes created by create_band_indexes
+BAND_SQL = ['(simhash & 65535)', '((simhash >> 16) & 65535)', '((simhash >> 32) & 65535)', '((simhash >> 48) & 65535)']
+
+# Markup, and the budget suffix vollna appends to titles (reposts often change only the budget)
+_NOISE = re.compile(r'<[^>]*>|&[a-z]+;|&#\d+;|\((?:hourly rate|fixed price):[^)]*\)')
+_WORD = re.compile(r'[a-z][a-z0-9]*')
+# Byte -> its 8 bits spread into 16-bit lanes, so per-bit counts can be summed as plain ints
+_SPREAD = [sum(1 << (16 * bit) for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def features(text):
+    """Word bigrams of the lowercased text; markup, budgets and bare numbers don't count"""
+    words = _WORD.findall(_NOISE.sub(' ', text.lower()))
+    if len(words) < 2:
+        return set(words)
+    return {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def simhash(title, description=''):
+    """Signed 64-bit fingerprint (fits BIGINT/INTEGER columns), or None for empty text"""
+    shingles = features(f"{title or ''} {description or ''}")
+    if not shingles:
+        return None
+    lanes = [0] * 8  # per digest byte: 8 bit counters of 16 bits each
+    for shingle in shingles:
+        for position, byte in enumerate(hashlib.blake2b(shingle.encode(), digest_size=8).digest()):
+            lanes[position] += _SPREAD[byte]
+    half = len(shingles) / 2
+    fingerprint = 0
+    for position, lane in enumerate(lanes):
+        for bit in range(8):
+            if (lane >> (16 * bit)) & 0xFFFF > half:
+                fingerprint |= 1 << (8 * position + bit)
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def distance(a, b):
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def bands(fingerprint):
+    return tuple((fingerprint >> (BAND_BITS * band)) & BAND_MASK for band in range(BANDS))
+
+
+def create_band_indexes(c, is_postgres):
+    """Migration step: one expression index per band (canonical jobs only)"""
+    for band, expression in enumerate(BAND_SQL):
+        c.execute(f"""CREATE INDEX IF NOT EXISTS idx_jobs_simhash_b{band}
+                      ON jobs ({expression}) WHERE duplicate_of IS NULL""")
+
+
+def find(c, fingerprint, max_distance, is_postgres, exclude_id=None):
+    """(job_id, distance) of the closest canonical job within max_distance bits, or None"""
+    if fingerprint is None or max_distance < 0:
+        return None
+    p = '%s' if is_postgres else '?'
+    c.execute(' UNION '.join(f"SELECT id, simhash FROM jobs WHERE {expression} = {p} AND duplicate_of IS NULL"
+                             for expression in BAND_SQL), bands(fingerprint))
+    best = None
+    for job_id, candidate in c.fetchall():
+        if job_id == exclude_id:
+            continue
+        bits = distance(fingerprint, candidate)
+        if bits <= max_distance and (best is None or bits < best[1]):
+            best = (job_id, bits)
+    return best
+
+
+class BatchChecker:
+    """Near-duplicate checks for one ingest batch: stored jobs plus earlier jobs of the same batch"""
+
+    def __init__(self, c, is_postgres, max_distance):
+        self.c = c
+        self.is_postgres = is_postgres
+        self.max_distance = max_distance
+        self.batch = []  # (job_id, fingerprint) accepted so far
+        self.duplicates = 0
+
+    def check(self, job_id, fingerprint):
+        """Id of the job this one duplicates, or None"""
+        if fingerprint is None or self.max_distance < 0:
+            return None
+        best = find(self.c, fingerprint, self.max_distance, self.is_postgres, exclude_id=job_id)
+        for other_id, other in self.batch:
+            bits = distance(fingerprint, other)
+            if bits <= self.max_distance and (best is None or bits < best[1]):
+                best = (other_id, bits)
+        if best is None:
+            self.batch.append((job_id, fingerprint))
+            return None
+        self.duplicates += 1
+        return best[0]
+
+
+def backfill(c, is_postgres, batch_size=1000):
+    """Migration step: fingerprint the jobs stored before the simhash column existed"""
+    p = '%s' if is_postgres else '?'
+    c.execute("SELECT id, title, description FROM jobs WHERE simhash IS NULL")
+    rows = [(simhash(title, description), job_id) for job_id, title, description in c.fetchall()]
+    for start in range(0, len(rows), batch_size):
+        c.executemany(f"UPDATE jobs SET simhash = {p} WHERE id = {p}", rows[start:start + batch_size])
+
+
+def scan(conn, is_postgres, max_distance):
+    """Flag stored near-duplicates: each job later than a match gets duplicate_of = the earlier one"""
+    c = conn.cursor()
+    p = '%s' if is_postgres else '?'
+    # Newest first; a flagged job drops out of the lookups, so the oldest copy stays canonical
+    c.execute("""SELECT id, simhash FROM jobs WHERE simhash IS NOT NULL AND duplicate_of IS NULL
+                 ORDER BY posted_at DESC, id DESC""")
+    flagged = 0
+    for job_id, fingerprint in c.fetchall():
+        match = find(c, fingerprint, max_distance, is_postgres, exclude_id=job_id)
+        if match:
+            c.execute(f"UPDATE jobs SET duplicate_of = {p} WHERE id = {p}", (match[0], job_id))
+            flagged += 1
+    conn.commit()
+    return flagged
+
+
+if __name__ == '__main__':
+    import os
+    from migrations import _connect
+
+    conn, is_postgres = _connect()
+    try:
+        if '--scan' in sys.argv[1:]:
+            max_distance = int(os.getenv('NEAR_DUP_MAX_DISTANCE', 3))
+            print(f"Flagged {scan(conn, is_postgres, max_distance)} near-duplicate jobs")
+        else:
+            print(__doc__)
+    finally:
+        conn.close()
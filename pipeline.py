@@ -0,0 +1,108 @@
+"""Run a request's work as a DAG of stages on a bounded thread pool.
+
+Each stage names the stages it depends on and starts as soon as they have
+finished, so independent stages run at the same time. A stage gets the
+results so far (the run's inputs plus every finished stage, by name) and
+returns its own.
+
+* ``timeout``  - seconds from submission, queueing for a worker included.
+                 A stage that runs over is abandoned (its thread finishes
+                 in the background and the result is dropped).
+* ``fallback`` - ``fallback(results, error)`` supplies the result when the
+                 stage times out or raises. Without one the run fails with
+                 StageError.
+* ``when``     - ``when(results)``; false skips the stage (result None).
+
+Stages must be listed after their dependencies, which also rules out
+cycles. ``run`` returns the results and a timing per stage:
+
+    dag = Pipeline([
+        Stage('keywords', extract),
+        Stage('search', search, deps=('keywords',), timeout=10, fallback=lambda results, error: []),
+    ])
+    results, timings = dag.run(executor, {'job': job})
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, NamedTuple, Optional, Tuple
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Optional[Callable] = None
+    when: Optional[Callable] = None
+
+
+class StageTiming(NamedTuple):
+    seconds: float  # submission to result (or to the timeout)
+    status: str  # 'ok', 'skipped', 'timeout' or 'error'
+
+
+class StageError(Exception):
+    def __init__(self, stage, error):
+        super().__init__(f"{stage} stage failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Pipeline:
+    def __init__(self, stages):
+        self.stages = list(stages)
+        seen = set()
+        for stage in self.stages:
+            if stage.name in seen:
+                raise ValueError(f"Duplicate stage {stage.name}")
+            missing = [dep for dep in stage.deps if dep not in seen]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on {missing}, which must be listed before it")
+            seen.add(stage.name)
+
+    def run(self, executor, inputs):
+        """(results, {stage name: StageTiming}) in stage order"""
+        results = dict(inputs)
+        timings = {}
+        waiting = list(self.stages)
+        running = {}  # future -> (stage, submitted at)
+
+        def finish(stage, started, status, value=None, error=None):
+            if status != 'ok' and status != 'skipped':
+                if stage.fallback is None:
+                    raise StageError(stage.name, error)
+                value = stage.fallback(results, error)
+            results[stage.name] = value
+            timings[stage.name] = StageTiming(time.perf_counter() - started, status)
+
+        while waiting or running:
+            for stage in list(waiting):
+                if any(dep not in timings for dep in stage.deps):
+                    continue
+                waiting.remove(stage)
+                now = time.perf_counter()
+                if stage.when is not None and not stage.when(results):
+                    finish(stage, now, 'skipped')
+                else:
+                    running[executor.submit(stage.run, dict(results))] = (stage, now)
+            if not running:
+                continue  # skipped stages may have unblocked others
+
+            now = time.perf_counter()
+            deadlines = [started + stage.timeout - now for stage, started in running.values() if stage.timeout]
+            done, _ = wait(running, timeout=max(min(deadlines), 0) if deadlines else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, started = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    finish(stage, started, 'ok', future.result())
+                else:
+                    finish(stage, started, 'error', error=error)
+            now = time.perf_counter()
+            for future, (stage, started) in list(running.items()):
+                if stage.timeout and now - started >= stage.timeout:
+                    del running[future]
+                    future.cancel()
+                    finish(stage, started, 'timeout', error=TimeoutError(f"no result after {stage.timeout}s"))
+        return results, {stage.name: timings[stage.name] for stage in self.stages}
@@ -0,0 +1,159 @@
+"""Google Play Store work examples for proposals.
+
+The proposal pipeline (see pipeline.py and ``proposal_stages`` in app.py)
+searches the store for both job keywords. Each keyword is searched in the
+first country. The other countries are searched at the same time, but only
+when the first one found fewer than ``EXAMPLES_PER_KEYWORD`` apps. The
+``examples`` stage then takes up to 10 of the apps found, best rated
+first. It uses ``fallback_examples`` only when no search found anything or
+google-play-scraper isn't installed.
+
+    stages = [Stage('keywords', extract), *play_store.stages(timeout=10)]
+    results, timings = Pipeline(stages).run(executor, inputs)
+    examples, debug_log = results['examples']
+"""
+from pipeline import Stage
+
+try:
+    from google_play_scraper import search
+except ImportError:
+    search = None
+
+COUNTRIES = ('us', 'gb', 'ca', 'au')
+EXAMPLES_PER_KEYWORD = 10
+MAX_EXAMPLES = 10
+
+FALLBACK_EXAMPLES = [
+    {
+        'name': 'ChatGPT',
+        'description': 'The official ChatGPT app by OpenAI. Get instant answers, find creative inspiration, learn something new...',
+        'url': 'https://play.google.com/store/apps/details?id=com.openai.chatgpt',
+        'installs': '50,000,000+',
+        'score': 4.5
+    },
+    {
+        'name': 'Google Assistant',
+        'description': 'Meet your Google Assistant. Ask it questions. Tell it to do things. It is your own personal Google...',
+        'url': 'https://play.google.com/store/apps/details?id=com.google.android.apps.googleassistant',
+        'installs': '1,000,000,000+',
+        'score': 4.1
+    },
+    {
+        'name': 'Replika: My AI Friend',
+        'description': 'Replika is an AI companion who is eager to learn and would love to see the world through your eyes...',
+        'url': 'https://play.google.com/store/apps/details?id=ai.replika.app',
+        'installs': '10,000,000+',
+        'score': 4.2
+    },
+    {
+        'name': 'Speechify Text to Speech Voice',
+        'description': 'Listen to docs, articles, PDFs, email — anything you read — by adding audio to any text with Speechify...',
+        'url': 'https://play.google.com/store/apps/details?id=com.cliffweitzman.speechify2',
+        'installs': '5,000,000+',
+        'score': 4.4
+    },
+    {
+        'name': 'Voice Recorder',
+        'description': 'Simple and reliable voice recorder that allows you to record voice memos and important meetings...',
+        'url': 'https://play.google.com/store/apps/details?id=com.media.bestrecorder.audiorecorder',
+        'installs': '100,000,000+',
+        'score': 4.6
+    }
+]
+
+
+def fallback_examples(keywords):
+    """Fallback examples when Google Play Store fails"""
+    return [dict(example) for example in FALLBACK_EXAMPLES]
+
+
+def search_apps(keyword, country):
+    """(apps, debug_log) for one keyword in one country's Play Store"""
+    debug_log = [f"Searching '{keyword}' in {country}"]
+    results = search(keyword, lang="en", country=country, n_hits=20)
+    if not results:
+        debug_log.append(f"No results found for '{keyword}' in {country}")
+        return [], debug_log
+    debug_log.append(f"Found {len(results)} results for '{keyword}' in {country}")
+
+    apps = []
+    for app in results:
+        try:
+            # Accept ALL apps regardless of score
+            apps.append({
+                'name': app.get('title', 'Unknown App'),
+                'description': str(app.get('description', 'No description'))[:200] + '...',
+                'url': f"https://play.google.com/store/apps/details?id={app.get('appId', '')}",
+                'installs': str(app.get('installs', '0')),
+                'score': app.get('score', 0)
+            })
+        except Exception as e:
+            debug_log.append(f"Error processing app: {e}")
+    return apps, debug_log
+
+
+def pick_examples(keywords, found):
+    """Work examples from the apps found per keyword (in search order), or the fallback examples"""
+    debug_log = []
+    if search is None:
+        debug_log.append("ERROR: google-play-scraper not installed")
+        return fallback_examples(keywords), debug_log
+
+    examples = []
+    for keyword, apps in zip(keywords, found):
+        keyword_apps = apps[:EXAMPLES_PER_KEYWORD]
+        examples.extend(keyword_apps)
+        debug_log.append(f"Added {len(keyword_apps)} apps for '{keyword}'")
+
+    # If we got real apps, return them
+    if examples:
+        # Remove duplicates by app ID
+        seen_ids = set()
+        unique_examples = []
+        for app in examples:
+            app_id = app['url'].split('id=')[-1] if 'id=' in app['url'] else app['name']
+            if app_id not in seen_ids:
+                seen_ids.add(app_id)
+                unique_examples.append(app)
+
+        unique_examples.sort(key=lambda x: x['score'], reverse=True)
+        debug_log.append(f"Returning {len(unique_examples)} real Google Play Store apps")
+        return unique_examples[:MAX_EXAMPLES], debug_log
+
+    # Fallback if no real apps found
+    debug_log.append("No real apps found, using fallback")
+    return fallback_examples(keywords), debug_log
+
+
+def stages(timeout=None, keywords='keywords'):
+    """Search stages for the first two keywords (``search 1 us`` ... ``search 2 au``) and the
+    ``examples`` stage that picks from them. ``keywords`` names the stage whose result is
+    (keywords, debug_log)."""
+    result = []
+    searches = []
+    for index in range(2):
+        first = f"search {index + 1} {COUNTRIES[0]}"
+        for country in COUNTRIES:
+            name = f"search {index + 1} {country}"
+
+            def wanted(r, index=index, first=first, name=name):
+                if search is None or len(r[keywords][0]) <= index:
+                    return False
+                return name == first or len(r[first][0]) < EXAMPLES_PER_KEYWORD
+
+            def search_fallback(r, error, index=index, country=country):
+                return [], [f"Error searching '{r[keywords][0][index]}' in {country}: {error}"]
+
+            result.append(Stage(name, lambda r, index=index, country=country: search_apps(r[keywords][0][index], country),
+                                deps=(keywords,) if name == first else (keywords, first),
+                                timeout=timeout, fallback=search_fallback, when=wanted))
+            searches.append((index, name))
+
+    def examples(r):
+        found_keywords = r[keywords][0][:2]
+        found = [[app for i, name in searches if i == index and r[name] for app in r[name][0]]
+                 for index in range(len(found_keywords))]
+        return pick_examples(found_keywords, found)
+
+    result.append(Stage('examples', examples, deps=tuple(name for _, name in searches)))
+    return result
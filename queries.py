@@ -0,0 +1,117 @@
+"""Registry of the hot single-row statements.
+
+Each statement is written once with ``?`` placeholders and rendered for the
+connection it runs on. SQLite gets it verbatim; the sqlite3 module already
+caches compiled statements per connection. On Postgres each pooled
+connection PREPAREs a statement the first time it runs there. Later calls
+send only ``EXECUTE name (...)``, which skips parsing and planning.
+
+    c = conn.cursor()
+    queries.execute(c, 'job_exists', (job_id,))
+
+Set ``PG_PREPARED_STATEMENTS=0`` when connecting through a transaction-pooling
+proxy such as PgBouncer, where session-level prepared statements don't
+survive between transactions. Per-statement call counts and latencies are
+available from ``stats()``.
+"""
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+PG_PREPARED_STATEMENTS = os.getenv('PG_PREPARED_STATEMENTS', '1') != '0'
+
+
+class Statement:
+    def __init__(self, name, sql, postgres=None):
+        self.name = name
+        self.sqlite_sql = sql
+        pg = postgres or sql
+        self.postgres_sql = pg.replace('?', '%s')
+        # PREPARE uses $1..$n; EXECUTE passes the values through psycopg2's %s quoting
+        numbered = pg.split('?')
+        self.prepare_sql = f"PREPARE {name} AS " + ''.join(
+            part + (f"${i + 1}" if i < len(numbered) - 1 else '') for i, part in enumerate(numbered))
+        args = ', '.join(['%s'] * (len(numbered) - 1))
+        self.execute_sql = f"EXECUTE {name} ({args})" if args else f"EXECUTE {name}"
+
+
+STATEMENTS = {}
+
+
+def statement(name, sql, postgres=None):
+    """Register a statement; ``postgres`` overrides the SQL on that dialect"""
+    STATEMENTS[name] = Statement(name, sql, postgres)
+
+
+# Jobs
+statement('job_exists', "SELECT id FROM jobs WHERE id = ?")
+statement('job_enriched_flag', "SELECT id, enriched FROM jobs WHERE id = ?")
+statement('job_by_upwork_key', "SELECT id, enriched FROM jobs WHERE upwork_key = ?")
+statement('archived_job_enriched_flag', "SELECT id, enriched FROM jobs_archive WHERE id = ?")
+statement('archived_job_by_upwork_key', "SELECT id, enriched FROM jobs_archive WHERE upwork_key = ?")
+statement('job_details', "SELECT description, skills, categories FROM jobs WHERE id = ?")
+statement('archived_job_details', "SELECT description, skills, categories FROM jobs_archive WHERE id = ?")
+statement('job_status', "SELECT proposal_status, submitted_by, outreach_status FROM jobs WHERE id = ?")
+statement('update_job_status',
+          "UPDATE jobs SET proposal_status = ?, submitted_by = ?, outreach_status = ? WHERE id = ?")
+statement('mark_job_processed', "UPDATE jobs SET processed = 1 WHERE id = ?")
+statement('job_rollup_snapshot',
+          "SELECT posted_at, enriched, enriched_by, submitted_by, proposal_status FROM jobs WHERE id = ?",
+          # Lock the row so concurrent updates of the same job can't both apply the same "before"
+          postgres="SELECT posted_at, enriched, enriched_by, submitted_by, proposal_status FROM jobs WHERE id = ? FOR UPDATE")
+
+# RSS feeds
+statement('feed_fetch_state', "SELECT etag, modified, content_hash FROM rss_feeds WHERE id = ?")
+statement('save_feed_fetch_state', "UPDATE rss_feeds SET etag = ?, modified = ?, content_hash = ? WHERE id = ?")
+statement('feed_watermark', "SELECT last_published_at, recent_guids FROM rss_feeds WHERE id = ?")
+statement('save_feed_watermark', "UPDATE rss_feeds SET last_published_at = ?, recent_guids = ? WHERE id = ?")
+
+
+_lock = threading.Lock()
+_prepared = weakref.WeakKeyDictionary()  # psycopg2 connection -> names prepared on it
+_stats = {}
+
+
+def execute(c, name, params=()):
+    """Run a registered statement on cursor ``c``; fetch results from the cursor as usual"""
+    stmt = STATEMENTS[name]
+    conn = c.connection
+    started = time.perf_counter()
+    prepared_now = False
+    if isinstance(conn, sqlite3.Connection):
+        c.execute(stmt.sqlite_sql, params)
+    elif PG_PREPARED_STATEMENTS:
+        with _lock:
+            prepared = _prepared.setdefault(conn, set())
+        if name not in prepared:
+            c.execute(stmt.prepare_sql)
+            prepared.add(name)
+            prepared_now = True
+        c.execute(stmt.execute_sql, params)
+    else:
+        c.execute(stmt.postgres_sql, params)
+    elapsed = time.perf_counter() - started
+
+    with _lock:
+        entry = _stats.setdefault(name, {'calls': 0, 'prepares': 0, 'total': 0.0, 'max': 0.0})
+        entry['calls'] += 1
+        entry['prepares'] += prepared_now
+        entry['total'] += elapsed
+        entry['max'] = max(entry['max'], elapsed)
+    return c
+
+
+def stats():
+    with _lock:
+        return {
+            name: {
+                'calls': entry['calls'],
+                'prepares': entry['prepares'],
+                'total_ms': round(entry['total'] * 1000, 3),
+                'avg_ms': round(entry['total'] * 1000 / entry['calls'], 3),
+                'max_ms': round(entry['max'] * 1000, 3),
+            }
+            for name, entry in sorted(_stats.items())
+        }
@@ -0,0 +1,112 @@
+"""Monthly analytics rollups maintained alongside writes to ``jobs``.
+
+/analytics used to GROUP BY month over the whole jobs table on every page
+view. The counts now live in two small tables that the write paths keep in
+step: take a ``job_snapshot`` before changing a job, another one after, and
+pass both to ``apply_change`` in the same transaction. ``rebuild`` regenerates
+both tables from scratch:
+
+    python rollups.py
+"""
+import queries
+
+ENRICHMENT_TABLE = 'analytics_enrichment_monthly'
+PROPOSAL_TABLE = 'analytics_proposals_monthly'
+
+# (table, key columns) for each rollup
+ROLLUPS = (
+    (ENRICHMENT_TABLE, ('month', 'enriched_by')),
+    (PROPOSAL_TABLE, ('month', 'submitted_by', 'proposal_status')),
+)
+
+
+def _month(posted_at):
+    # datetime on Postgres, 'YYYY-MM-DD HH:MM:SS' text on SQLite
+    return str(posted_at)[:7] if posted_at else None
+
+
+def job_snapshot(c, job_id, is_postgres):
+    """The columns the rollups depend on, or None if the job doesn't exist"""
+    # Locks the row on Postgres (see queries.py)
+    queries.execute(c, 'job_rollup_snapshot', (job_id,))
+    return c.fetchone()
+
+
+def _keys(snapshot):
+    """Rollup key of a job snapshot for each table (None where the job isn't counted)"""
+    if snapshot is None:
+        return {ENRICHMENT_TABLE: None, PROPOSAL_TABLE: None}
+    posted_at, enriched, enriched_by, submitted_by, proposal_status = snapshot
+    month = _month(posted_at)
+    enrichment = None
+    if month and enriched == 1 and enriched_by is not None:
+        enrichment = (month, enriched_by)
+    proposal = None
+    if month and submitted_by is not None and proposal_status is not None and proposal_status != 'Not Submitted':
+        proposal = (month, submitted_by, proposal_status)
+    return {ENRICHMENT_TABLE: enrichment, PROPOSAL_TABLE: proposal}
+
+
+def _bump(c, table, columns, key, delta, is_postgres):
+    p = '%s' if is_postgres else '?'
+    c.execute(f"""INSERT INTO {table} ({', '.join(columns)}, job_count)
+                  VALUES ({', '.join([p] * (len(columns) + 1))})
+                  ON CONFLICT ({', '.join(columns)})
+                  DO UPDATE SET job_count = {table}.job_count + excluded.job_count""",
+              key + (delta,))
+    if delta < 0:
+        where = ' AND '.join(f"{column} = {p}" for column in columns)
+        c.execute(f"DELETE FROM {table} WHERE {where} AND job_count <= 0", key)
+
+
+def apply_change(c, before, after, is_postgres):
+    """Move a job's contribution from its ``before`` rollup keys to its ``after`` keys"""
+    old, new = _keys(before), _keys(after)
+    for table, columns in ROLLUPS:
+        if old[table] == new[table]:
+            continue
+        if old[table] is not None:
+            _bump(c, table, columns, old[table], -1, is_postgres)
+        if new[table] is not None:
+            _bump(c, table, columns, new[table], 1, is_postgres)
+
+
+def rebuild(c, is_postgres):
+    """Regenerate both rollup tables from the jobs table"""
+    month = "to_char(posted_at, 'YYYY-MM')" if is_postgres else "strftime('%Y-%m', posted_at)"
+    c.execute(f"DELETE FROM {ENRICHMENT_TABLE}")
+    c.execute(f"""INSERT INTO {ENRICHMENT_TABLE} (month, enriched_by, job_count)
+                  SELECT {month}, enriched_by, COUNT(*)
+                  FROM jobs
+                  WHERE enriched = 1 AND enriched_by IS NOT NULL AND posted_at IS NOT NULL
+                  GROUP BY {month}, enriched_by""")
+    c.execute(f"DELETE FROM {PROPOSAL_TABLE}")
+    c.execute(f"""INSERT INTO {PROPOSAL_TABLE} (month, submitted_by, proposal_status, job_count)
+                  SELECT {month}, submitted_by, proposal_status, COUNT(*)
+                  FROM jobs
+                  WHERE submitted_by IS NOT NULL AND proposal_status != 'Not Submitted'
+                    AND posted_at IS NOT NULL
+                  GROUP BY {month}, submitted_by, proposal_status""")
+
+
+def read(c):
+    """(enrichment_stats, proposal_stats) rows for the analytics page, newest month first"""
+    c.execute(f"""SELECT month, enriched_by, job_count FROM {ENRICHMENT_TABLE}
+                  ORDER BY month DESC, enriched_by""")
+    enrichment_stats = c.fetchall()
+    c.execute(f"""SELECT month, submitted_by, proposal_status, job_count FROM {PROPOSAL_TABLE}
+                  ORDER BY month DESC, submitted_by, proposal_status""")
+    proposal_stats = c.fetchall()
+    return enrichment_stats, proposal_stats
+
+
+if __name__ == '__main__':
+    from migrations import _connect
+
+    conn, is_postgres = _connect()
+    try:
+        rebuild(conn.cursor(), is_postgres)
+        conn.commit()
+        print("Analytics rollups rebuilt")
+    finally:
+        conn.close()
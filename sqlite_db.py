@@ -0,0 +1,178 @@
+"""Tuned SQLite connections for local and small deployments.
+
+SQLite allows a single writer at a time, so instead of a generic pool the
+SQLite backend uses:
+
+* one dedicated writer connection, handed to one thread at a time (nested
+  checkouts from the same thread share it instead of deadlocking), and
+* one read-only connection per thread for list pages, lookups and the
+  fetcher "is this feed active" checks.
+
+With WAL journaling readers never wait on the writer and the writer never
+waits on readers. Both kinds of connection are returned as
+``db_pool.PooledConnection`` so call sites keep the usual
+``conn = system.get_db_connection() ... conn.close()`` shape.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from db_pool import PoolTimeout, PooledConnection
+
+
+def connect(path, readonly=False, mmap_size=256 * 1024 * 1024, cache_size_kb=64000,
+            busy_timeout_ms=5000):
+    """Open a SQLite connection with the performance pragmas applied"""
+    conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    c = conn.cursor()
+    if not readonly:
+        # Persistent in the database file; only the writer needs to set it
+        c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    c.execute(f"PRAGMA cache_size={-int(cache_size_kb)}")
+    c.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    c.execute("PRAGMA temp_store=MEMORY")
+    if readonly:
+        c.execute("PRAGMA query_only=ON")
+    c.close()
+    return conn
+
+
+class WriterConnection:
+    """The single SQLite write connection, checked out by one thread at a time."""
+
+    def __init__(self, connect, timeout=30.0):
+        self._connect = connect
+        self.timeout = timeout
+        self._raw = connect()
+        self._cond = threading.Condition()
+        self._owner = None
+        self._depth = 0
+
+        # Stats
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        me = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            while self._owner is not None and self._owner != me:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"SQLite writer busy for more than {timeout:.1f}s")
+                self._cond.wait(remaining)
+            self._owner = me
+            self._depth += 1
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            return PooledConnection(self, self._raw)
+
+    def release(self, raw):
+        with self._cond:
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            try:
+                # Never hand the next thread an open transaction
+                raw.rollback()
+            except sqlite3.Error:
+                self._reconnect(raw)
+            finally:
+                # Even when reconnecting fails, so the writer isn't checked out forever
+                self._owner = None
+                self._cond.notify()
+
+    def _reconnect(self, raw):
+        """Replace a connection that can't roll back; the broken one is closed so its handle isn't leaked"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self._raw = self._connect()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_all(self):
+        with self._cond:
+            self._raw.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'in_use': 1 if self._owner is not None else 0,
+                'idle': 0 if self._owner is not None else 1,
+                'size': 1,
+                'max_size': 1,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'wait_time_total_ms': round(self._wait_total * 1000, 3),
+                'wait_time_avg_ms': round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                'wait_time_max_ms': round(self._wait_max * 1000, 3),
+            }
+
+
+class ThreadReaders:
+    """Read-only connections, one per thread, opened on first use."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._checkouts = 0
+
+    def acquire(self, timeout=None):
+        raw = getattr(self._local, 'conn', None)
+        if raw is None:
+            raw = self._local.conn = self._connect()
+            with self._lock:
+                self._opened += 1
+        with self._lock:
+            self._checkouts += 1
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        try:
+            raw.rollback()
+        except sqlite3.Error:
+            if getattr(self._local, 'conn', None) is raw:
+                self._local.conn = None
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_all(self):
+        # Connections of other threads are closed when those threads exit
+        raw = getattr(self._local, 'conn', None)
+        if raw is not None:
+            self._local.conn = None
+            raw.close()
+
+    def stats(self):
+        with self._lock:
+            return {'opened': self._opened, 'checkouts': self._checkouts}
@@ -0,0 +1,28 @@
+// Job list pages (rss_jobs, enriched_jobs, sent_jobs): the list only carries a description
+// preview, so the full description, skills and categories are fetched on expand.
+// Fills #job-description-<id> and #job-extra-<id>; each job is fetched once per page view.
+const loadedJobDetails = {};
+function loadJobDetails(jobId) {
+    if (loadedJobDetails[jobId]) return;
+    loadedJobDetails[jobId] = true;
+
+    fetch(`/api/job/${jobId}/details`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            loadedJobDetails[jobId] = false;
+            return;
+        }
+        document.getElementById(`job-description-${jobId}`).textContent = data.description;
+        const extraDiv = document.getElementById(`job-extra-${jobId}`);
+        extraDiv.innerHTML = '<div><strong>Skills:</strong> <span class="skills"></span></div>' +
+                             '<div><strong>Categories:</strong> <span class="categories"></span></div>';
+        extraDiv.querySelector('.skills').textContent = data.skills;
+        extraDiv.querySelector('.categories').textContent = data.categories;
+        extraDiv.style.display = 'block';
+    })
+    .catch(error => {
+        loadedJobDetails[jobId] = false;
+        console.error('Error loading job details:', error);
+    });
+}
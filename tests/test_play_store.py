@@ -0,0 +1,89 @@
+"""Proposals must cite the apps the Play Store search found, not the fallback examples.
+
+Before the proposal pipeline, the search loop dropped every result and
+each proposal fell back to the same five apps. These tests run the search
+and examples stages with a stubbed ``google_play_scraper.search`` and
+check which examples come out.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import play_store
+from pipeline import Pipeline, Stage
+
+
+def store_app(app_id, score):
+    return {'title': f"App {app_id}", 'description': 'An app', 'appId': app_id, 'installs': '1,000+', 'score': score}
+
+
+class StubSearch:
+    """Stands in for google_play_scraper.search; records the (keyword, country) searches made"""
+
+    def __init__(self):
+        self.results = {}
+        self.made = []
+
+    def __call__(self, keyword, lang, country, n_hits):
+        self.made.append((keyword, country))
+        return self.results.get((keyword, country), [])
+
+
+@pytest.fixture
+def search(monkeypatch):
+    stub = StubSearch()
+    monkeypatch.setattr(play_store, 'search', stub)
+    return stub
+
+
+def run_examples(keywords):
+    stages = [Stage('keywords', lambda r: (keywords, []))] + play_store.stages(timeout=5)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results, timings = Pipeline(stages).run(executor, {})
+    return results['examples']
+
+
+def fallback_urls():
+    return {example['url'] for example in play_store.fallback_examples([])}
+
+
+def test_examples_are_the_apps_found(search):
+    search.results[('fitness', 'us')] = [store_app(f"com.fit{i}", 4.0 + i / 100) for i in range(12)]
+    search.results[('travel', 'us')] = [store_app(f"com.trip{i}", 3.0) for i in range(12)]
+
+    examples, debug_log = run_examples(['fitness', 'travel'])
+
+    urls = [example['url'] for example in examples]
+    assert len(urls) == play_store.MAX_EXAMPLES
+    assert not set(urls) & fallback_urls()
+    # The first 10 per keyword in search order, then best rated first
+    assert urls[0] == 'https://play.google.com/store/apps/details?id=com.fit9'
+    assert "Returning 20 real Google Play Store apps" in debug_log
+    # Enough apps in the first country, so no other store was searched
+    assert sorted(search.made) == [('fitness', 'us'), ('travel', 'us')]
+
+
+def test_other_countries_fill_in_for_a_sparse_keyword(search):
+    search.results[('fitness', 'us')] = [store_app('com.fit', 4.5)]
+    search.results[('fitness', 'gb')] = [store_app('com.fit.uk', 4.0)]
+
+    examples, _ = run_examples(['fitness'])
+
+    assert [example['url'].split('id=')[-1] for example in examples] == ['com.fit', 'com.fit.uk']
+    assert sorted(search.made) == [('fitness', country) for country in sorted(play_store.COUNTRIES)]
+
+
+def test_fallback_only_when_nothing_was_found(search):
+    examples, debug_log = run_examples(['fitness', 'travel'])
+
+    assert {example['url'] for example in examples} == fallback_urls()
+    assert "No real apps found, using fallback" in debug_log
+
+
+def test_fallback_without_the_scraper(monkeypatch):
+    monkeypatch.setattr(play_store, 'search', None)
+
+    examples, debug_log = run_examples(['fitness', 'travel'])
+
+    assert {example['url'] for example in examples} == fallback_urls()
+    assert "ERROR: google-play-scraper not installed" in debug_log
@@ -0,0 +1,54 @@
+"""The job list tabs must be served by their indexes, already in posted_at order.
+
+A dropped or changed index doesn't break anything visibly; the tabs just
+get slower as the jobs table grows. These tests EXPLAIN every tab's query
+on a freshly migrated SQLite database and fail if the planner would scan
+the table or sort the rows itself.
+"""
+import sqlite3
+
+import pytest
+
+import job_lists
+import migrations
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'proposals.db'))
+    migrations.migrate(conn, is_postgres=False)
+    yield conn.cursor()
+    conn.close()
+
+
+def query_plan(c, query, params):
+    c.execute("EXPLAIN QUERY PLAN " + query, params)
+    return '\n'.join(row[-1] for row in c.fetchall())
+
+
+def params_for(view, after_cursor):
+    params = [1] if view == 'feed' else []
+    if after_cursor:
+        params.extend(['2024-01-01 00:00:00', 'job-id'])
+    return params
+
+
+@pytest.mark.parametrize('after_cursor', [False, True], ids=['first page', 'next page'])
+@pytest.mark.parametrize('view', sorted(job_lists.VIEWS))
+def test_job_list_uses_its_index(cursor, view, after_cursor):
+    index_name = job_lists.VIEWS[view][1]
+    plan = query_plan(cursor, job_lists.sql(view, False, after_cursor=after_cursor, limit=51),
+                      params_for(view, after_cursor))
+
+    assert f"USING INDEX {index_name}" in plan or f"USING COVERING INDEX {index_name}" in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+@pytest.mark.parametrize('view', sorted(job_lists.VIEWS))
+def test_archived_job_list_uses_indexes(cursor, view):
+    # Both tiers are read through an index; only the merged page (limit rows per tier) gets sorted
+    plan = query_plan(cursor, job_lists.sql(view, False, limit=51, include_archived=True),
+                      params_for(view, False) * 2)
+
+    assert f"INDEX {job_lists.VIEWS[view][1]}" in plan, plan
+    assert "SCAN jobs\n" not in plan + "\n" and "SCAN jobs_archive\n" not in plan + "\n", plan
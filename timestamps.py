@@ -0,0 +1,32 @@
+"""Parsing of the free-form ``posted_date`` strings into the typed ``posted_at`` column."""
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+POSTED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_posted_date(value):
+    """Parse an ISO-8601 or RFC-822 date string; returns a naive local datetime or None"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        value = str(value).strip()
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                dt = parsedate_to_datetime(value)
+            except (TypeError, ValueError, IndexError):
+                return None
+    if dt.tzinfo is not None:
+        # RSS entries are stored in server-local time (see fetch_rss_jobs)
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def to_posted_at(value, default=None):
+    """Format a posted date for the posted_at column (same text form for both dialects)"""
+    dt = parse_posted_date(value) or default or datetime.now()
+    return dt.strftime(POSTED_AT_FORMAT)